@@ -35,7 +35,7 @@
 #
 ##########################################################################
 
-import os, sys, traceback
+import os, sys, ast, resource, threading, traceback, multiprocessing
 
 import IECore
 
@@ -94,6 +94,29 @@ class execute( Gaffer.Application ) :
 					allowEmptyList = False,
 				),
 
+				IECore.BoolParameter(
+					name = "parallelFrames",
+					description = "Executes the frames of nodes which don't require "
+						"sequence execution concurrently, each in its own context, "
+						"using up to the number of threads specified by the threads "
+						"parameter. The first frame is executed on its own to measure "
+						"the memory it needs, and the number of concurrent frames is "
+						"limited to fit within the available memory. Messages are "
+						"output in frame order, as they would be for serial execution.",
+					defaultValue = False,
+				),
+
+				IECore.BoolParameter(
+					name = "worker",
+					description = "Keeps the script loaded and executes batches read "
+						"from stdin, one per line, until stdin is closed. Each batch is "
+						"a Python dictionary with \"nodes\", \"frames\" and \"context\" "
+						"entries matching the equivalent parameters, and the exit status "
+						"of each batch is written to stdout. This is used by the "
+						"LocalDispatcher to avoid reloading the script for every batch.",
+					defaultValue = False,
+				),
+
 				IECore.StringVectorParameter(
 					name = "context",
 					description = "The context used during execution. Note that the frames "
@@ -128,9 +151,25 @@ class execute( Gaffer.Application ) :
 
 		self.root()["scripts"].addChild( scriptNode )
 
+		self.__frameThreads = 1
+		if args["parallelFrames"].value :
+			self.__frameThreads = args["threads"].value or multiprocessing.cpu_count()
+
+		if args["worker"].value :
+			return self.__runWorker( scriptNode )
+
+		return self.__execute(
+			scriptNode,
+			args["nodes"],
+			self.parameters()["frames"].getFrameListValue().asList(),
+			args["context"]
+		)
+
+	def __execute( self, scriptNode, nodeNames, frames, contextArgs ) :
+
 		nodes = []
-		if len( args["nodes"] ) :
-			for nodeName in args["nodes"] :
+		if len( nodeNames ) :
+			for nodeName in nodeNames :
 				node = scriptNode.descendant( nodeName )
 				if node is None :
 					IECore.msg( IECore.Msg.Level.Error, "gaffer execute", "Node \"%s\" does not exist" % nodeName )
@@ -147,21 +186,22 @@ class execute( Gaffer.Application ) :
 				IECore.msg( IECore.Msg.Level.Error, "gaffer execute", "Script has no executable nodes" )
 				return 1
 
-		if len(args["context"]) % 2 :
+		if len(contextArgs) % 2 :
 			IECore.msg( IECore.Msg.Level.Error, "gaffer execute", "Context parameter must have matching entry/value pairs" )
 			return 1
 
 		context = Gaffer.Context( scriptNode.context() )
-		for i in range( 0, len(args["context"]), 2 ) :
-			entry = args["context"][i].lstrip( "-" )
-			context[entry] = eval( args["context"][i+1] )
-
-		frames = self.parameters()["frames"].getFrameListValue().asList()
+		for i in range( 0, len(contextArgs), 2 ) :
+			entry = contextArgs[i].lstrip( "-" )
+			context[entry] = eval( contextArgs[i+1] )
 
 		with context :
 			for node in nodes :
 				try :
-					node["task"].executeSequence( frames )
+					if self.__frameThreads > 1 and len( frames ) > 1 and not node["task"].requiresSequenceExecution() :
+						self.__executeParallelFrames( node, frames )
+					else :
+						node["task"].executeSequence( frames )
 				except Exception as exception :
 					IECore.msg(
 						IECore.Msg.Level.Debug,
@@ -177,4 +217,132 @@ class execute( Gaffer.Application ) :
 
 		return 0
 
+	def __executeParallelFrames( self, node, frames ) :
+
+		context = Gaffer.Context.current()
+		results = [ None ] * len( frames )
+		finished = [ threading.Event() for f in frames ]
+		# Set as soon as any frame fails, so that no more are started.
+		# Frames are started in order, so all the frames preceding the
+		# failed one have been started, and will still be reported.
+		stop = threading.Event()
+
+		def executeFrame( i ) :
+
+			frameContext = Gaffer.Context( context )
+			frameContext.setFrame( frames[i] )
+			messageHandler = IECore.CapturingMessageHandler()
+			exceptionInfo = None
+			with messageHandler, frameContext :
+				try :
+					node["task"].execute()
+				except Exception :
+					exceptionInfo = sys.exc_info()
+					stop.set()
+
+			results[i] = ( messageHandler.messages, exceptionInfo )
+			finished[i].set()
+
+		# Outputs the messages for a frame, and reraises its
+		# exception, if any. This is always done in frame order.
+		def report( i ) :
+
+			messages, exceptionInfo = results[i]
+			for message in messages :
+				IECore.msg( message.level, message.context, message.message )
+
+			if exceptionInfo is not None :
+				raise exceptionInfo[0], exceptionInfo[1], exceptionInfo[2]
+
+		peakMemory = self.__peakMemory()
+		executeFrame( 0 )
+		report( 0 )
+
+		numThreads = self.__memoryLimitedThreads( self.__frameThreads, self.__peakMemory() - peakMemory )
+		IECore.msg(
+			IECore.Msg.Level.Debug, "gaffer execute : executing %s" % node.getName(),
+			"Executing frames on %d threads" % numThreads
+		)
+
+		indices = iter( range( 1, len( frames ) ) )
+		indicesLock = threading.Lock()
+
+		def executeFrames() :
+
+			while not stop.is_set() :
+				with indicesLock :
+					i = next( indices, None )
+				if i is None :
+					return
+				executeFrame( i )
+
+		threads = [ threading.Thread( target = executeFrames ) for t in range( min( numThreads, len( frames ) - 1 ) ) ]
+		for thread in threads :
+			thread.start()
+
+		try :
+			for i in range( 1, len( frames ) ) :
+				finished[i].wait()
+				report( i )
+		finally :
+			# Frames which have already started are allowed to
+			# finish, but no more are started.
+			stop.set()
+			for thread in threads :
+				thread.join()
+
+	@staticmethod
+	def __peakMemory() :
+
+		peakRSS = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss
+		# Linux reports in kilobytes, OS X in bytes.
+		return peakRSS if sys.platform == "darwin" else peakRSS * 1024
+
+	@staticmethod
+	def __memoryLimitedThreads( maxThreads, frameMemory ) :
+
+		availableMemory = None
+		try :
+			with open( "/proc/meminfo" ) as f :
+				for line in f :
+					if line.startswith( "MemAvailable:" ) :
+						availableMemory = int( line.split()[1] ) * 1024
+		except IOError :
+			pass
+
+		if not availableMemory or frameMemory <= 0 :
+			return maxThreads
+
+		return max( 1, min( maxThreads, availableMemory // frameMemory ) )
+
+	def __runWorker( self, scriptNode ) :
+
+		# We reserve the real stdout for reporting results, and redirect
+		# anything else written to it (including output from the tasks
+		# themselves) to stderr, so it can't be mistaken for a result.
+		sys.stdout.flush()
+		results = os.fdopen( os.dup( sys.stdout.fileno() ), "w" )
+		os.dup2( sys.stderr.fileno(), sys.stdout.fileno() )
+
+		while True :
+
+			line = sys.stdin.readline()
+			if not line :
+				return 0
+
+			try :
+				batch = ast.literal_eval( line )
+				result = self.__execute(
+					scriptNode,
+					batch["nodes"],
+					IECore.FrameList.parse( batch["frames"] ).asList(),
+					batch["context"]
+				)
+			except Exception as exception :
+				IECore.msg( IECore.Msg.Level.Error, "gaffer execute : worker", str( exception ) )
+				result = 1
+
+			results.write( "%d\n" % result )
+			results.flush()
+
 IECore.registerRunTimeTyped( execute )
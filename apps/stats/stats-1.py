@@ -75,6 +75,12 @@ class stats( Gaffer.Application ) :
 			```
 			gaffer stats fileName.gfr -image NameOfNode -performanceMonitor
 			```
+
+			To report on the use of the compute cache by each type of node :
+
+			```
+			gaffer stats fileName.gfr -scene NameOfNode -cache
+			```
 			"""
 		)
 
@@ -115,6 +121,13 @@ class stats( Gaffer.Application ) :
 					defaultValue = False,
 				),
 
+				IECore.BoolParameter(
+					name = "cache",
+					description = "Reports on the contents of the compute cache, broken down "
+						"by node type and plug name.",
+					defaultValue = False,
+				),
+
 				IECore.IntParameter(
 					name = "maxLinesPerMetric",
 					description = "The maximum number of plugs to list for each metric "
@@ -139,6 +152,10 @@ class stats( Gaffer.Application ) :
 		else :
 			self.__performanceMonitor = None
 
+		if args["cache"].value :
+			Gaffer.ValuePlug.setCacheStatisticsEnabled( True )
+			Gaffer.ValuePlug.resetCacheStatistics()
+
 		self.__timers = collections.OrderedDict()
 		self.__memory = collections.OrderedDict()
 
@@ -187,6 +204,12 @@ class stats( Gaffer.Application ) :
 
 		self.__printPerformance( script, args )
 
+		if args["cache"].value :
+
+			print ""
+
+			self.__printCache( args )
+
 		print
 
 	def __printVersion( self, script ) :
@@ -356,6 +379,39 @@ class stats( Gaffer.Application ) :
 					maxLinesPerMetric = args["maxLinesPerMetric"].value
 				)
 
+	def __printCache( self, args ) :
+
+		statistics = Gaffer.ValuePlug.cacheStatistics()
+
+		print "Cache :\n"
+
+		total = Gaffer.ValuePlug.CacheStatistics()
+		for s in statistics.values() :
+			total += s
+
+		def statisticsStr( s ) :
+
+			return "{memory:<12}{entries:<12}{hits:<12}{misses}".format(
+				memory = str( _Memory( s.memoryUsage ) ),
+				entries = s.entries,
+				hits = s.hits,
+				misses = s.misses,
+			)
+
+		items = sorted( statistics.items(), key = lambda x : x[1].memoryUsage, reverse = True )
+		items = [
+			( "{0}.{1}".format( nodeType.rpartition( ":" )[2], plugName ), statisticsStr( s ) )
+			for ( nodeType, plugName ), s in items[:args["maxLinesPerMetric"].value]
+		]
+
+		items.insert( 0, ( "", "{0:<12}{1:<12}{2:<12}{3}".format( "Memory", "Entries", "Hits", "Misses" ) ) )
+		items.extend( [
+			( "", "" ),
+			( "Total", statisticsStr( total ) ),
+		] )
+
+		self.__printItems( items )
+
 class _Timer( object ) :
 
 	def __enter__( self ) :
@@ -41,6 +41,7 @@
 #include "IECore/MurmurHash.h"
 
 #include "Gaffer/DependencyNode.h"
+#include "Gaffer/ValuePlug.h"
 
 namespace Gaffer
 {
@@ -77,6 +78,23 @@ class ComputeNode : public DependencyNode
 		/// Called to compute the values for output Plugs. Must be implemented to compute
 		/// an appropriate value and apply it using output->setValue().
 		virtual void compute( ValuePlug *output, const Context *context ) const = 0;
+		/// Called to determine how the computation for an output plug
+		/// is shared between threads. The default implementation returns
+		/// ValuePlug::Standard, and must be reimplemented to return
+		/// ValuePlug::TaskParallel for any output whose compute() spawns
+		/// TBB tasks. This includes tasks spawned indirectly, for instance
+		/// by ValuePlug::getValues(), ImagePlug::image(), parallelProcessTiles()
+		/// or the parallel traversals in SceneAlgo. Failing to do so may
+		/// cause deadlock.
+		virtual ValuePlug::CachePolicy computeCachePolicy( const ValuePlug *output ) const;
+		/// Called to determine the relative cost of recomputing the value
+		/// for an output plug, so that the cache may retain the most valuable
+		/// results. The default implementation returns ValuePlug::MeasuredCost,
+		/// and may be reimplemented to return ValuePlug::CheapCost for outputs
+		/// which are trivial to recompute, such as pass-throughs of large
+		/// values, or ValuePlug::ExpensiveCost for outputs which should be
+		/// retained whenever possible.
+		virtual ValuePlug::ComputeCost computeCacheCost( const ValuePlug *output ) const;
 
 	private :
 
@@ -231,11 +231,24 @@ class Context : public IECore::RefCounted
 
 		};
 
+		/// The EditableScope class provides a cheap way of making an
+		/// edited copy of a context current. See below for details.
+		class EditableScope;
+
 		/// Returns the current context for the calling thread.
 		static const Context *current();
 
 	private :
 
+		friend class EditableScope;
+
+		// Replaces the contents with Borrowed references to the
+		// contents of other. Used to recycle the contexts used
+		// by EditableScope.
+		void borrow( const Context &other );
+		// Removes all entries.
+		void clear();
+
 		void substituteInternal( const char *s, std::string &result, const int recursionDepth, unsigned substitutions ) const;
 
 		// Storage for each entry.
@@ -248,6 +261,12 @@ class Context : public IECore::RefCounted
 			// And use this ownership flag to tell us when we need to do explicit
 			// reference count management.
 			Ownership ownership;
+			// The hash of this entry alone, computed lazily by Context::hash()
+			// and reset to the default value whenever the entry changes. Since
+			// copies of a context inherit these, rehashing a copy in which
+			// a single variable has been modified requires only that variable
+			// to be hashed again.
+			mutable IECore::MurmurHash hash;
 		};
 
 		typedef boost::container::flat_map<IECore::InternedString, Storage> Map;
@@ -261,6 +280,54 @@ class Context : public IECore::RefCounted
 
 IE_CORE_DECLAREPTR( Context );
 
+/// The EditableScope class provides a cheap way of making a
+/// temporary modified copy of a context current on the calling
+/// thread. It is intended for use in hot loops within compute()
+/// and hash() methods, and is equivalent to constructing a
+/// Borrowed copy of the context, modifying it and then making it
+/// current via a Scope, but without the heap allocation and
+/// reference counting overhead of a separate Context.
+///
+/// Because the copy is Borrowed, the same constraints apply as
+/// for `Context( context, Borrowed )` - the source context must
+/// outlive the EditableScope, and the edited context must not be
+/// used by client code once the EditableScope is destroyed. The
+/// edited context is a genuine heap allocated and reference counted
+/// Context, recycled from a per-thread pool, so it is safe for it to
+/// be reference counted while current (as happens when it is passed
+/// to Python).
+class Context::EditableScope : boost::noncopyable
+{
+
+	public :
+
+		/// Makes a Borrowed copy of context current, ready for editing.
+		EditableScope( const Context *context );
+		/// Destruction of the EditableScope pops the edited context.
+		~EditableScope();
+
+		template<typename T>
+		void set( const IECore::InternedString &name, const T &value );
+
+		void setFrame( float frame );
+		void setTime( float timeInSeconds );
+
+		void remove( const IECore::InternedString &name );
+
+		/// Returns the edited context.
+		const Context *context() const;
+
+	private :
+
+		static ContextPtr acquireContext( const Context *context );
+
+		// Declaration order is important - m_scope must
+		// be destroyed before m_context.
+		ContextPtr m_context;
+		Scope m_scope;
+
+};
+
 } // namespace Gaffer
 
 #include "Gaffer/Context.inl"
@@ -181,6 +181,7 @@ void Context::set( const IECore::InternedString &name, const T &value )
 	Storage &s = m_map[name];
 	if( Accessor<T>().set( s, value ) )
 	{
+		s.hash = IECore::MurmurHash();
 		m_hashValid = false;
 		if( m_changedSignal )
 		{
@@ -211,6 +212,17 @@ typename Context::Accessor<T>::ResultType Context::get( const IECore::InternedSt
 	return Accessor<T>().get( it->second.data );
 }
 
+template<typename T>
+void Context::EditableScope::set( const IECore::InternedString &name, const T &value )
+{
+	m_context->set( name, value );
+}
+
+inline const Context *Context::EditableScope::context() const
+{
+	return m_context.get();
+}
+
 } // namespace Gaffer
 
 #endif // GAFFER_CONTEXT_INL
@@ -68,6 +68,14 @@ class DependencyNode : public Node
 		/// leaf level plugs only. Implementations of this method should call the base class
 		/// implementation first.
 		virtual void affects( const Plug *input, AffectedPlugsContainer &outputs ) const = 0;
+		/// Must return true if the results of affects() may vary with the
+		/// values of plugs rather than depending solely on the structure of
+		/// the graph. Dirty propagation caches the plugs affected by each
+		/// input until the graph is next edited, but must avoid doing so
+		/// through nodes which return true. The default implementation
+		/// returns false, and implementations of affects() are strongly
+		/// encouraged to depend only on the graph structure.
+		virtual bool affectsDependsOnValues() const;
 
 		/// @name Enable/Disable Behaviour
 		/// DependencyNodes can optionally define a means of being enabled and disabled.
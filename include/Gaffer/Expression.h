@@ -45,6 +45,7 @@ namespace Gaffer
 {
 
 IE_CORE_FORWARDDECLARE( StringPlug )
+IE_CORE_FORWARDDECLARE( Context )
 
 class Expression : public ComputeNode
 {
@@ -115,7 +116,11 @@ class Expression : public ComputeNode
 				/// Executes the last parsed expression in the specified context, using the values
 				/// provided by proxyInputs and returning an array containing a value for
 				/// each output plug. The results returned will later be passed to apply()
-				/// to apply them to each of the individual output plugs.
+				/// to apply them to each of the individual output plugs. The context contains
+				/// only the variables returned by parse(), with any others removed and the
+				/// frame and frame rate reset to their defaults unless they were requested,
+				/// so that results may be shared between all contexts which differ only in
+				/// variables the expression doesn't access.
 				/// \threading This function may be called concurrently.
 				virtual IECore::ConstObjectVectorPtr execute( const Context *context, const std::vector<const ValuePlug *> &proxyInputs ) const = 0;
 				//@}
@@ -208,6 +213,10 @@ class Expression : public ComputeNode
 		ObjectVectorPlug *executePlug();
 		const ObjectVectorPlug *executePlug() const;
 
+		// Returns a copy of context containing only the variables
+		// in m_contextNames, for passing to Engine::execute().
+		ConstContextPtr executionContext( const Context *context ) const;
+
 		void updatePlugs( const std::vector<ValuePlug *> &inPlugs, const std::vector<ValuePlug *> &outPlugs );
 		void updatePlug( ValuePlug *parentPlug, size_t childIndex, ValuePlug *plug );
 		void removeChildren( ValuePlug *parentPlug, size_t startChildIndex );
@@ -246,6 +246,7 @@ class GraphComponent : public IECore::RunTimeTyped, public boost::signals::track
 		void setNameInternal( const IECore::InternedString &name );
 		void addChildInternal( GraphComponentPtr child );
 		void removeChildInternal( GraphComponentPtr child, bool emitParentChanged );
+		const GraphComponent *getChildInternal( const IECore::InternedString &name ) const;
 
 		/// \todo The memory overhead of all these signals may become too great.
 		/// At this point we need to reimplement the signal returning functions to
@@ -262,6 +263,12 @@ class GraphComponent : public IECore::RunTimeTyped, public boost::signals::track
 		GraphComponent *m_parent;
 		ChildContainer m_children;
 
+		// Index used to accelerate access to children by name
+		// and the generation of unique names. It is only
+		// created for components with many children.
+		class ChildIndex;
+		ChildIndex *m_childIndex;
+
 };
 
 } // namespace Gaffer
@@ -53,14 +53,7 @@ T *GraphComponent::getChild( const IECore::InternedString &name )
 template<typename T>
 const T *GraphComponent::getChild( const IECore::InternedString &name ) const
 {
-	for( ChildContainer::const_iterator it=m_children.begin(), eIt=m_children.end(); it!=eIt; it++ )
-	{
-		if( (*it)->m_name==name )
-		{
-			return IECore::runTimeCast<const T>( it->get() );
-		}
-	}
-	return 0;
+	return IECore::runTimeCast<const T>( getChildInternal( name ) );
 }
 
 template<typename T>
@@ -96,16 +89,7 @@ const T *GraphComponent::descendant( const std::string &relativePath ) const
 	const GraphComponent *result = this;
 	for( Tokenizer::iterator tIt=t.begin(); tIt!=t.end(); tIt++ )
 	{
-		const GraphComponent *child = 0;
-		IECore::InternedString internedName( *tIt );
-		for( ChildContainer::const_iterator it=result->m_children.begin(), eIt=result->m_children.end(); it!=eIt; it++ )
-		{
-			if( (*it)->m_name==internedName )
-			{
-				child = it->get();
-				break;
-			}
-		}
+		const GraphComponent *child = result->getChildInternal( IECore::InternedString( *tIt ) );
 		if( !child )
 		{
 			return 0;
@@ -73,6 +73,15 @@ class Loop : public BaseType
 		StringPlug *indexVariablePlug();
 		const StringPlug *indexVariablePlug() const;
 
+		/// Evaluating iteration N of the loop requires iteration N-1, which
+		/// in turn requires iteration N-2 and so on, so evaluating many
+		/// iterations recursively would require a very deep stack. Instead,
+		/// every Nth iteration is evaluated first, in order, as a checkpoint
+		/// which bounds the depth of recursion for the next. A value of 0
+		/// disables checkpointing.
+		IntPlug *checkpointIntervalPlug();
+		const IntPlug *checkpointIntervalPlug() const;
+
 		virtual Gaffer::BoolPlug *enabledPlug();
 		virtual const Gaffer::BoolPlug *enabledPlug() const;
 
@@ -105,6 +114,7 @@ class Loop : public BaseType
 		const ValuePlug *ancestorPlug( const ValuePlug *plug, std::vector<IECore::InternedString> &relativeName ) const;
 		const ValuePlug *descendantPlug( const ValuePlug *plug, const std::vector<IECore::InternedString> &relativeName ) const;
 		const ValuePlug *sourcePlug( const ValuePlug *output, const Context *context, int &sourceLoopIndex, IECore::InternedString &indexVariable ) const;
+		void evaluateCheckpoints( const ValuePlug *plug, const Context *context, const IECore::InternedString &indexVariable, int index, bool computeValues ) const;
 
 		IE_CORE_DECLARERUNTIMETYPEDDESCRIPTION( Loop<BaseType> );
 
@@ -111,6 +111,18 @@ const StringPlug *Loop<BaseType>::indexVariablePlug() const
 	return m_firstPlugIndex ? BaseType::template getChild<StringPlug>( m_firstPlugIndex + 3 ) : NULL;
 }
 
+template<typename BaseType>
+IntPlug *Loop<BaseType>::checkpointIntervalPlug()
+{
+	return m_firstPlugIndex ? BaseType::template getChild<IntPlug>( m_firstPlugIndex + 4 ) : NULL;
+}
+
+template<typename BaseType>
+const IntPlug *Loop<BaseType>::checkpointIntervalPlug() const
+{
+	return m_firstPlugIndex ? BaseType::template getChild<IntPlug>( m_firstPlugIndex + 4 ) : NULL;
+}
+
 template<typename BaseType>
 Gaffer::BoolPlug *Loop<BaseType>::enabledPlug()
 {
@@ -118,7 +130,7 @@ Gaffer::BoolPlug *Loop<BaseType>::enabledPlug()
 	{
 		return p;
 	}
-	return m_firstPlugIndex ? BaseType::template getChild<BoolPlug>( m_firstPlugIndex + 4 ) : NULL;
+	return m_firstPlugIndex ? BaseType::template getChild<BoolPlug>( m_firstPlugIndex + 5 ) : NULL;
 }
 
 template<typename BaseType>
@@ -128,7 +140,7 @@ const Gaffer::BoolPlug *Loop<BaseType>::enabledPlug() const
 	{
 		return p;
 	}
-	return m_firstPlugIndex ? BaseType::template getChild<BoolPlug>( m_firstPlugIndex + 4 ) : NULL;
+	return m_firstPlugIndex ? BaseType::template getChild<BoolPlug>( m_firstPlugIndex + 5 ) : NULL;
 }
 
 template<typename BaseType>
@@ -189,9 +201,9 @@ void Loop<BaseType>::hash( const ValuePlug *output, const Context *context, IECo
 	{
 		if( index >= 0 )
 		{
-			ContextPtr tmpContext = new Context( *context, Context::Borrowed );
-			tmpContext->set<int>( indexVariable, index );
-			Context::Scope scopedContext( tmpContext.get() );
+			evaluateCheckpoints( plug, context, indexVariable, index, /* computeValues = */ false );
+			Context::EditableScope scope( context );
+			scope.set<int>( indexVariable, index );
 			h = plug->hash();
 		}
 		else
@@ -213,9 +225,9 @@ void Loop<BaseType>::compute( ValuePlug *output, const Context *context ) const
 	{
 		if( index >= 0 )
 		{
-			ContextPtr tmpContext = new Context( *context, Context::Borrowed );
-			tmpContext->set<int>( indexVariable, index );
-			Context::Scope scopedContext( tmpContext.get() );
+			evaluateCheckpoints( plug, context, indexVariable, index, /* computeValues = */ true );
+			Context::EditableScope scope( context );
+			scope.set<int>( indexVariable, index );
 			output->setFrom( plug );
 		}
 		else
@@ -254,6 +266,7 @@ bool Loop<BaseType>::setupPlugs()
 	BaseType::addChild( out->createCounterpart( "previous", Plug::Out ) );
 	BaseType::addChild( new IntPlug( "iterations", Gaffer::Plug::In, 10, 0 ) );
 	BaseType::addChild( new StringPlug( "indexVariable", Gaffer::Plug::In, "loop:index" ) );
+	BaseType::addChild( new IntPlug( "checkpointInterval", Gaffer::Plug::In, 10, 0 ) );
 
 	if( !BaseType::enabledPlug() )
 	{
@@ -396,4 +409,63 @@ const ValuePlug *Loop<BaseType>::sourcePlug( const ValuePlug *output, const Cont
 	return NULL;
 }
 
+template<typename BaseType>
+void Loop<BaseType>::evaluateCheckpoints( const ValuePlug *plug, const Context *context, const IECore::InternedString &indexVariable, int index, bool computeValues ) const
+{
+	// Here `plug` is a descendant of nextPlug(), which we are about to
+	// evaluate for the specified iteration index. This will pull on the
+	// previous iteration, which will pull on the one before that and so on.
+	// Rather than allow that recursion to reach all the way back to the
+	// first iteration, we first evaluate the checkpoint iterations in order,
+	// so that each evaluation bottoms out in the cache at the checkpoint
+	// before it.
+
+	const int interval = checkpointIntervalPlug()->getValue();
+	if( interval <= 0 || index < interval )
+	{
+		return;
+	}
+
+	// We're called for every iteration as the recursion unwinds, but only
+	// need to do the work once per interval - the recursion from other
+	// iterations stops at the nearest checkpoint anyway. When called
+	// for outPlugInternal() we can't rely on that, because the final
+	// iteration needn't be a checkpoint.
+	const bool finalIteration = index == iterationsPlug()->getValue() - 1;
+	if( !finalIteration && ( index + 1 ) % interval )
+	{
+		return;
+	}
+
+	// Find the latest checkpoint which is already cached, so that we only
+	// need to evaluate the checkpoints after it. Typically this is the
+	// checkpoint immediately before `index`, because it was evaluated
+	// by a previous call, so the search is usually constant time rather
+	// than proportional to the number of checkpoints.
+	Context::EditableScope scope( context );
+	int first = interval - 1;
+	for( int i = ( index / interval ) * interval - 1; i >= interval - 1; i -= interval )
+	{
+		scope.set<int>( indexVariable, i );
+		if( plug->isCached( computeValues ) )
+		{
+			first = i + interval;
+			break;
+		}
+	}
+
+	for( int i = first; i < index; i += interval )
+	{
+		scope.set<int>( indexVariable, i );
+		if( computeValues )
+		{
+			plug->getObjectValue();
+		}
+		else
+		{
+			plug->hash();
+		}
+	}
+}
+
 } // namespace Gaffer
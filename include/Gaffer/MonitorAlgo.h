@@ -55,9 +55,11 @@ enum PerformanceMetric
 	PerHashDuration,
 	PerComputeDuration,
 	HashesPerCompute,
+	WaitCount,
+	WaitDuration,
 
 	First = HashCount,
-	Last = HashesPerCompute
+	Last = WaitDuration
 };
 
 std::string formatStatistics( const PerformanceMonitor &monitor, size_t maxLinesPerMetric = 50 );
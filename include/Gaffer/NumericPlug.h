@@ -86,6 +86,10 @@ class NumericPlug : public ValuePlug
 		/// See comments in TypedObjectPlug::getValue() for details of
 		/// the optional precomputedHash argument - and use with care!
 		T getValue( const IECore::MurmurHash *precomputedHash = NULL ) const;
+		/// Returns the values in each of the specified contexts,
+		/// computing them in parallel. See ValuePlug::hashes() for
+		/// threading restrictions.
+		void getValues( const std::vector<const Context *> &contexts, std::vector<T> &values ) const;
 
 		virtual void setFrom( const ValuePlug *other );
 
@@ -54,7 +54,12 @@ namespace Gaffer
 IE_CORE_FORWARDDECLARE( Plug )
 
 /// A monitor which collects statistics about the frequency
-/// of hash and compute processes per plug.
+/// of hash and compute processes per plug. It also records the
+/// number of computes which were avoided by waiting for another
+/// thread to perform an identical compute. The hashes of
+/// TaskPlugs are included too, so the monitor reports the
+/// number of task hashes performed by a Dispatcher, and the
+/// time spent computing them.
 class PerformanceMonitor : public Monitor
 {
 
@@ -70,13 +75,19 @@ class PerformanceMonitor : public Monitor
 				size_t hashCount = 0,
 				size_t computeCount = 0,
 				boost::chrono::nanoseconds hashDuration = boost::chrono::nanoseconds( 0 ),
-				boost::chrono::nanoseconds computeDuration = boost::chrono::nanoseconds( 0 )
+				boost::chrono::nanoseconds computeDuration = boost::chrono::nanoseconds( 0 ),
+				size_t waitCount = 0,
+				boost::chrono::nanoseconds waitDuration = boost::chrono::nanoseconds( 0 )
 			);
 
 			size_t hashCount;
 			size_t computeCount;
 			boost::chrono::nanoseconds hashDuration;
 			boost::chrono::nanoseconds computeDuration;
+			/// The number of times a thread waited for another
+			/// thread's compute rather than performing its own.
+			size_t waitCount;
+			boost::chrono::nanoseconds waitDuration;
 
 			Statistics & operator += ( const Statistics &rhs );
 
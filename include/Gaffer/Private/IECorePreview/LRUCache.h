@@ -92,7 +92,12 @@ class LRUCache : private boost::noncopyable
 		/// if the cost exceeds the maximum cost for the cache. Note that even
 		/// when true is returned, the item may be removed from the cache by a
 		/// subsequent (or concurrent) operation.
-		bool set( const Key &key, const Value &value, Cost cost );
+		///
+		/// The priority determines how many additional sweeps of the
+		/// eviction process an unused item will survive, allowing items
+		/// which are expensive to recreate to be retained in preference
+		/// to items which are cheap to recreate.
+		bool set( const Key &key, const Value &value, Cost cost, unsigned char priority = 0 );
 
 		/// Returns true if the object is in the cache. Note that the
 		/// return value may be invalidated immediately by operations performed
@@ -147,6 +152,8 @@ class LRUCache : private boost::noncopyable
 
 			char status; // status of this item
 			bool recentlyUsed;
+			unsigned char priority; // number of unused sweeps to survive
+			unsigned char chances; // number of unused sweeps remaining
 		};
 
 		// Map from keys to items - this forms the basis of
@@ -357,7 +364,7 @@ class LRUCache : private boost::noncopyable
 		// These methods set/erase a cached value, updating the current
 		// cost appropriately. The caller must hold the lock for the bin
 		// containing the value.
-		bool setInternal( MapValue &mapValue, const Value &value, Cost cost );
+		bool setInternal( MapValue &mapValue, const Value &value, Cost cost, unsigned char priority );
 		bool eraseInternal( MapValue &mapValue );
 
 		// When our current cost goes over the limit, we must discard
@@ -47,13 +47,13 @@ namespace IECorePreview
 
 template<typename Key, typename Value>
 LRUCache<Key, Value>::CacheEntry::CacheEntry()
-	:	value(), cost( 0 ), status( New ), recentlyUsed( false )
+	:	value(), cost( 0 ), status( New ), recentlyUsed( false ), priority( 0 ), chances( 0 )
 {
 }
 
 template<typename Key, typename Value>
 LRUCache<Key, Value>::CacheEntry::CacheEntry( const CacheEntry &other )
-	:	value( other.value ), cost( other.cost ), status( other.status ), recentlyUsed( other.recentlyUsed )
+	:	value( other.value ), cost( other.cost ), status( other.status ), recentlyUsed( other.recentlyUsed ), priority( other.priority ), chances( other.chances )
 {
 }
 
@@ -163,7 +163,7 @@ Value LRUCache<Key, Value>::get( const Key& key )
 		assert( cacheEntry.status != Cached ); // this would indicate that another thread somehow
 		assert( cacheEntry.status != Failed ); // loaded the same thing as us, which is not the intention.
 
-		setInternal( *handle, value, cost );
+		setInternal( *handle, value, cost, 0 );
 
 		assert( cacheEntry.status == Cached || cacheEntry.status == TooCostly );
 
@@ -186,12 +186,12 @@ Value LRUCache<Key, Value>::get( const Key& key )
 }
 
 template<typename Key, typename Value>
-bool LRUCache<Key, Value>::set( const Key &key, const Value &value, Cost cost )
+bool LRUCache<Key, Value>::set( const Key &key, const Value &value, Cost cost, unsigned char priority )
 {
 	Handle handle;
 	handle.acquire( this, key, /* write = */ true, /* createIfMissing = */ true );
 
-	const bool result = setInternal( *handle, value, cost );
+	const bool result = setInternal( *handle, value, cost, priority );
 
 	handle.release();
 	limitCost();
@@ -222,7 +222,7 @@ bool LRUCache<Key, Value>::erase( const Key &key )
 }
 
 template<typename Key, typename Value>
-bool LRUCache<Key, Value>::setInternal( MapValue &mapValue, const Value &value, Cost cost )
+bool LRUCache<Key, Value>::setInternal( MapValue &mapValue, const Value &value, Cost cost, unsigned char priority )
 {
 	// Erase the old value, adjusting the current cost.
 	eraseInternal( mapValue );
@@ -237,6 +237,8 @@ bool LRUCache<Key, Value>::setInternal( MapValue &mapValue, const Value &value,
 		cacheEntry.cost = cost;
 		cacheEntry.status = Cached;
 		cacheEntry.recentlyUsed = true;
+		cacheEntry.priority = priority;
+		cacheEntry.chances = priority;
 		m_currentCost += cost;
 	}
 	else
@@ -289,19 +291,26 @@ void LRUCache<Key, Value>::limitCost()
 	size_t numFullCycles = 0;
 	while( m_currentCost > m_maxCost && handle.valid() && numFullCycles < 100 )
 	{
-		if( !handle->second.recentlyUsed )
+		CacheEntry &cacheEntry = handle->second;
+		if( cacheEntry.recentlyUsed )
 		{
-			eraseInternal( *handle );
-			handle.eraseAndIncrement();
+			// We'll erase this guy once he has gone
+			// unused for more sweeps than his priority
+			// allows.
+			cacheEntry.recentlyUsed = false;
+			cacheEntry.chances = cacheEntry.priority;
+			handle.increment();
 		}
-		else
+		else if( cacheEntry.chances )
 		{
-			// We'll erase this guy text time round,
-			// if he hasn't been used by some other
-			// thread by then.
-			handle->second.recentlyUsed = false;
+			cacheEntry.chances--;
 			handle.increment();
 		}
+		else
+		{
+			eraseInternal( *handle );
+			handle.eraseAndIncrement();
+		}
 		if( !handle.valid() )
 		{
 			// We're at the end but may not have
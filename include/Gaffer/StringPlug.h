@@ -76,6 +76,10 @@ class StringPlug : public ValuePlug
 		/// for details of the optional precomputedHash argument - and use
 		/// with care!
 		std::string getValue( const IECore::MurmurHash *precomputedHash = NULL ) const;
+		/// Returns the values in each of the specified contexts,
+		/// computing them in parallel. See ValuePlug::hashes() for
+		/// threading restrictions.
+		void getValues( const std::vector<const Context *> &contexts, std::vector<std::string> &values ) const;
 
 		virtual void setFrom( const ValuePlug *other );
 
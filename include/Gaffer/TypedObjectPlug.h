@@ -108,6 +108,11 @@ class TypedObjectPlug : public ValuePlug
 		/// avoids unnecessary conversions, but it also avoids churn in
 		/// the ValuePlug cache.
 		ConstValuePtr getValue( const IECore::MurmurHash *precomputedHash = NULL ) const;
+		/// Returns the values in each of the specified contexts,
+		/// computing them in parallel. As for getValue(), the
+		/// values must not be modified. See ValuePlug::hashes()
+		/// for threading restrictions.
+		void getValues( const std::vector<const Context *> &contexts, std::vector<ConstValuePtr> &values ) const;
 
 		virtual void setFrom( const ValuePlug *other );
 
@@ -101,6 +101,18 @@ typename TypedObjectPlug<T>::ConstValuePtr TypedObjectPlug<T>::getValue( const I
 	return boost::static_pointer_cast<const ValueType>( getObjectValue( precomputedHash ) );
 }
 
+template<class T>
+void TypedObjectPlug<T>::getValues( const std::vector<const Context *> &contexts, std::vector<ConstValuePtr> &values ) const
+{
+	std::vector<IECore::ConstObjectPtr> objects;
+	getObjectValues( contexts, objects );
+	values.resize( objects.size() );
+	for( size_t i = 0, e = objects.size(); i < e; ++i )
+	{
+		values[i] = boost::static_pointer_cast<const ValueType>( objects[i] );
+	}
+}
+
 template<class T>
 void TypedObjectPlug<T>::setFrom( const ValuePlug *other )
 {
@@ -102,6 +102,18 @@ T TypedPlug<T>::getValue( const IECore::MurmurHash *precomputedHash ) const
 	return static_cast<const DataType *>( o.get() )->readable();
 }
 
+template<class T>
+void TypedPlug<T>::getValues( const std::vector<const Context *> &contexts, std::vector<T> &values ) const
+{
+	std::vector<IECore::ConstObjectPtr> objects;
+	getObjectValues( contexts, objects );
+	values.resize( objects.size() );
+	for( size_t i = 0, e = objects.size(); i < e; ++i )
+	{
+		values[i] = static_cast<const DataType *>( objects[i].get() )->readable();
+	}
+}
+
 template<class T>
 void TypedPlug<T>::setFrom( const ValuePlug *other )
 {
@@ -38,6 +38,9 @@
 #ifndef GAFFER_VALUEPLUG_H
 #define GAFFER_VALUEPLUG_H
 
+#include <map>
+#include <vector>
+
 #include "IECore/Object.h"
 
 #include "Gaffer/Plug.h"
@@ -46,6 +49,10 @@ namespace Gaffer
 {
 
 IE_CORE_FORWARDDECLARE( DependencyNode )
+IE_CORE_FORWARDDECLARE( Context )
+
+template<typename BaseType>
+class Loop;
 
 /// The Plug base class defines the concept of a connection
 /// point with direction. The ValuePlug class extends this concept
@@ -99,6 +106,15 @@ class ValuePlug : public Plug
 		virtual IECore::MurmurHash hash() const;
 		/// Convenience function to append the hash to h.
 		void hash( IECore::MurmurHash &h ) const;
+		/// Computes the hash of this plug in each of the specified
+		/// contexts, in parallel. This is equivalent to calling hash()
+		/// within a Context::Scope for each context in turn.
+		/// \threading This spawns TBB tasks, so a ComputeNode calling it
+		/// from compute() must return ValuePlug::TaskParallel from
+		/// ComputeNode::computeCachePolicy() for that output. The same
+		/// applies to getObjectValues() and the getValues() methods of
+		/// derived classes.
+		void hashes( const std::vector<const Context *> &contexts, std::vector<IECore::MurmurHash> &hashes ) const;
 
 		/// @name Cache management
 		/// ValuePlug optimises repeated computation by storing a cache of
@@ -106,12 +122,151 @@ class ValuePlug : public Plug
 		/// of the cache.
 		////////////////////////////////////////////////////////////////////
 		//@{
+		/// Policies which determine how cached values are computed when
+		/// several threads request the same value at the same time. The
+		/// policy for each output plug is provided by
+		/// ComputeNode::computeCachePolicy().
+		enum CachePolicy
+		{
+			/// The first thread to request a value performs the
+			/// computation, and any other threads requesting the
+			/// same value wait for the result rather than computing
+			/// it again themselves. Threads don't wait while any
+			/// TaskParallel computation is in progress, but compute
+			/// the value redundantly instead.
+			Standard,
+			/// Each requesting thread performs the computation
+			/// independently. This must be used by any computation which
+			/// spawns TBB tasks, because waiting for such computations
+			/// can deadlock when TBB's work stealing nests unrelated
+			/// tasks inside them.
+			TaskParallel
+		};
+		/// Hints describing the cost of recomputing a value relative
+		/// to the memory needed to cache it. When the cache is full,
+		/// values which are expensive to recompute are retained in
+		/// preference to those which are cheap to recompute. The hint
+		/// for each output plug is provided by ComputeNode::computeCacheCost().
+		enum ComputeCost
+		{
+			/// The cost is determined by measuring the time taken by
+			/// the computation relative to the memory used by the result.
+			MeasuredCost,
+			/// The value is cheap to recompute. It will be among the
+			/// first to be evicted from the cache, and will not be cached
+			/// at all if it would occupy a significant fraction of the
+			/// cache.
+			CheapCost,
+			/// The value is expensive to recompute, and will be retained
+			/// in preference to all others.
+			ExpensiveCost
+		};
 		/// Returns the maximum amount of memory in bytes to use for the cache.
 		static size_t getCacheMemoryLimit();
 		/// Sets the maximum amount of memory the cache may use in bytes.
 		static void setCacheMemoryLimit( size_t bytes );
 		/// Returns the current memory usage of the cache in bytes.
 		static size_t cacheMemoryUsage();
+
+		/// Statistics describing the use of the cache by the
+		/// values computed for a particular plug on a particular
+		/// type of node.
+		struct CacheStatistics
+		{
+
+			CacheStatistics(
+				size_t entries = 0,
+				size_t memoryUsage = 0,
+				size_t hits = 0,
+				size_t misses = 0
+			);
+
+			/// The number of values currently in the cache.
+			size_t entries;
+			/// The memory used by those values, in bytes.
+			size_t memoryUsage;
+			/// The number of times a value was found in the cache.
+			size_t hits;
+			/// The number of times a value had to be computed.
+			size_t misses;
+
+			CacheStatistics & operator += ( const CacheStatistics &rhs );
+
+			bool operator == ( const CacheStatistics &rhs ) const;
+			bool operator != ( const CacheStatistics &rhs ) const;
+
+		};
+
+		/// Key is the pair ( node type name, plug name relative to the node ).
+		typedef std::pair<std::string, std::string> CacheStatisticsKey;
+		typedef std::map<CacheStatisticsKey, CacheStatistics> CacheStatisticsMap;
+
+		/// Turns the gathering of cache statistics on or off. Statistics
+		/// are off by default, because gathering them adds overhead to
+		/// every computation.
+		static void setCacheStatisticsEnabled( bool enabled );
+		static bool getCacheStatisticsEnabled();
+		/// Returns statistics for the cache, broken down by node type and
+		/// plug name. Where several plugs compute the same value, as is
+		/// the case for pass-throughs, the cache entry is attributed to
+		/// the plug which computed it first. Only the entries stored while
+		/// statistics were enabled are included.
+		/// \threading Must not be called while computations are being
+		/// performed on other threads.
+		static CacheStatisticsMap cacheStatistics();
+		/// Resets the hit and miss counts for all plugs.
+		/// \threading Must not be called while computations are being
+		/// performed on other threads.
+		static void resetCacheStatistics();
+		/// Returns the maximum number of entries in the hash cache.
+		/// The hash cache is shared by all threads, and stores the
+		/// results of recent calls to hash(). It is cleared whenever
+		/// a plug is dirtied.
+		static size_t getHashCacheSizeLimit();
+		/// Sets the maximum number of entries in the hash cache. When
+		/// the limit is exceeded, the least recently used entries are
+		/// discarded.
+		static void setHashCacheSizeLimit( size_t maxEntries );
+		/// Returns the current number of entries in the hash cache.
+		static size_t hashCacheSize();
+		/// Returns the total number of hash cache lookups which have
+		/// found an existing entry.
+		static size_t hashCacheHits();
+		/// Returns the total number of hash cache lookups which have
+		/// required the hash to be computed.
+		static size_t hashCacheMisses();
+		//@}
+
+		/// @name Disk cache management
+		/// ValuePlug can optionally store computed values in files on disk,
+		/// as a second tier behind the in-memory cache. Files are named
+		/// using the hash of the value, so they may be shared between
+		/// processes running on the same machine, and between successive
+		/// runs of the same process. The disk cache is only used when a
+		/// directory has been specified and plugs of the computed type
+		/// have been enabled explicitly.
+		///
+		/// > Caution : It is only valid to enable the disk cache for plugs
+		/// > whose hashes are stable between processes - ComputeNode::hash()
+		/// > must not depend on anything which is not captured by the graph
+		/// > and context, such as pointer addresses.
+		////////////////////////////////////////////////////////////////////
+		//@{
+		/// Sets the directory used to store values. This is created if it
+		/// doesn't exist already. An empty string disables the disk cache.
+		static void setDiskCacheDirectory( const std::string &directory );
+		static std::string getDiskCacheDirectory();
+		/// Sets the maximum total size of the files in the disk cache.
+		/// When the limit is exceeded, the least recently used files are
+		/// removed.
+		static void setDiskCacheSizeLimit( size_t bytes );
+		static size_t getDiskCacheSizeLimit();
+		/// Returns the total size in bytes of the files in the disk cache.
+		static size_t diskCacheSize();
+		/// Enables or disables the disk cache for plugs of the specified
+		/// type. Only plugs whose typeId() matches exactly are affected.
+		static void setDiskCacheEnabled( IECore::TypeId plugType, bool enabled );
+		static bool getDiskCacheEnabled( IECore::TypeId plugType );
 		//@}
 
 	protected :
@@ -149,6 +304,13 @@ class ValuePlug : public Plug
 		/// it again unnecessarily. Passing an incorrect hash has dire consequences, so
 		/// use with care.
 		IECore::ConstObjectPtr getObjectValue( const IECore::MurmurHash *precomputedHash = NULL ) const;
+		/// Equivalent to calling getObjectValue() within a Context::Scope
+		/// for each of the specified contexts, but performs the computations
+		/// in parallel, and performs only one computation for contexts which
+		/// yield the same hash. This is intended for use by derived classes
+		/// implementing a getValues() method. See hashes() for threading
+		/// restrictions.
+		void getObjectValues( const std::vector<const Context *> &contexts, std::vector<IECore::ConstObjectPtr> &values ) const;
 		/// Should be called by derived classes when they wish to set the plug
 		/// value - the value is referenced directly (not copied) and so must
 		/// not be changed following the call.
@@ -159,10 +321,20 @@ class ValuePlug : public Plug
 
 	private :
 
+		// Loop needs to evaluate arbitrary plugs from
+		// the loop body when evaluating iteratively.
+		template<typename BaseType>
+		friend class Loop;
+
 		class HashProcess;
 		class ComputeProcess;
 		class SetValueAction;
 
+		// Returns true if the hash for the current context is available
+		// from the cache, along with the value too if `value` is true.
+		// Used by Loop to find evaluations which won't recurse upstream.
+		bool isCached( bool value ) const;
+
 		void setValueInternal( IECore::ConstObjectPtr value, bool propagateDirtiness );
 		void childAddedOrRemoved();
 		// Emits the appropriate Node::plugSetSignal() for this plug and all its
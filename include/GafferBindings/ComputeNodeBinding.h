@@ -129,6 +129,52 @@ class ComputeNodeWrapper : public DependencyNodeWrapper<WrappedType>
 			WrappedType::compute( output, context );
 		}
 
+		virtual Gaffer::ValuePlug::CachePolicy computeCachePolicy( const Gaffer::ValuePlug *output ) const
+		{
+			if( this->isSubclassed() )
+			{
+				IECorePython::ScopedGILLock gilLock;
+				try
+				{
+					boost::python::object f = this->methodOverride( "computeCachePolicy" );
+					if( f )
+					{
+						return boost::python::extract<Gaffer::ValuePlug::CachePolicy>(
+							f( Gaffer::ValuePlugPtr( const_cast<Gaffer::ValuePlug *>( output ) ) )
+						);
+					}
+				}
+				catch( const boost::python::error_already_set &e )
+				{
+					translatePythonException();
+				}
+			}
+			return WrappedType::computeCachePolicy( output );
+		}
+
+		virtual Gaffer::ValuePlug::ComputeCost computeCacheCost( const Gaffer::ValuePlug *output ) const
+		{
+			if( this->isSubclassed() )
+			{
+				IECorePython::ScopedGILLock gilLock;
+				try
+				{
+					boost::python::object f = this->methodOverride( "computeCacheCost" );
+					if( f )
+					{
+						return boost::python::extract<Gaffer::ValuePlug::ComputeCost>(
+							f( Gaffer::ValuePlugPtr( const_cast<Gaffer::ValuePlug *>( output ) ) )
+						);
+					}
+				}
+				catch( const boost::python::error_already_set &e )
+				{
+					translatePythonException();
+				}
+			}
+			return WrappedType::computeCacheCost( output );
+		}
+
 };
 
 } // namespace GafferBindings
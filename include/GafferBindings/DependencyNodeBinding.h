@@ -121,6 +121,28 @@ class DependencyNodeWrapper : public NodeWrapper<WrappedType>
 			WrappedType::affects( input, outputs );
 		}
 
+		virtual bool affectsDependsOnValues() const
+		{
+			if( this->isSubclassed() )
+			{
+				// We have no way of knowing what an affects() implementation
+				// written in Python might depend on, so we must be conservative.
+				IECorePython::ScopedGILLock gilLock;
+				try
+				{
+					if( this->methodOverride( "affects" ) )
+					{
+						return true;
+					}
+				}
+				catch( const boost::python::error_already_set &e )
+				{
+					translatePythonException();
+				}
+			}
+			return WrappedType::affectsDependsOnValues();
+		}
+
 		virtual Gaffer::BoolPlug *enabledPlug()
 		{
 			if( this->isSubclassed() )
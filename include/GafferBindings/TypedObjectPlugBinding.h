@@ -40,6 +40,7 @@
 #include "Gaffer/TypedObjectPlug.h"
 
 #include "GafferBindings/PlugBinding.h"
+#include "GafferBindings/ValuePlugBinding.h"
 
 namespace GafferBindings
 {
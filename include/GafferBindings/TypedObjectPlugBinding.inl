@@ -97,6 +97,29 @@ IECore::ObjectPtr getValue( typename T::Ptr p, const IECore::MurmurHash *precomp
 	return NULL;
 }
 
+template<typename T>
+boost::python::list getValues( typename T::Ptr p, const boost::python::object &pythonContexts, bool copy=true )
+{
+	std::vector<const Gaffer::Context *> contexts;
+	contextsFromPython( pythonContexts, contexts );
+
+	std::vector<typename T::ConstValuePtr> values;
+	{
+		// Must release GIL in case computation spawns threads which need
+		// to reenter Python.
+		IECorePython::ScopedGILRelease r;
+		p->getValues( contexts, values );
+	}
+
+	boost::python::list result;
+	for( typename std::vector<typename T::ConstValuePtr>::const_iterator it = values.begin(), eIt = values.end(); it != eIt; ++it )
+	{
+		IECore::ObjectPtr v = copy ? (*it)->copy() : boost::const_pointer_cast<typename T::ValueType>( *it );
+		result.append( v );
+	}
+	return result;
+}
+
 template<typename T>
 typename T::ValuePtr defaultValue( typename T::Ptr p, bool copy )
 {
@@ -143,6 +166,7 @@ TypedObjectPlugClass<T, TWrapper>::TypedObjectPlugClass( const char *docString )
 	this->def( "defaultValue", &Detail::defaultValue<T>, ( boost::python::arg_( "_copy" ) = true ) );
 	this->def( "setValue", Detail::setValue<T>, ( boost::python::arg_( "value" ), boost::python::arg_( "_copy" ) = true ) );
 	this->def( "getValue", Detail::getValue<T>, ( boost::python::arg_( "_precomputedHash" ) = boost::python::object(), boost::python::arg_( "_copy" ) = true ) );
+	this->def( "getValues", Detail::getValues<T>, ( boost::python::arg_( "contexts" ), boost::python::arg_( "_copy" ) = true ) );
 
 	boost::python::scope s = *this;
 
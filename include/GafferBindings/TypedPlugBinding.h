@@ -38,6 +38,7 @@
 #define GAFFERBINDINGS_TYPEDPLUGBINDING_H
 
 #include "GafferBindings/PlugBinding.h"
+#include "GafferBindings/ValuePlugBinding.h"
 
 namespace GafferBindings
 {
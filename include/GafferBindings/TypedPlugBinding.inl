@@ -63,6 +63,29 @@ static typename T::ValueType getValue( const T *plug, const IECore::MurmurHash *
 	return plug->getValue( precomputedHash );
 }
 
+template<typename T>
+static boost::python::list getValues( const T *plug, const boost::python::object &pythonContexts )
+{
+	std::vector<const Gaffer::Context *> contexts;
+	contextsFromPython( pythonContexts, contexts );
+
+	std::vector<typename T::ValueType> values;
+	{
+		// Must release GIL in case computation spawns threads which need
+		// to reenter Python.
+		IECorePython::ScopedGILRelease r;
+		plug->getValues( contexts, values );
+	}
+
+	boost::python::list result;
+	const std::vector<typename T::ValueType> &constValues = values;
+	for( size_t i = 0, e = constValues.size(); i < e; ++i )
+	{
+		result.append( constValues[i] );
+	}
+	return result;
+}
+
 } // namespace Detail
 
 template<typename T, typename TWrapper>
@@ -84,6 +107,7 @@ TypedPlugClass<T, TWrapper>::TypedPlugClass( const char *docString )
 	this->def( "defaultValue", &T::defaultValue, boost::python::return_value_policy<boost::python::copy_const_reference>() );
 	this->def( "setValue", &Detail::setValue<T> );
 	this->def( "getValue", &Detail::getValue<T>, ( boost::python::arg( "_precomputedHash" ) = boost::python::object() ) );
+	this->def( "getValues", &Detail::getValues<T> );
 }
 
 } // namespace GafferBindings
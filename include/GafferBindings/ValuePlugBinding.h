@@ -46,6 +46,11 @@ namespace GafferBindings
 
 void bindValuePlug();
 
+/// Extracts Contexts from a python sequence, for use with ValuePlug::hashes()
+/// and the getValues() methods of derived classes. The sequence holds the only
+/// references to the Contexts, so must outlive the use of the result.
+void contextsFromPython( const boost::python::object &contexts, std::vector<const Gaffer::Context *> &result );
+
 /// Supports the following Context variables :
 ///
 /// "valuePlugSerialiser:resetParentPlugDefaults"
@@ -49,6 +49,7 @@
 #include "IECore/RunTimeTyped.h"
 
 #include "Gaffer/NumericPlug.h"
+#include "Gaffer/TypedPlug.h"
 
 #include "GafferDispatch/TaskNode.h"
 #include "GafferDispatchBindings/DispatcherBinding.h" // to enable friend declaration for TaskBatch.
@@ -153,6 +154,18 @@ class Dispatcher : public Gaffer::Node
 		virtual IECore::FrameListPtr frameRange( const Gaffer::ScriptNode *script, const Gaffer::Context *context ) const;
 		//@}
 
+		//! @name Batching
+		/// Dispatchers group the frames of each task into batches.
+		//////////////////////////////////////////////////////////
+		//@{
+		/// Returns the maximum number of frames which may be placed in the batch
+		/// created for the task described by plug and context. The default
+		/// implementation returns the value of the node's "dispatcher.batchSize"
+		/// plug. Derived classes may reimplement this to tune batch sizes, for
+		/// instance using the durations of previous dispatches.
+		virtual size_t batchSize( const TaskNode::TaskPlug *plug, const Gaffer::Context *context ) const;
+		//@}
+
 		//! @name Dispatcher Jobs
 		/// Utility functions which derived classes may use when dispatching jobs.
 		//////////////////////////////////////////////////////////////////////////
@@ -169,6 +182,24 @@ class Dispatcher : public Gaffer::Node
 		const std::string jobDirectory() const;
 		//@}
 
+		//! @name Incremental dispatch
+		/// The hash of the most recent successful execution of each task
+		/// is recorded in a file alongside the job directories. When
+		/// incrementalPlug() is on, dispatches skip any batches whose tasks
+		/// have all been executed already with their current hashes, along
+		/// with all their preTasks.
+		//////////////////////////////////////////////////////////////////////////
+		//@{
+		Gaffer::BoolPlug *incrementalPlug();
+		const Gaffer::BoolPlug *incrementalPlug() const;
+		/// Records that the tasks for the specified frames have been executed
+		/// successfully, provided that the current context was created by a
+		/// dispatch. This is called automatically by
+		/// `TaskPlug::execute()` and `TaskPlug::executeSequence()`, and therefore
+		/// works for both local and remote execution.
+		static void recordExecutedTasks( const TaskNode::TaskPlug *plug, const std::vector<float> &frames );
+		//@}
+
 		/// A function which creates a Dispatcher.
 		typedef boost::function<DispatcherPtr ()> Creator;
 		/// SetupPlugsFn may be registered along with a Dispatcher Creator. It will be called by setupPlugs,
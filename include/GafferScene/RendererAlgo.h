@@ -102,6 +102,8 @@ void outputAttributes( const IECore::CompoundObject *attributes, IECore::Rendere
 /// the sampling is performed evenly across the shutter interval, which should have been obtained via
 /// SceneAlgo::shutter(). If all samples turn out to be identical, they will be collapsed automatically
 /// into a single sample. The sampleTimes container is only filled if there is more than one sample.
+/// Samples are computed in parallel using ValuePlug::getValues(), so computes calling this must use the
+/// ValuePlug::TaskParallel cache policy.
 void transformSamples( const ScenePlug *scene, size_t segments, const Imath::V2f &shutter, std::vector<Imath::M44f> &samples, std::set<float> &sampleTimes );
 
 /// Outputs the local transform for the current location, using transformSamples() to generate the samples.
@@ -37,7 +37,6 @@
 
 import re
 import ast
-import functools
 
 import IECore
 
@@ -53,40 +52,64 @@ class PythonExpressionEngine( Gaffer.Expression.Engine ) :
 
 		parser = _Parser( expression )
 
-		self.__expression = expression
-		self.__inPlugPaths = list( parser.plugReads )
-		self.__outPlugPaths = list( parser.plugWrites )
+		inPlugPaths = list( parser.plugReads )
+		outPlugPaths = list( parser.plugWrites )
 
-		inPlugs.extend( [ self.__plug( node, p ) for p in self.__inPlugPaths ] )
-		outPlugs.extend( [ self.__plug( node, p ) for p in self.__outPlugPaths ] )
+		inPlugs.extend( [ self.__plug( node, p ) for p in inPlugPaths ] )
+		outPlugs.extend( [ self.__plug( node, p ) for p in outPlugPaths ] )
 		contextNames.extend( parser.contextReads )
 
+		# Execution is performance critical, so we do as much work as
+		# possible up front. The expression is compiled once, and the
+		# plug paths are turned into a list of the nested dictionaries
+		# needed to represent them, each specified as the index of its
+		# parent dictionary and its key within it. Each input and output
+		# is then specified by the index of its dictionary and its key.
+
+		self.__code = compile( expression, "<string>", "exec" )
+
+		self.__dictionaries = []
+		dictionaryIndices = { () : 0 }
+		def dictionaryIndex( path ) :
+			index = dictionaryIndices.get( path )
+			if index is None :
+				parentIndex = dictionaryIndex( path[:-1] )
+				self.__dictionaries.append( ( parentIndex, path[-1] ) )
+				index = dictionaryIndices[path] = len( self.__dictionaries )
+			return index
+
+		def slot( plugPath ) :
+			path = tuple( plugPath.split( "." ) )
+			return ( dictionaryIndex( path[:-1] ), path[-1] )
+
+		self.__inSlots = [ slot( p ) for p in inPlugPaths ]
+		self.__outSlots = [ slot( p ) for p in outPlugPaths ]
+		self.__outPaths = [ tuple( p.split( "." )[:-1] ) for p in outPlugPaths ]
+
 	def execute( self, context, inputs ) :
 
-		plugDict = {}
-		for plugPath, plug in zip( self.__inPlugPaths, inputs ) :
-			parentDict = plugDict
-			plugPathSplit = plugPath.split( "." )
-			for p in plugPathSplit[:-1] :
-				parentDict = parentDict.setdefault( p, {} )
-			parentDict[plugPathSplit[-1]] = plug.getValue()
+		dictionaries = [ {} ]
+		for parentIndex, key in self.__dictionaries :
+			d = {}
+			dictionaries[parentIndex][key] = d
+			dictionaries.append( d )
 
-		for plugPath in self.__outPlugPaths :
-			parentDict = plugDict
-			for p in plugPath.split( "." )[:-1] :
-				parentDict = parentDict.setdefault( p, {} )
+		for ( index, key ), plug in zip( self.__inSlots, inputs ) :
+			dictionaries[index][key] = plug.getValue()
 
+		plugDict = dictionaries[0]
 		executionDict = { "IECore" : IECore, "parent" : plugDict, "context" : context }
 
-		exec( self.__expression, executionDict, executionDict )
+		exec( self.__code, executionDict, executionDict )
 
 		result = IECore.ObjectVector()
-		for plugPath in self.__outPlugPaths :
+		for path, ( index, key ) in zip( self.__outPaths, self.__outSlots ) :
+			# The expression may have replaced any of the intermediate
+			# dictionaries, so we must look them up again from the root.
 			parentDict = plugDict
-			plugPathSplit = plugPath.split( "." )
-			for p in plugPathSplit[:-1] :
+			for p in path :
 				parentDict = parentDict[p]
-			result.append( parentDict.get( plugPathSplit[-1], IECore.NullObject.defaultNullObject() ) )
+			result.append( parentDict.get( key, _nullObject ) )
 
 		return result
 
@@ -305,12 +328,15 @@ class _Parser( ast.NodeVisitor ) :
 # Functions for setting plug values.
 ##########################################################################
 
-def __typedPlugValueExtractor( plug, topLevelPlug, value, converter = None ) :
+_nullObject = IECore.NullObject.defaultNullObject()
 
-	if converter is not None :
-		return converter( value.value )
-	else :
-		return value.value
+def __typedPlugValueExtractor( plug, topLevelPlug, value ) :
+
+	return value.value
+
+def __intPlugValueExtractor( plug, topLevelPlug, value ) :
+
+	return int( value.value )
 
 def __compoundNumericPlugValueExtractor( plug, topLevelPlug, value ) :
 
@@ -351,7 +377,7 @@ def __defaultValueExtractor( plug, topLevelPlug, value ) :
 	return value
 
 _valueExtractors = {
-	Gaffer.IntPlug : functools.partial( __typedPlugValueExtractor, converter = int ),
+	Gaffer.IntPlug : __intPlugValueExtractor,
 	Gaffer.FloatPlug : __typedPlugValueExtractor,
 	Gaffer.StringPlug : __typedPlugValueExtractor,
 	Gaffer.BoolPlug : __typedPlugValueExtractor,
@@ -367,6 +393,23 @@ _valueExtractors = {
 	Gaffer.Box3iPlug : __boxPlugValueExtractor,
 }
 
+# Combinations of plug type and value type where the value
+# may be applied directly, without any conversion.
+_directValueTypes = {
+	( Gaffer.IntPlug, IECore.IntData ),
+	( Gaffer.FloatPlug, IECore.FloatData ),
+	( Gaffer.FloatPlug, IECore.DoubleData ),
+	( Gaffer.StringPlug, IECore.StringData ),
+	( Gaffer.BoolPlug, IECore.BoolData ),
+}
+
 def _extractPlugValue( plug, topLevelPlug, value ) :
 
-	return _valueExtractors.get( type( topLevelPlug ), __defaultValueExtractor )( plug, topLevelPlug, value )
+	# Fast path for the most common case, where the
+	# expression has assigned a simple value to a simple
+	# plug.
+	plugType = type( topLevelPlug )
+	if ( plugType, type( value ) ) in _directValueTypes :
+		return value.value
+
+	return _valueExtractors.get( plugType, __defaultValueExtractor )( plug, topLevelPlug, value )
@@ -36,9 +36,13 @@
 
 import os
 import errno
+import fcntl
+import json
+import Queue
 import signal
 import shlex
 import subprocess32 as subprocess
+import sys
 import threading
 import time
 import traceback
@@ -48,6 +52,374 @@ import IECore
 import Gaffer
 import GafferDispatch
 
+# A long-lived `gaffer execute -worker` process, which loads the script once
+# and then executes batches one at a time. Provides `pid` in the same way
+# as `subprocess.Popen`. A worker remains busy from `execute()` until
+# `release()` is called, so that it can't be given a new batch until the
+# dispatch thread has finished handling the completion of the last one.
+class _Worker( object ) :
+
+	def __init__( self, args ) :
+
+		self.__process = subprocess.Popen( args, stdin = subprocess.PIPE, stdout = subprocess.PIPE, start_new_session = True )
+		self.__busy = False
+		self.pid = self.__process.pid
+
+	def execute( self, nodeName, frames, contextArgs ) :
+
+		assert( not self.__busy )
+		self.__busy = True
+
+		batch = { "nodes" : [ nodeName ], "frames" : frames, "context" : contextArgs }
+		try :
+			self.__process.stdin.write( repr( batch ) + "\n" )
+			self.__process.stdin.flush()
+		except IOError :
+			# The worker has died. We'll report the failure
+			# from `waitForBatch()` when we see the closed pipe.
+			pass
+
+	def busy( self ) :
+
+		return self.__busy
+
+	def alive( self ) :
+
+		return self.__process.poll() is None
+
+	# Blocks until the current batch has completed,
+	# returning its status. May be called from any thread.
+	def waitForBatch( self ) :
+
+		# An empty line means the worker died mid-batch.
+		return 0 if self.__process.stdout.readline().strip() == "0" else 1
+
+	# Makes the worker available for the next batch. Must only
+	# be called once the result of `waitForBatch()` has been handled.
+	def release( self ) :
+
+		self.__busy = False
+
+	def shutdown( self ) :
+
+		if self.alive() :
+			# Closing stdin asks the worker to exit once any
+			# current batch is complete.
+			self.__process.stdin.close()
+		self.__process.wait()
+
+# The resources used by a single batch, as sampled by a _ResourceMonitor.
+# CPU time and I/O are measured relative to the start of the batch, so that
+# batches executed by the same worker process are accounted separately.
+class _ResourceUsage( object ) :
+
+	def __init__( self, pgid, baseline ) :
+
+		self.pgid = pgid
+		self.startTime = time.time()
+		self.wallTime = 0.0
+		self.cpuTime = 0.0
+		self.pcpu = 0.0
+		self.rss = 0
+		self.peakRSS = 0
+		self.readBytes = 0
+		self.writeBytes = 0
+		# Set by the Job when it reaps the process itself.
+		self.rusage = None
+
+		self.__baseline = baseline or ( 0.0, 0, 0, 0 )
+		self.__lastSampleTime = self.startTime
+		self.__lastCPUTime = 0.0
+
+	def _update( self, sample, sampleTime ) :
+
+		if sample is not None :
+
+			cpuTime, rss, readBytes, writeBytes = sample
+
+			# Processes leave the group as they exit, so the totals
+			# may appear to decrease. We only ever accumulate.
+			self.cpuTime = max( self.cpuTime, cpuTime - self.__baseline[0] )
+			self.readBytes = max( self.readBytes, readBytes - self.__baseline[2] )
+			self.writeBytes = max( self.writeBytes, writeBytes - self.__baseline[3] )
+			self.rss = rss
+			self.peakRSS = max( self.peakRSS, rss )
+
+		if sampleTime > self.__lastSampleTime :
+			self.pcpu = 100.0 * ( self.cpuTime - self.__lastCPUTime ) / ( sampleTime - self.__lastSampleTime )
+		self.__lastSampleTime = sampleTime
+		self.__lastCPUTime = self.cpuTime
+		self.wallTime = sampleTime - self.startTime
+
+	def _updateFromRUsage( self, rusage ) :
+
+		# The rusage for a reaped process is exact, and includes any
+		# children it waited for, so takes precedence over our samples.
+		self.cpuTime = max( self.cpuTime, rusage.ru_utime + rusage.ru_stime )
+		# Linux reports `ru_maxrss` in kilobytes, but OS X reports bytes.
+		peakRSS = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+		self.peakRSS = max( self.peakRSS, peakRSS )
+
+	def statistics( self ) :
+
+		return {
+			"wallTime" : self.wallTime,
+			"cpuTime" : self.cpuTime,
+			"peakRSS" : self.peakRSS,
+			"readBytes" : self.readBytes,
+			"writeBytes" : self.writeBytes,
+		}
+
+# Samples the resources used by the process trees of running batches
+# from `/proc`, on a background thread. On systems without `/proc` only
+# the wall time and the rusage of completed processes are available.
+class _ResourceMonitor( object ) :
+
+	def __init__( self, interval = 0.5 ) :
+
+		self.__interval = interval
+		self.__usages = []
+		self.__lock = threading.Lock()
+		self.__stopped = threading.Event()
+
+		self.__thread = threading.Thread( target = self.__run )
+		self.__thread.daemon = True
+		self.__thread.start()
+
+	def start( self, pgid ) :
+
+		usage = _ResourceUsage( pgid, self.__sample( [ pgid ] ).get( pgid ) )
+		with self.__lock :
+			self.__usages.append( usage )
+
+		return usage
+
+	def stop( self, usage, rusage = None ) :
+
+		with self.__lock :
+			self.__usages.remove( usage )
+
+		usage._update( self.__sample( [ usage.pgid ] ).get( usage.pgid ), time.time() )
+		if rusage is not None :
+			usage._updateFromRUsage( rusage )
+
+		return usage.statistics()
+
+	def usages( self ) :
+
+		with self.__lock :
+			return list( self.__usages )
+
+	def shutdown( self ) :
+
+		self.__stopped.set()
+		self.__thread.join()
+
+	def __run( self ) :
+
+		while not self.__stopped.wait( self.__interval ) :
+			usages = self.usages()
+			samples = self.__sample( [ u.pgid for u in usages ] )
+			now = time.time()
+			for usage in usages :
+				usage._update( samples.get( usage.pgid ), now )
+
+	# Returns a dictionary mapping from process group id to a tuple of
+	# ( cpuTime, rss, readBytes, writeBytes ) summed over the group leader
+	# and all its descendants.
+	@staticmethod
+	def __sample( pgids ) :
+
+		result = {}
+		if not pgids :
+			return result
+
+		ticksPerSecond = float( os.sysconf( "SC_CLK_TCK" ) )
+		pageSize = os.sysconf( "SC_PAGE_SIZE" )
+
+		for pgid in set( pgids ) :
+			for pid in _ResourceMonitor.__processTree( pgid ) :
+				sample = _ResourceMonitor.__sampleProcess( pid, ticksPerSecond, pageSize )
+				if sample is None :
+					continue
+				total = result.get( pgid, ( 0.0, 0, 0, 0 ) )
+				result[pgid] = tuple( t + s for t, s in zip( total, sample ) )
+
+		return result
+
+	# Returns the pids of the process and all its descendants. We follow
+	# the `children` files in `/proc` rather than scanning every process
+	# on the system, so the cost depends only on the size of the tree.
+	@staticmethod
+	def __processTree( pid ) :
+
+		result = []
+		toVisit = [ pid ]
+		while toVisit :
+			pid = toVisit.pop()
+			result.append( pid )
+			try :
+				threadIds = os.listdir( "/proc/%d/task" % pid )
+			except OSError :
+				# The process has exited, or there is no `/proc`.
+				continue
+			for threadId in threadIds :
+				try :
+					with open( "/proc/%d/task/%s/children" % ( pid, threadId ) ) as f :
+						toVisit.extend( int( c ) for c in f.read().split() )
+				except IOError :
+					pass
+
+		return result
+
+	# Returns a tuple of ( cpuTime, rss, readBytes, writeBytes ) for
+	# a single process, or None if it can't be sampled.
+	@staticmethod
+	def __sampleProcess( pid, ticksPerSecond, pageSize ) :
+
+		try :
+			with open( "/proc/%d/stat" % pid ) as f :
+				stat = f.read()
+		except IOError :
+			# The process exited while we were looking
+			return None
+
+		# The command name may contain spaces, so we split after its
+		# closing bracket. fields[0] is then the process state, which
+		# is field 3 in `man proc`.
+		fields = stat[stat.rfind( ")" )+2:].split()
+
+		# utime + stime + cutime + cstime
+		cpuTime = sum( int( f ) for f in fields[11:15] ) / ticksPerSecond
+		rss = int( fields[21] ) * pageSize
+
+		readBytes = writeBytes = 0
+		try :
+			with open( "/proc/%d/io" % pid ) as f :
+				for line in f :
+					name, value = line.split( ":" )
+					if name == "read_bytes" :
+						readBytes = int( value )
+					elif name == "write_bytes" :
+						writeBytes = int( value )
+		except IOError :
+			pass
+
+		return ( cpuTime, rss, readBytes, writeBytes )
+
+# The measured durations of previously executed batches, stored in a file
+# alongside the job directories. Durations are recorded per frame, keyed by
+# the node name and a hash of its task which excludes the frame, so they
+# remain valid when the frame range or batch size changes, but not when the
+# node's settings do.
+class _TaskHistory( object ) :
+
+	__instances = {}
+	__instancesLock = threading.Lock()
+
+	def __init__( self, fileName ) :
+
+		self.__fileName = fileName
+		self.__lock = threading.Lock()
+		self.__durations = {}
+		self.__updates = {}
+		self.__fileVersion = None
+
+	# Returns the history shared by all jobs using the specified file.
+	@classmethod
+	def acquire( cls, fileName ) :
+
+		with cls.__instancesLock :
+			history = cls.__instances.get( fileName )
+			if history is None :
+				history = _TaskHistory( fileName )
+				cls.__instances[fileName] = history
+
+		history.__reload()
+		return history
+
+	@staticmethod
+	def key( plug, context ) :
+
+		context = Gaffer.Context( context )
+		context.setFrame( 0 )
+		with context :
+			taskHash = plug.hash()
+
+		return plug.node().relativeName( plug.ancestor( Gaffer.ScriptNode ) ) + ":" + str( taskHash )
+
+	def frameDuration( self, key ) :
+
+		with self.__lock :
+			return self.__durations.get( key )
+
+	def averageFrameDuration( self ) :
+
+		with self.__lock :
+			if not self.__durations :
+				return None
+			return sum( self.__durations.values() ) / len( self.__durations )
+
+	def record( self, key, frameDuration ) :
+
+		with self.__lock :
+			# Blend with the previous measurement, so that a single
+			# unrepresentative batch doesn't dominate.
+			previous = self.__durations.get( key )
+			if previous is not None :
+				frameDuration = ( previous + frameDuration ) / 2.0
+			self.__durations[key] = frameDuration
+			self.__updates[key] = frameDuration
+
+	def save( self ) :
+
+		with self.__lock :
+			updates = self.__updates
+			self.__updates = {}
+
+		if not updates :
+			return
+
+		# Other jobs may be saving to the same file concurrently, so we merge
+		# our updates into the current contents while holding an exclusive lock.
+		with os.fdopen( os.open( self.__fileName, os.O_RDWR | os.O_CREAT ), "r+" ) as f :
+			fcntl.flock( f, fcntl.LOCK_EX )
+			durations = self.__parse( f )
+			durations.update( updates )
+			f.seek( 0 )
+			f.truncate()
+			json.dump( durations, f, indent = 4, sort_keys = True )
+
+	def __reload( self ) :
+
+		try :
+			stat = os.stat( self.__fileName )
+		except OSError :
+			return
+
+		with self.__lock :
+			fileVersion = ( stat.st_mtime, stat.st_size )
+			if fileVersion == self.__fileVersion :
+				return
+			try :
+				with open( self.__fileName ) as f :
+					fcntl.flock( f, fcntl.LOCK_SH )
+					durations = self.__parse( f )
+			except IOError :
+				return
+			# Our own unsaved measurements take precedence.
+			durations.update( self.__updates )
+			self.__durations = durations
+			self.__fileVersion = fileVersion
+
+	@staticmethod
+	def __parse( f ) :
+
+		try :
+			return dict( json.load( f ) )
+		except ValueError :
+			return {}
+
 class LocalDispatcher( GafferDispatch.Dispatcher ) :
 
 	def __init__( self, name = "LocalDispatcher", jobPool = None ) :
@@ -57,6 +429,9 @@ class LocalDispatcher( GafferDispatch.Dispatcher ) :
 		self["executeInBackground"] = Gaffer.BoolPlug( defaultValue = False )
 		self["ignoreScriptLoadErrors"] = Gaffer.BoolPlug( defaultValue = False )
 		self["environmentCommand"] = Gaffer.StringPlug()
+		self["maxConcurrentJobs"] = Gaffer.IntPlug( defaultValue = 1, minValue = 1 )
+		self["useWorkerProcesses"] = Gaffer.BoolPlug( defaultValue = False )
+		self["targetBatchDuration"] = Gaffer.FloatPlug( defaultValue = 0, minValue = 0 )
 
 		self.__jobPool = jobPool if jobPool else LocalDispatcher.defaultJobPool()
 
@@ -86,6 +461,18 @@ class LocalDispatcher( GafferDispatch.Dispatcher ) :
 			self.__directory = directory
 			self.__stats = {}
 			self.__ignoreScriptLoadErrors = dispatcher["ignoreScriptLoadErrors"].getValue()
+			self.__maxConcurrentJobs = dispatcher["maxConcurrentJobs"].getValue()
+			self.__useWorkerProcesses = dispatcher["useWorkerProcesses"].getValue()
+			self.__workers = []
+			self.__resourceMonitor = None
+			self.__resourceUsage = {}
+			self.__batchStatistics = []
+			self.__history = _TaskHistory.acquire( LocalDispatcher._taskHistoryFile( directory ) )
+			self.__events = Queue.Queue()
+			self.__hasFailed = False
+			self.__done = threading.Event()
+			self.__doneCallbacks = []
+			self.__doneCallbacksLock = threading.Lock()
 			## \todo Make `Dispatcher::dispatch()` use a Process, so we don't need to
 			# do substitutions manually like this.
 			self.__environmentCommand = Gaffer.Context.current().substitute(
@@ -116,51 +503,79 @@ class LocalDispatcher( GafferDispatch.Dispatcher ) :
 
 		def description( self ) :
 
-			batch = self.__currentBatch( self.__batch )
-			if batch is None or batch.plug() is None :
+			batches = [ b for b in self.__currentBatches( self.__batch ) if b.plug() is not None ]
+			if not batches :
 				return "N/A"
 
-			frames = str( IECore.frameListFromList( [ int(x) for x in batch.frames() ] ) )
+			descriptions = []
+			for batch in batches :
+				frames = str( IECore.frameListFromList( [ int(x) for x in batch.frames() ] ) )
+				descriptions.append( batch.blindData()["nodeName"].value + " on frames " + frames )
 
-			return "Executing " + batch.blindData()["nodeName"].value + " on frames " + frames
+			return "Executing " + ", ".join( descriptions )
 
 		def statistics( self ) :
 
-			batch = self.__currentBatch( self.__batch )
-			if batch is None or "pid" not in batch.blindData().keys() :
-				return {}
-
-			rss = 0
-			pcpu = 0.0
-			pid = batch.blindData().get( "pid" )
-
-			try :
-				stats = subprocess.Popen( ( "ps -Ao pid,ppid,pgid,sess,pcpu,rss" ).split( " " ), stdout=subprocess.PIPE, stderr=subprocess.PIPE ).communicate()[0].split()
-				for i in range( 0, len(stats), 6 ) :
-					if str(pid) in stats[i:i+4] :
-						pcpu += float(stats[i+4])
-						rss += float(stats[i+5])
-			except :
+			usages = self.__resourceMonitor.usages() if self.__resourceMonitor is not None else []
+			if not usages :
 				return {}
 
 			return {
-				"pid" : pid,
-				"pcpu" : pcpu,
-				"rss" : rss,
+				"pid" : usages[0].pgid,
+				"pcpu" : sum( u.pcpu for u in usages ),
+				# In kilobytes, for compatibility with `ps`
+				"rss" : sum( u.rss for u in usages ) / 1024.0,
+				"cpuTime" : sum( u.cpuTime for u in usages ),
+				"readBytes" : sum( u.readBytes for u in usages ),
+				"writeBytes" : sum( u.writeBytes for u in usages ),
 			}
 
 		def messageHandler( self ) :
 
 			return self.__messageHandler
 
+		## Returns True if the job has finished, whether it
+		# completed, failed or was killed.
+		def done( self ) :
+
+			return self.__done.is_set()
+
+		## Blocks until the job has finished or the timeout
+		# expires, returning True if the job has finished.
+		def wait( self, timeout = None ) :
+
+			self.__done.wait( timeout )
+			return self.__done.is_set()
+
+		## Registers a callable to be called with the job as
+		# its only argument when the job finishes. If the job
+		# has already finished, the callable is called immediately.
+		# Note that callbacks are typically called on the thread
+		# performing the dispatch, not on the main thread.
+		def addDoneCallback( self, callback ) :
+
+			with self.__doneCallbacksLock :
+				if not self.__done.is_set() :
+					self.__doneCallbacks.append( callback )
+					return
+
+			callback( self )
+
 		def execute( self, background = False ) :
 
 			if background :
 				threading.Thread( target = self.__backgroundDispatch ).start()
 			else :
 				with self.__messageHandler :
-					self.__foregroundDispatch( self.__batch )
+					try :
+						if self.__maxConcurrentJobs > 1 :
+							self.__threadedForegroundDispatch( self.__batch )
+						else :
+							self.__foregroundDispatch( self.__batch )
+					finally :
+						self.__saveHistory()
 					self.__reportCompleted( self.__batch )
+				self.__finish()
 
 		def failed( self ) :
 
@@ -170,6 +585,9 @@ class LocalDispatcher( GafferDispatch.Dispatcher ) :
 
 			if not self.failed() :
 				self.__kill( self.__batch )
+				# Wake the background dispatch, so it can
+				# respond immediately.
+				self.__events.put( None )
 
 		def killed( self ) :
 
@@ -206,92 +624,437 @@ class LocalDispatcher( GafferDispatch.Dispatcher ) :
 
 			try :
 				self.__setStatus( batch, LocalDispatcher.Job.Status.Running )
+				startTime = time.time()
 				batch.execute()
 			except :
 				traceback.print_exc()
 				self.__reportFailed( batch )
 				return False
 
+			self.__recordDuration( batch, time.time() - startTime )
 			self.__setStatus( batch, LocalDispatcher.Job.Status.Complete )
 
 			return True
 
+		def __threadedForegroundDispatch( self, batch ) :
+
+			# Batches are executed on threads within this process as soon as all
+			# their preTasks have completed, so independent batches run concurrently
+			# while sharing the compute cache. Batches for nodes which aren't
+			# thread-safe are executed on their own, with nothing else running.
+
+			pending = self.__pendingBatches( batch )
+			running = []
+			runningWeight = 0
+			finished = Queue.Queue()
+			failedBatch = None
+
+			while pending or running :
+
+				stopping = failedBatch is not None or batch.blindData().get( "killed" )
+
+				for pendingBatch in list( pending ) :
+
+					if stopping :
+						break
+
+					if any( self.__getStatus( b ) != LocalDispatcher.Job.Status.Complete for b in pendingBatch.preTasks() ) :
+						continue
+
+					if not pendingBatch.plug() or len( pendingBatch.frames() ) == 0 :
+						pending.remove( pendingBatch )
+						self.__setStatus( pendingBatch, LocalDispatcher.Job.Status.Complete )
+						continue
+
+					weight = self.__threadWeight( pendingBatch )
+					if running and runningWeight + weight > self.__maxConcurrentJobs :
+						break
+
+					pending.remove( pendingBatch )
+					self.__setStatus( pendingBatch, LocalDispatcher.Job.Status.Running )
+					IECore.msg(
+						IECore.MessageHandler.Level.Info, self.__messageTitle,
+						"executing %s on %s" % ( pendingBatch.blindData()["nodeName"].value, str( pendingBatch.frames() ) )
+					)
+					thread = threading.Thread( target = self.__executeOnThread, args = ( pendingBatch, finished ) )
+					thread.daemon = True
+					running.append( pendingBatch )
+					runningWeight += weight
+					thread.start()
+
+				if not running :
+					break
+
+				finishedBatch, duration = finished.get()
+				running = [ b for b in running if b is not finishedBatch ]
+				runningWeight -= self.__threadWeight( finishedBatch )
+
+				if duration is not None :
+					self.__recordDuration( finishedBatch, duration )
+					self.__setStatus( finishedBatch, LocalDispatcher.Job.Status.Complete )
+				elif failedBatch is None :
+					# We can't interrupt the batches which are already
+					# running, so we just stop launching new ones and
+					# wait for them to finish.
+					failedBatch = finishedBatch
+
+			if failedBatch is not None :
+				self.__reportFailed( failedBatch )
+				return False
+
+			if batch.blindData().get( "killed" ) :
+				self.__reportKilled( batch )
+				return False
+
+			self.__setStatus( batch, LocalDispatcher.Job.Status.Complete )
+			return True
+
+		def __executeOnThread( self, batch, finished ) :
+
+			duration = None
+			with self.__messageHandler :
+				try :
+					startTime = time.time()
+					batch.execute()
+					duration = time.time() - startTime
+				except :
+					traceback.print_exc()
+
+			finished.put( ( batch, duration ) )
+
+		def __threadWeight( self, batch ) :
+
+			# Batches which aren't thread-safe take the whole budget,
+			# so they are never executed alongside anything else.
+			if not batch.blindData().get( "threadSafe", IECore.BoolData( True ) ).value :
+				return self.__maxConcurrentJobs
+
+			return self.__weight( batch )
+
 		def __backgroundDispatch( self ) :
 
 			with self.__messageHandler :
-				self.__doBackgroundDispatch( self.__batch )
+				self.__resourceMonitor = _ResourceMonitor()
+				try :
+					self.__doBackgroundDispatch( self.__batch )
+				finally :
+					for worker in self.__workers :
+						worker.shutdown()
+					self.__workers = []
+					self.__resourceMonitor.shutdown()
+					self.__writeBatchStatistics()
+					self.__saveHistory()
+					self.__finish()
 
 		def __doBackgroundDispatch( self, batch ) :
 
-			if self.__getStatus( batch ) == LocalDispatcher.Job.Status.Complete :
-				return True
+			# Batches are launched as soon as all their preTasks have completed,
+			# so independent batches may execute concurrently, provided that the
+			# sum of their weights doesn't exceed `maxConcurrentJobs`.
 
-			for upstreamBatch in batch.preTasks() :
-				if not self.__doBackgroundDispatch( upstreamBatch ) :
+			pending = self.__pendingBatches( batch )
+			running = []
+			runningWeight = 0
+
+			while pending or running :
+
+				if batch.blindData().get( "killed" ) :
+					self.__killProcesses( running )
+					self.__reportKilled( batch )
 					return False
 
-			if batch.blindData().get( "killed" ) :
-				self.__reportKilled( batch )
-				return False
+				launched = False
+				for pendingBatch in list( pending ) :
+
+					if any( self.__getStatus( b ) != LocalDispatcher.Job.Status.Complete for b in pendingBatch.preTasks() ) :
+						continue
+
+					if not pendingBatch.plug() :
+						pending.remove( pendingBatch )
+						self.__reportCompleted( pendingBatch )
+						continue
+
+					if len( pendingBatch.frames() ) == 0 :
+						# This case occurs for nodes like TaskList and TaskContextProcessors,
+						# because they don't do anything in execute (they have empty hashes).
+						# Their batches exist only to depend on upstream batches. We don't need
+						# to do any work here, but we still signal completion for the task to
+						# provide progress feedback to the user.
+						pending.remove( pendingBatch )
+						self.__setStatus( pendingBatch, LocalDispatcher.Job.Status.Complete )
+						IECore.msg( IECore.MessageHandler.Level.Info, self.__messageTitle, "Finished " + pendingBatch.blindData()["nodeName"].value )
+						continue
+
+					weight = self.__weight( pendingBatch )
+					if running and runningWeight + weight > self.__maxConcurrentJobs :
+						# Launching in order means that heavy batches can't be
+						# starved by a stream of lighter ones.
+						break
+
+					pending.remove( pendingBatch )
+					running.append( ( pendingBatch, self.__launch( pendingBatch ) ) )
+					runningWeight += weight
+
+				if not running :
+					continue
+
+				# Block until a batch completes, or we're woken
+				# because the job has been killed.
+				event = self.__events.get()
+				if event is None :
+					continue
+
+				finishedBatch, process, returncode = event
+				running = [ r for r in running if r[0] is not finishedBatch ]
+				self.__recordResourceUsage( finishedBatch )
+				runningWeight -= self.__weight( finishedBatch )
+				if isinstance( process, _Worker ) :
+					process.release()
+
+				if returncode :
+					# Stop the rest of the job, just as if the batches
+					# had been executed one at a time.
+					self.__killProcesses( running )
+					self.__reportFailed( finishedBatch )
+					return False
 
-			if not batch.plug() :
-				self.__reportCompleted( batch )
-				return True
+				self.__recordDuration( finishedBatch, finishedBatch.blindData()["statistics"]["wallTime"].value )
+				self.__setStatus( finishedBatch, LocalDispatcher.Job.Status.Complete )
 
-			if len( batch.frames() ) == 0 :
-				# This case occurs for nodes like TaskList and TaskContextProcessors,
-				# because they don't do anything in execute (they have empty hashes).
-				# Their batches exist only to depend on upstream batches. We don't need
-				# to do any work here, but we still signal completion for the task to
-				# provide progress feedback to the user.
-				self.__setStatus( batch, LocalDispatcher.Job.Status.Complete )
-				IECore.msg( IECore.MessageHandler.Level.Info, self.__messageTitle, "Finished " + batch.blindData()["nodeName"].value )
-				return True
+			return True
+
+		def __launch( self, batch ) :
 
 			taskContext = batch.context()
+			nodeName = batch.blindData()["nodeName"].value
 			frames = str( IECore.frameListFromList( [ int(x) for x in batch.frames() ] ) )
 
-			args = [
+			contextArgs = []
+			for entry in [ k for k in taskContext.keys() if k != "frame" and not k.startswith( "ui:" ) ] :
+				if entry not in self.__context.keys() or taskContext[entry] != self.__context[entry] :
+					contextArgs.extend( [ "-" + entry, repr(taskContext[entry]) ] )
+
+			self.__setStatus( batch, LocalDispatcher.Job.Status.Running )
+
+			if self.__useWorkerProcesses :
+
+				process = self.__idleWorker()
+				IECore.msg( IECore.MessageHandler.Level.Info, self.__messageTitle, "Executing %s on frames %s in worker %d" % ( nodeName, frames, process.pid ) )
+				process.execute( nodeName, frames, contextArgs )
+
+			else :
+
+				args = self.__executeArgs() + [
+					"-nodes", nodeName,
+					"-frames", frames,
+				]
+
+				if contextArgs :
+					args.extend( [ "-context" ] + contextArgs )
+
+				IECore.msg( IECore.MessageHandler.Level.Info, self.__messageTitle, " ".join( args ) )
+				process = subprocess.Popen( args, start_new_session=True )
+
+			batch.blindData()["pid"] = IECore.IntData( process.pid )
+			self.__resourceUsage[batch] = self.__resourceMonitor.start( process.pid )
+
+			waiter = threading.Thread( target = self.__waitForProcess, args = ( batch, process ) )
+			waiter.daemon = True
+			waiter.start()
+
+			return process
+
+		def __waitForProcess( self, batch, process ) :
+
+			# Called on a separate thread for each launched batch. Blocking
+			# here, rather than polling from the dispatch thread, means that
+			# completions are handled as soon as they happen, and that we
+			# don't hold the GIL while batches are running.
+
+			if isinstance( process, _Worker ) :
+				returncode = process.waitForBatch()
+			else :
+				# We reap the process ourselves rather than use `Popen.wait()`,
+				# so that we can get its exact resource usage.
+				while True :
+					try :
+						pid, status, rusage = os.wait4( process.pid, 0 )
+						break
+					except OSError as e :
+						if e.errno != errno.EINTR :
+							raise
+				returncode = -os.WTERMSIG( status ) if os.WIFSIGNALED( status ) else os.WEXITSTATUS( status )
+				self.__resourceUsage[batch].rusage = rusage
+
+			# The returncode travels with the event, so that nothing
+			# about the process is modified until the dispatch thread
+			# has handled it.
+			self.__events.put( ( batch, process, returncode ) )
+
+		def __recordResourceUsage( self, batch ) :
+
+			usage = self.__resourceUsage.pop( batch )
+			statistics = self.__resourceMonitor.stop( usage, usage.rusage )
+
+			batch.blindData()["statistics"] = IECore.CompoundData( {
+				"wallTime" : IECore.DoubleData( statistics["wallTime"] ),
+				"cpuTime" : IECore.DoubleData( statistics["cpuTime"] ),
+				"peakRSS" : IECore.UInt64Data( statistics["peakRSS"] ),
+				"readBytes" : IECore.UInt64Data( statistics["readBytes"] ),
+				"writeBytes" : IECore.UInt64Data( statistics["writeBytes"] ),
+			} )
+
+			statistics["node"] = batch.blindData()["nodeName"].value
+			statistics["frames"] = str( IECore.frameListFromList( [ int(x) for x in batch.frames() ] ) )
+			self.__batchStatistics.append( statistics )
+
+		def __writeBatchStatistics( self ) :
+
+			if not self.__batchStatistics :
+				return
+
+			try :
+				with open( os.path.join( self.__directory, "batchStatistics.json" ), "w" ) as f :
+					json.dump( self.__batchStatistics, f, indent = 4, sort_keys = True )
+			except IOError as e :
+				IECore.msg( IECore.MessageHandler.Level.Warning, self.__messageTitle, "Unable to write batch statistics : " + str( e ) )
+
+		def __executeArgs( self ) :
+
+			args = shlex.split( self.__environmentCommand ) + [
 				"gaffer", "execute",
 				"-script", self.__scriptFile,
-				"-nodes", batch.blindData()["nodeName"].value,
-				"-frames", frames,
 			]
 
-			args = shlex.split( self.__environmentCommand ) + args
-
 			if self.__ignoreScriptLoadErrors :
 				args.append( "-ignoreScriptLoadErrors" )
 
-			contextArgs = []
-			for entry in [ k for k in taskContext.keys() if k != "frame" and not k.startswith( "ui:" ) ] :
-				if entry not in self.__context.keys() or taskContext[entry] != self.__context[entry] :
-					contextArgs.extend( [ "-" + entry, repr(taskContext[entry]) ] )
+			return args
 
-			if contextArgs :
-				args.extend( [ "-context" ] + contextArgs )
+		def __idleWorker( self ) :
 
-			self.__setStatus( batch, LocalDispatcher.Job.Status.Running )
+			# Workers which have been killed or have crashed are
+			# discarded, and replaced on demand.
+			self.__workers = [ w for w in self.__workers if w.alive() ]
+			for worker in self.__workers :
+				if not worker.busy() :
+					return worker
+
+			args = self.__executeArgs() + [ "-worker" ]
 			IECore.msg( IECore.MessageHandler.Level.Info, self.__messageTitle, " ".join( args ) )
-			process = subprocess.Popen( args, start_new_session=True )
-			batch.blindData()["pid"] = IECore.IntData( process.pid )
+			worker = _Worker( args )
+			self.__workers.append( worker )
 
-			while process.poll() is None :
+			return worker
 
-				if batch.blindData().get( "killed" ) :
+		def __killProcesses( self, running ) :
+
+			for batch, process in running :
+				try :
 					os.killpg( process.pid, signal.SIGTERM )
-					self.__reportKilled( batch )
-					return False
+				except OSError as e :
+					if e.errno != errno.ESRCH :
+						raise
+
+			# Wait for the processes to be reaped by their waiters.
+			running = list( running )
+			while running :
+				event = self.__events.get()
+				if event is None :
+					continue
+				batch, process, returncode = event
+				running = [ r for r in running if r[0] is not batch ]
+				self.__recordResourceUsage( batch )
+				if isinstance( process, _Worker ) :
+					process.release()
+				self.__setStatus( batch, LocalDispatcher.Job.Status.Killed )
+
+		def __pendingBatches( self, batch ) :
+
+			# Returns the batches still to be executed, in the order in which
+			# they should be considered for launching. When batches may run
+			# concurrently, those heading the longest chains of dependent work
+			# come first, so that the critical path is started as early as
+			# possible.
+
+			batches = self.__batchesInExecutionOrder( batch )
+			if self.__maxConcurrentJobs > 1 :
+				batches = self.__criticalPathOrder( batches )
+
+			return [ b for b in batches if self.__getStatus( b ) != LocalDispatcher.Job.Status.Complete ]
+
+		def __criticalPathOrder( self, batches ) :
+
+			# Batches without a recorded duration are assumed to take
+			# the average time of those with one.
+			defaultFrameDuration = self.__history.averageFrameDuration() or 1.0
+
+			for i, batch in enumerate( batches ) :
+				batch.blindData()["executionIndex"] = IECore.IntData( i )
+
+			dependents = [ [] for b in batches ]
+			for i, batch in enumerate( batches ) :
+				for upstreamBatch in batch.preTasks() :
+					dependents[upstreamBatch.blindData()["executionIndex"].value].append( i )
 
-				time.sleep( 0.01 )
+			# Every batch appears after all its preTasks, so visiting them
+			# in reverse visits all dependents before the batches they
+			# depend on.
+			pathDurations = [ 0.0 ] * len( batches )
+			for i in reversed( range( len( batches ) ) ) :
+				pathDurations[i] = self.__estimatedDuration( batches[i], defaultFrameDuration )
+				pathDurations[i] += max( [ pathDurations[d] for d in dependents[i] ] or [ 0.0 ] )
 
-			if process.returncode :
-				self.__reportFailed( batch )
-				return False
+			order = sorted( range( len( batches ) ), key = lambda i : -pathDurations[i] )
+			return [ batches[i] for i in order ]
 
-			self.__setStatus( batch, LocalDispatcher.Job.Status.Complete )
+		def __estimatedDuration( self, batch, defaultFrameDuration ) :
 
-			return True
+			if "historyKey" not in batch.blindData() :
+				return 0.0
+
+			frameDuration = self.__history.frameDuration( batch.blindData()["historyKey"].value )
+			if frameDuration is None :
+				frameDuration = defaultFrameDuration
+
+			return frameDuration * len( batch.frames() )
+
+		def __recordDuration( self, batch, duration ) :
+
+			if "historyKey" in batch.blindData() and len( batch.frames() ) :
+				self.__history.record( batch.blindData()["historyKey"].value, duration / len( batch.frames() ) )
+
+		def __saveHistory( self ) :
+
+			try :
+				self.__history.save()
+			except ( IOError, OSError ) as e :
+				IECore.msg( IECore.MessageHandler.Level.Warning, self.__messageTitle, "Unable to save task history : " + str( e ) )
+
+		def __weight( self, batch ) :
+
+			# A batch heavier than the whole budget is allowed to run on its own,
+			# rather than never running at all.
+			weight = batch.blindData().get( "weight", IECore.IntData( 1 ) ).value
+			return min( max( weight, 1 ), self.__maxConcurrentJobs )
+
+		def __batchesInExecutionOrder( self, batch, result = None ) :
+
+			# Returns all the batches in the DAG, each exactly once, with
+			# every batch appearing after all of its preTasks.
+
+			if result is None :
+				result = []
+
+			if any( b.isSame( batch ) for b in result ) :
+				return result
+
+			for upstreamBatch in batch.preTasks() :
+				self.__batchesInExecutionOrder( upstreamBatch, result )
+
+			result.append( batch )
+
+			return result
 
 		def __getStatus( self, batch ) :
 
@@ -308,39 +1071,61 @@ class LocalDispatcher( GafferDispatch.Dispatcher ) :
 		def __reportCompleted( self, batch ) :
 
 			self.__setStatus( batch, LocalDispatcher.Job.Status.Complete )
-			self.__dispatcher.jobPool()._remove( self )
 			IECore.msg( IECore.MessageHandler.Level.Info, self.__messageTitle, "Dispatched all tasks for " + self.name() )
 
 		def __reportFailed( self, batch ) :
 
 			self.__setStatus( batch, LocalDispatcher.Job.Status.Failed )
-			self.__dispatcher.jobPool()._fail( self )
+			self.__hasFailed = True
 			frames = str( IECore.frameListFromList( [ int(x) for x in batch.frames() ] ) )
 			IECore.msg( IECore.MessageHandler.Level.Error, self.__messageTitle, "Failed to execute " + batch.blindData()["nodeName"].value + " on frames " + frames )
 
 		def __reportKilled( self, batch ) :
 
 			self.__setStatus( batch, LocalDispatcher.Job.Status.Killed )
-			self.__dispatcher.jobPool()._remove( self )
 			IECore.msg( IECore.MessageHandler.Level.Info, self.__messageTitle, "Killed " + self.name() )
 
-		def __currentBatch( self, batch ) :
+		def __finish( self ) :
 
-			if self.__getStatus( batch ) == LocalDispatcher.Job.Status.Running :
-				return batch
+			# The job is marked as done and its callbacks are called before
+			# it is removed from the pool, so that anything waiting on the
+			# pool sees all of the job's results.
+			with self.__doneCallbacksLock :
+				self.__done.set()
+				callbacks = self.__doneCallbacks
+				self.__doneCallbacks = []
 
-			for upstreamBatch in batch.preTasks() :
+			for callback in callbacks :
+				try :
+					callback( self )
+				except :
+					traceback.print_exc()
+
+			if self.__hasFailed :
+				self.__dispatcher.jobPool()._fail( self )
+			else :
+				self.__dispatcher.jobPool()._remove( self )
 
-				batch = self.__currentBatch( upstreamBatch )
-				if batch is not None :
-					return batch
+		def __currentBatches( self, batch ) :
 
-			return None
+			return [
+				b for b in self.__batchesInExecutionOrder( batch )
+				if self.__getStatus( b ) == LocalDispatcher.Job.Status.Running
+			]
 
 		def __storeNodeNames( self, script, batch ) :
 
 			if batch.plug() :
-				batch.blindData()["nodeName"] = batch.plug().node().relativeName( script )
+				node = batch.plug().node()
+				batch.blindData()["nodeName"] = node.relativeName( script )
+				weight = Gaffer.Metadata.nodeValue( node, "localDispatcher:weight" )
+				if weight is not None :
+					batch.blindData()["weight"] = IECore.IntData( int( weight ) )
+				if len( batch.frames() ) :
+					batch.blindData()["historyKey"] = IECore.StringData( _TaskHistory.key( batch.plug(), batch.context() ) )
+				threadSafe = Gaffer.Metadata.nodeValue( node, "localDispatcher:threadSafe" )
+				if threadSafe is not None :
+					batch.blindData()["threadSafe"] = IECore.BoolData( bool( threadSafe ) )
 
 			for upstreamBatch in batch.preTasks() :
 				self.__storeNodeNames( script, upstreamBatch )
@@ -351,6 +1136,7 @@ class LocalDispatcher( GafferDispatch.Dispatcher ) :
 
 			self.__jobs = []
 			self.__failedJobs = []
+			self.__jobsChanged = threading.Condition()
 			self.__jobAddedSignal = Gaffer.Signal1()
 			self.__jobRemovedSignal = Gaffer.Signal1()
 			self.__jobFailedSignal = Gaffer.Signal1()
@@ -365,8 +1151,9 @@ class LocalDispatcher( GafferDispatch.Dispatcher ) :
 
 		def waitForAll( self ) :
 
-			while len(self.__jobs) :
-				time.sleep( 0.2 )
+			with self.__jobsChanged :
+				while len(self.__jobs) :
+					self.__jobsChanged.wait()
 
 		def jobAddedSignal( self ) :
 
@@ -384,23 +1171,34 @@ class LocalDispatcher( GafferDispatch.Dispatcher ) :
 
 			assert( isinstance( job, LocalDispatcher.Job ) )
 
-			self.__jobs.append( job )
+			with self.__jobsChanged :
+				self.__jobs.append( job )
+				self.__jobsChanged.notify_all()
+
 			self.jobAddedSignal()( job )
 
 		def _remove( self, job, force = False ) :
 
-			if job in self.__jobs :
-				self.__jobs.remove( job )
-				self.jobRemovedSignal()( job )
+			with self.__jobsChanged :
+				removed = job in self.__jobs
+				if removed :
+					self.__jobs.remove( job )
+				if force and job in self.__failedJobs :
+					self.__failedJobs.remove( job )
+				self.__jobsChanged.notify_all()
 
-			if force and job in self.__failedJobs :
-				self.__failedJobs.remove( job )
+			if removed :
+				self.jobRemovedSignal()( job )
 
 		def _fail( self, job ) :
 
-			if job in self.__jobs and job not in self.__failedJobs :
+			with self.__jobsChanged :
+				failed = job in self.__jobs and job not in self.__failedJobs
+				if failed :
+					self.__failedJobs.append( job )
+
+			if failed :
 				job._fail()
-				self.__failedJobs.append( job )
 				self.jobFailedSignal()( job )
 				self._remove( job )
 
@@ -415,6 +1213,26 @@ class LocalDispatcher( GafferDispatch.Dispatcher ) :
 
 		return self.__jobPool
 
+	def batchSize( self, plug, context ) :
+
+		batchSize = GafferDispatch.Dispatcher.batchSize( self, plug, context )
+
+		targetDuration = self["targetBatchDuration"].getValue()
+		if targetDuration <= 0 :
+			return batchSize
+
+		history = _TaskHistory.acquire( self._taskHistoryFile( self.jobDirectory() ) )
+		frameDuration = history.frameDuration( _TaskHistory.key( plug, context ) )
+		if not frameDuration :
+			return batchSize
+
+		return max( int( targetDuration / frameDuration ), 1 )
+
+	@staticmethod
+	def _taskHistoryFile( jobDirectory ) :
+
+		return os.path.join( os.path.dirname( jobDirectory ), "taskHistory.json" )
+
 	def _doDispatch( self, batch ) :
 
 		job = LocalDispatcher.Job(
@@ -34,7 +34,9 @@
 #
 ##########################################################################
 
+import sys
 import math
+import threading
 
 import IECore
 
@@ -92,6 +94,11 @@ class Wedge( GafferDispatch.TaskContextProcessor ) :
 		self["ints"] = Gaffer.IntVectorDataPlug( defaultValue = IECore.IntVectorData() )
 		self["strings"] = Gaffer.StringVectorDataPlug( defaultValue = IECore.StringVectorData() )
 
+		# single process execution
+
+		self["singleProcess"] = Gaffer.BoolPlug( defaultValue = False )
+		self["maxConcurrentVariants"] = Gaffer.IntPlug( defaultValue = 1, minValue = 1 )
+
 	def values( self ) :
 
 		mode = self.Mode( self["mode"].getValue() )
@@ -162,4 +169,169 @@ class Wedge( GafferDispatch.TaskContextProcessor ) :
 
 		return contexts
 
+	def preTasks( self, context ) :
+
+		# In single process mode, we execute the upstream
+		# tasks ourselves, rather than leaving it to the
+		# dispatcher.
+		if self["singleProcess"].getValue() :
+			return []
+
+		return GafferDispatch.TaskContextProcessor.preTasks( self, context )
+
+	def hash( self, context ) :
+
+		if not self["singleProcess"].getValue() :
+			return GafferDispatch.TaskContextProcessor.hash( self, context )
+
+		h = GafferDispatch.TaskNode.hash( self, context )
+		for tasks in self.__variantTasks( context ) :
+			for task, taskHash in tasks :
+				h.append( taskHash )
+
+		return h
+
+	def execute( self ) :
+
+		if not self["singleProcess"].getValue() :
+			return
+
+		# Execute the upstream tasks for every variant within this
+		# process, so that all the variants share the same cache.
+		# Tasks which are identical between variants are executed
+		# only once, and variants may be executed concurrently,
+		# unless they contain nodes which aren't thread-safe.
+
+		context = Gaffer.Context.current()
+		variantTasks = self.__variantTasks( context )
+		contexts = self._processedContexts( context )
+
+		maxThreads = self["maxConcurrentVariants"].getValue()
+		for tasks in variantTasks :
+			for task, taskHash in tasks :
+				if Gaffer.Metadata.nodeValue( task.node(), "localDispatcher:threadSafe" ) == False :
+					maxThreads = 1
+
+		executed = {}
+		executedLock = threading.Lock()
+		completed = [ 0 ]
+
+		def executeVariant( index ) :
+
+			for task, taskHash in variantTasks[index] :
+
+				with executedLock :
+					key = ( task.node()["task"].fullName(), str( taskHash ) )
+					status = executed.get( key )
+					owner = status is None
+					if owner :
+						status = executed[key] = [ threading.Event(), None ]
+
+				if owner :
+					try :
+						with task.context() :
+							task.node()["task"].execute()
+					except Exception :
+						status[1] = sys.exc_info()
+					finally :
+						status[0].set()
+				else :
+					status[0].wait()
+
+				if status[1] is not None :
+					raise status[1][0], status[1][1], status[1][2]
+
+			with executedLock :
+				completed[0] += 1
+				IECore.msg(
+					IECore.Msg.Level.Info, self.relativeName( self.scriptNode() ),
+					"Completed variant %d of %d (%s = %s)" % (
+						completed[0], len( variantTasks ), self["variable"].getValue(),
+						contexts[index][self["variable"].getValue()]
+					)
+				)
+
+		if maxThreads == 1 :
+			for index in range( 0, len( variantTasks ) ) :
+				executeVariant( index )
+			return
+
+		indices = iter( range( 0, len( variantTasks ) ) )
+		errors = []
+
+		def executeVariants() :
+
+			while not errors :
+				with executedLock :
+					index = next( indices, None )
+				if index is None :
+					return
+				try :
+					executeVariant( index )
+				except Exception :
+					errors.append( sys.exc_info() )
+
+		threads = [ threading.Thread( target = executeVariants ) for i in range( 0, min( maxThreads, len( variantTasks ) ) ) ]
+		for thread in threads :
+			thread.start()
+		for thread in threads :
+			thread.join()
+
+		if errors :
+			raise errors[0][0], errors[0][1], errors[0][2]
+
+	# Returns a list containing, for each variant, a list of
+	# ( task, hash ) tuples for the upstream tasks with work to
+	# do. Each task appears after all of its own preTasks. Tasks
+	# requiring sequence execution can't be executed a frame at
+	# a time, so aren't supported in single process mode.
+	def __variantTasks( self, context ) :
+
+		sources = []
+		for plug in self["preTasks"] :
+			source = plug.source()
+			if not source.isSame( plug ) and isinstance( source.node(), GafferDispatch.TaskNode ) :
+				sources.append( source.node() )
+
+		result = []
+		for variantContext in self._processedContexts( context ) :
+
+			tasks = []
+			visited = set()
+
+			def visit( task ) :
+
+				# Tasks are keyed by node and context rather than by
+				# hash, because distinct tasks may share a hash. In
+				# particular, all no-op tasks have the default hash.
+				key = ( task.node()["task"].fullName(), task.context().hash() )
+				if key in visited :
+					return
+				visited.add( key )
+
+				with task.context() :
+					preTasks = task.node()["task"].preTasks()
+					taskHash = task.node()["task"].hash()
+					requiresSequenceExecution = task.node()["task"].requiresSequenceExecution()
+
+				for preTask in preTasks :
+					visit( preTask )
+
+				if taskHash != IECore.MurmurHash() :
+					if requiresSequenceExecution :
+						raise RuntimeError(
+							"Wedge \"%s\" : Single process mode does not support \"%s\", which requires sequence execution" % (
+								self.relativeName( self.scriptNode() ),
+								task.node().relativeName( task.node().scriptNode() ),
+							)
+						)
+					tasks.append( ( task, taskHash ) )
+
+			for node in sources :
+				visit( self.Task( node, variantContext ) )
+
+			result.append( tasks )
+
+		return result
+
 IECore.registerRunTimeTyped( Wedge, typeName = "GafferDispatch::Wedge" )
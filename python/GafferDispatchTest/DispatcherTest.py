@@ -794,6 +794,59 @@ class DispatcherTest( GafferTest.TestCase ) :
 		self.assertEqual( len( s["n1"].log ), len( frameList.asList() ) )
 		self.assertEqual( [ l.context.getFrame() for l in s["n1"].log ], binaryFrames.asList() )
 
+	def testBatchSizeOverride( self ) :
+
+		class BatchSizeDispatcher( GafferDispatch.Dispatcher ) :
+
+			def __init__( self ) :
+
+				GafferDispatch.Dispatcher.__init__( self )
+				self.batchFrames = {}
+
+			def batchSize( self, plug, context ) :
+
+				if plug.node().getName() == "n1" :
+					return 3
+
+				return GafferDispatch.Dispatcher.batchSize( self, plug, context )
+
+			def _doDispatch( self, batch ) :
+
+				if batch.node() is not None :
+					self.batchFrames.setdefault( batch.node().getName(), [] ).append( list( batch.frames() ) )
+
+				for upstreamBatch in batch.preTasks() :
+					self._doDispatch( upstreamBatch )
+
+		IECore.registerRunTimeTyped( BatchSizeDispatcher )
+
+		s = Gaffer.ScriptNode()
+		s["n1"] = GafferDispatchTest.LoggingTaskNode()
+		s["n1"]["frame"] = Gaffer.StringPlug( defaultValue = "${frame}", flags = Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic )
+		s["n2"] = GafferDispatchTest.LoggingTaskNode()
+		s["n2"]["frame"] = Gaffer.StringPlug( defaultValue = "${frame}", flags = Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic )
+		s["n2"]["dispatcher"]["batchSize"].setValue( 2 )
+
+		dispatcher = BatchSizeDispatcher()
+		dispatcher["jobsDirectory"].setValue( self.temporaryDirectory() )
+		dispatcher["framesMode"].setValue( GafferDispatch.Dispatcher.FramesMode.CustomRange )
+		dispatcher["frameRange"].setValue( "1-7" )
+
+		self.assertEqual( dispatcher.batchSize( s["n1"]["task"], s.context() ), 3 )
+		self.assertEqual( dispatcher.batchSize( s["n2"]["task"], s.context() ), 2 )
+		self.assertEqual( GafferDispatch.Dispatcher.batchSize( dispatcher, s["n1"]["task"], s.context() ), 1 )
+
+		dispatcher.dispatch( [ s["n1"], s["n2"] ] )
+
+		self.assertEqual(
+			sorted( dispatcher.batchFrames["n1"] ),
+			[ [ 1.0, 2.0, 3.0 ], [ 4.0, 5.0, 6.0 ], [ 7.0 ] ]
+		)
+		self.assertEqual(
+			sorted( dispatcher.batchFrames["n2"] ),
+			[ [ 1.0, 2.0 ], [ 3.0, 4.0 ], [ 5.0, 6.0 ], [ 7.0 ] ]
+		)
+
 	def testPreTasksOverride( self ) :
 
 		class SelfRequiringNode( GafferDispatch.TaskNode ) :
@@ -1313,5 +1366,113 @@ class DispatcherTest( GafferTest.TestCase ) :
 		self.assertEqual( [ l.context.getFrame() for l in log ], [ 1, 2, 3, 4, 1 ] )
 		self.assertEqual( [ l.frames for l in log ], [ None, None, None, None, [ 1, 2, 3, 4 ] ] )
 
+	def testIncrementalDispatch( self ) :
+
+		# a - b
+
+		s = Gaffer.ScriptNode()
+
+		log = []
+		s["a"] = GafferDispatchTest.LoggingTaskNode( log = log )
+		s["a"]["f"] = Gaffer.StringPlug( defaultValue = "a.####" )
+
+		s["b"] = GafferDispatchTest.LoggingTaskNode( log = log )
+		s["b"]["f"] = Gaffer.StringPlug( defaultValue = "b.####" )
+		s["b"]["preTasks"][0].setInput( s["a"]["task"] )
+
+		dispatcher = GafferDispatch.Dispatcher.create( "testDispatcher" )
+		dispatcher["framesMode"].setValue( GafferDispatch.Dispatcher.FramesMode.CustomRange )
+		dispatcher["frameRange"].setValue( "1-4" )
+		dispatcher["incremental"].setValue( True )
+
+		dispatcher.dispatch( [ s["b"] ] )
+		self.assertEqual( [ l.node for l in log ], [ s["a"], s["b"] ] * 4 )
+
+		# Nothing has changed, so nothing needs executing.
+
+		del log[:]
+		dispatcher.dispatch( [ s["b"] ] )
+		self.assertEqual( log, [] )
+
+		# Only b's tasks have changed, so only they should be executed.
+
+		s["b"]["f"].setValue( "c.####" )
+		dispatcher.dispatch( [ s["b"] ] )
+		self.assertEqual( [ l.node for l in log ], [ s["b"] ] * 4 )
+
+		# Extending the frame range only executes the new frames.
+
+		del log[:]
+		dispatcher["frameRange"].setValue( "1-5" )
+		dispatcher.dispatch( [ s["b"] ] )
+		self.assertEqual( [ l.node for l in log ], [ s["a"], s["b"] ] )
+		self.assertEqual( [ l.context.getFrame() for l in log ], [ 5, 5 ] )
+
+		# Changes upstream cause downstream tasks to be executed
+		# again, even though their own hashes are unchanged.
+
+		del log[:]
+		s["a"]["f"].setValue( "d.####" )
+		dispatcher.dispatch( [ s["b"] ] )
+		self.assertEqual( [ l.node for l in log ], [ s["a"], s["b"] ] * 5 )
+
+		# Non-incremental dispatches execute everything.
+
+		del log[:]
+		dispatcher["incremental"].setValue( False )
+		dispatcher.dispatch( [ s["b"] ] )
+		self.assertEqual( [ l.node for l in log ], [ s["a"], s["b"] ] * 5 )
+
+		# But they still update the record of executed tasks.
+
+		del log[:]
+		dispatcher["incremental"].setValue( True )
+		dispatcher.dispatch( [ s["b"] ] )
+		self.assertEqual( log, [] )
+
+		# Returning to a previously executed state executes the
+		# tasks again, because they have been executed with a
+		# different hash since.
+
+		s["b"]["f"].setValue( "b.####" )
+		dispatcher.dispatch( [ s["b"] ] )
+		self.assertEqual( [ l.node for l in log ], [ s["b"] ] * 5 )
+
+		del log[:]
+		dispatcher.dispatch( [ s["b"] ] )
+		self.assertEqual( log, [] )
+
+	def testBatchingIsMonitored( self ) :
+
+		# a - b
+
+		s = Gaffer.ScriptNode()
+
+		log = []
+		s["a"] = GafferDispatchTest.LoggingTaskNode( log = log )
+		s["a"]["f"] = Gaffer.StringPlug( defaultValue = "a.####" )
+
+		s["b"] = GafferDispatchTest.LoggingTaskNode( log = log )
+		s["b"]["f"] = Gaffer.StringPlug( defaultValue = "b.####" )
+		s["b"]["preTasks"][0].setInput( s["a"]["task"] )
+
+		dispatcher = GafferDispatch.Dispatcher.create( "testDispatcher" )
+		dispatcher["framesMode"].setValue( GafferDispatch.Dispatcher.FramesMode.CustomRange )
+		dispatcher["frameRange"].setValue( "1-50" )
+
+		with Gaffer.PerformanceMonitor() as m :
+			dispatcher.dispatch( [ s["b"] ] )
+
+		# Batching is performed in parallel, but each task
+		# should still only be hashed once.
+		self.assertEqual( m.plugStatistics( s["a"]["task"] ).hashCount, 50 )
+		self.assertEqual( m.plugStatistics( s["b"]["task"] ).hashCount, 50 )
+		self.assertGreater( m.plugStatistics( s["a"]["task"] ).hashDuration, 0 )
+
+		# And the tasks should still be executed in the same
+		# order as before.
+		self.assertEqual( [ l.node for l in log ], [ s["a"], s["b"] ] * 50 )
+		self.assertEqual( [ l.context.getFrame() for l in log ], [ f for f in range( 1, 51 ) for n in range( 2 ) ] )
+
 if __name__ == "__main__":
 	unittest.main()
@@ -36,6 +36,8 @@
 ##########################################################################
 
 import os
+import glob
+import inspect
 import subprocess32 as subprocess
 import unittest
 
@@ -43,6 +45,7 @@ import IECore
 
 import Gaffer
 import GafferTest
+import GafferDispatch
 import GafferDispatchTest
 
 class ExecuteApplicationTest( GafferTest.TestCase ) :
@@ -250,5 +253,75 @@ class ExecuteApplicationTest( GafferTest.TestCase ) :
 		self.assertEqual( p.returncode, 0 )
 		self.assertTrue( os.path.exists( self.__outputTextFile ) )
 
+	def testParallelFrames( self ) :
+
+		s = Gaffer.ScriptNode()
+		s["fileName"].setValue( self.__scriptFileName )
+
+		# Later frames finish first, but their messages
+		# must still be output in frame order.
+		s["c"] = GafferDispatch.PythonCommand()
+		s["c"]["command"].setValue( inspect.cleandoc(
+			"""
+			import time
+			time.sleep( 0.05 * ( 10 - context.getFrame() ) )
+			IECore.msg( IECore.Msg.Level.Warning, "parallelFramesTest", "frame %d" % context.getFrame() )
+			"""
+		) )
+
+		s["t"] = GafferDispatchTest.TextWriter()
+		s["t"]["fileName"].setValue( self.temporaryDirectory() + "/parallel.####.txt" )
+		s["t"]["text"].setValue( "${frame}" )
+		s.save()
+
+		p = subprocess.Popen(
+			"gaffer execute -script " + self.__scriptFileName + " -frames 1-10 -threads 4 -parallelFrames",
+			shell=True,
+			stderr = subprocess.PIPE,
+		)
+		p.wait()
+
+		self.assertEqual( p.returncode, 0 )
+
+		messageFrames = [ int( l.split()[-1] ) for l in p.stderr.readlines() if "parallelFramesTest" in l ]
+		self.assertEqual( messageFrames, range( 1, 11 ) )
+
+		for f in range( 1, 11 ) :
+			with open( self.temporaryDirectory() + "/parallel.%04d.txt" % f ) as textFile :
+				self.assertEqual( textFile.read(), str( f ) )
+
+	def testParallelFramesStopAfterFailure( self ) :
+
+		s = Gaffer.ScriptNode()
+		s["fileName"].setValue( self.__scriptFileName )
+
+		s["c"] = GafferDispatch.PythonCommand()
+		s["c"]["command"].setValue( inspect.cleandoc(
+			"""
+			import time
+			open( "%s/started.%%04d.txt" %% context.getFrame(), "w" ).close()
+			if context.getFrame() == 3 :
+				raise Exception( "Frame 3 failed" )
+			time.sleep( 1 )
+			""" % self.temporaryDirectory()
+		) )
+		s.save()
+
+		p = subprocess.Popen(
+			"gaffer execute -script " + self.__scriptFileName + " -frames 1-20 -threads 4 -parallelFrames",
+			shell=True,
+			stderr = subprocess.PIPE,
+		)
+		p.wait()
+
+		self.assertNotEqual( p.returncode, 0 )
+		self.assertTrue( "Frame 3 failed" in "".join( p.stderr.readlines() ) )
+
+		# Frames which started before the failure are allowed
+		# to finish, but no further frames are started.
+		startedFrames = [ int( f.split( "." )[-2] ) for f in glob.glob( self.temporaryDirectory() + "/started.*.txt" ) ]
+		self.assertTrue( { 1, 2, 3 }.issubset( startedFrames ) )
+		self.assertLessEqual( max( startedFrames ), 5 )
+
 if __name__ == "__main__":
 	unittest.main()
@@ -36,6 +36,8 @@
 
 import os
 import stat
+import json
+import inspect
 import shutil
 import unittest
 
@@ -553,6 +555,38 @@ class LocalDispatcherTest( GafferTest.TestCase ) :
 		# make sure it never wrote the file
 		self.assertFalse( os.path.isfile( s.context().substitute( s["n1"]["fileName"].getValue() ) ) )
 
+	def testJobCompletion( self ) :
+
+		s = Gaffer.ScriptNode()
+		s["n1"] = GafferDispatchTest.TextWriter()
+		s["n1"]["fileName"].setValue( "/tmp/dispatcherTest/n1_####.txt" )
+		s["n1"]["text"].setValue( "n1 on ${frame}" )
+
+		dispatcher = GafferDispatch.Dispatcher.create( "LocalTest" )
+		dispatcher["executeInBackground"].setValue( True )
+
+		jobs = []
+		c = dispatcher.jobPool().jobAddedSignal().connect( jobs.append )
+
+		dispatcher.dispatch( [ s["n1"] ] )
+		self.assertEqual( len( jobs ), 1 )
+		job = jobs[0]
+
+		finished = []
+		job.addDoneCallback( finished.append )
+
+		self.assertTrue( job.wait() )
+		self.assertTrue( job.done() )
+		self.assertTrue( os.path.isfile( s.context().substitute( s["n1"]["fileName"].getValue() ) ) )
+
+		dispatcher.jobPool().waitForAll()
+		self.assertEqual( finished, [ job ] )
+		self.assertFalse( job.failed() )
+
+		# Callbacks added after completion are called immediately.
+		job.addDoneCallback( finished.append )
+		self.assertEqual( finished, [ job, job ] )
+
 	def testSpacesInContext( self ) :
 
 		s = Gaffer.ScriptNode()
@@ -743,6 +777,335 @@ class LocalDispatcherTest( GafferTest.TestCase ) :
 		with open( testFile ) as f :
 			self.assertEqual( f.readlines(), [ "HELLO WORLD\n" ] )
 
+	def testMaxConcurrentJobs( self ) :
+
+		# Each task marks itself as running for a short while, and records
+		# how many tasks it saw running alongside it. This lets us check
+		# that tasks genuinely overlap, but never exceed the limit.
+
+		os.makedirs( "/tmp/dispatcherTest/running" )
+
+		command = inspect.cleandoc(
+			"""
+			import os
+			import time
+			name = "%s_%d" % ( variables["name"], context.getFrame() )
+			marker = os.path.join( "/tmp/dispatcherTest/running", name )
+			open( marker, "w" ).close()
+			running = len( os.listdir( "/tmp/dispatcherTest/running" ) )
+			with open( "/tmp/dispatcherTest/log.txt", "a" ) as f :
+				f.write( "%s %d %d\\n" % ( variables["name"], context.getFrame(), running ) )
+			time.sleep( 0.25 )
+			os.remove( marker )
+			"""
+		)
+
+		s = Gaffer.ScriptNode()
+
+		for name in [ "n1", "n2a", "n2b", "n2c" ] :
+			s[name] = GafferDispatch.PythonCommand()
+			s[name]["command"].setValue( command )
+			s[name]["variables"].addMember( "name", name )
+
+		for i, name in enumerate( [ "n2a", "n2b", "n2c" ] ) :
+			s["n1"]["preTasks"][i].setInput( s[name]["task"] )
+
+		Gaffer.Metadata.registerNodeValue( s["n2c"], "localDispatcher:weight", IECore.IntData( 3 ) )
+
+		dispatcher = GafferDispatch.Dispatcher.create( "LocalTest" )
+		dispatcher["executeInBackground"].setValue( True )
+		dispatcher["maxConcurrentJobs"].setValue( 2 )
+		dispatcher["framesMode"].setValue( GafferDispatch.Dispatcher.FramesMode.CustomRange )
+		dispatcher["frameRange"].setValue( "1-4" )
+
+		dispatcher.dispatch( [ s["n1"] ] )
+		dispatcher.jobPool().waitForAll()
+		self.assertEqual( len( dispatcher.jobPool().jobs() ), 0 )
+		self.assertEqual( len( dispatcher.jobPool().failedJobs() ), 0 )
+
+		with open( "/tmp/dispatcherTest/log.txt" ) as f :
+			lines = [ l.split() for l in f.readlines() ]
+
+		entries = [ ( l[0], int( l[1] ) ) for l in lines ]
+		self.assertEqual(
+			sorted( entries ),
+			sorted( ( name, frame ) for name in [ "n1", "n2a", "n2b", "n2c" ] for frame in range( 1, 5 ) )
+		)
+
+		# Tasks really did run concurrently, but never more than
+		# `maxConcurrentJobs` at once.
+		running = [ int( l[2] ) for l in lines ]
+		self.assertEqual( max( running ), 2 )
+
+		# The weight of n2c is clamped to `maxConcurrentJobs`, so it
+		# always runs on its own.
+		for l in lines :
+			if l[0] == "n2c" :
+				self.assertEqual( int( l[2] ), 1 )
+
+		# preTasks must still complete before their dependents start.
+		for frame in range( 1, 5 ) :
+			n1Index = entries.index( ( "n1", frame ) )
+			for name in [ "n2a", "n2b", "n2c" ] :
+				self.assertLess( entries.index( ( name, frame ) ), n1Index )
+
+		self.assertEqual( os.listdir( "/tmp/dispatcherTest/running" ), [] )
+
+	def testThreadedForegroundDispatch( self ) :
+
+		s = Gaffer.ScriptNode()
+
+		s["n1"] = GafferDispatchTest.TextWriter()
+		s["n1"]["fileName"].setValue( "/tmp/dispatcherTest/n1_####.txt" )
+		s["n1"]["text"].setValue( "n1 on ${frame}" )
+
+		for i, name in enumerate( [ "n2a", "n2b", "n2c" ] ) :
+			s[name] = GafferDispatchTest.TextWriter()
+			s[name]["fileName"].setValue( "/tmp/dispatcherTest/%s_####.txt" % name )
+			s[name]["text"].setValue( name + " on ${frame}" )
+			s["n1"]["preTasks"][i].setInput( s[name]["task"] )
+
+		Gaffer.Metadata.registerNodeValue( s["n2b"], "localDispatcher:threadSafe", IECore.BoolData( False ) )
+
+		dispatcher = GafferDispatch.Dispatcher.create( "LocalTest" )
+		dispatcher["maxConcurrentJobs"].setValue( 4 )
+		dispatcher["framesMode"].setValue( GafferDispatch.Dispatcher.FramesMode.CustomRange )
+		dispatcher["frameRange"].setValue( "1-4" )
+
+		dispatcher.dispatch( [ s["n1"] ] )
+		self.assertEqual( len( dispatcher.jobPool().jobs() ), 0 )
+		self.assertEqual( len( dispatcher.jobPool().failedJobs() ), 0 )
+
+		for frame in range( 1, 5 ) :
+			c = Gaffer.Context( s.context() )
+			c.setFrame( frame )
+			n1FileName = c.substitute( s["n1"]["fileName"].getValue() )
+			self.assertTrue( os.path.isfile( n1FileName ) )
+			for name in [ "n2a", "n2b", "n2c" ] :
+				fileName = c.substitute( s[name]["fileName"].getValue() )
+				with open( fileName ) as f :
+					self.assertEqual( f.read(), "%s on %d" % ( name, frame ) )
+				self.assertLessEqual( os.stat( fileName ).st_mtime, os.stat( n1FileName ).st_mtime )
+
+		# A failure stops any further batches from being executed.
+
+		s["n2a"]["fileName"].setValue( "" )
+		for frame in range( 1, 5 ) :
+			os.remove( "/tmp/dispatcherTest/n1_%04d.txt" % frame )
+
+		dispatcher.dispatch( [ s["n1"] ] )
+		self.assertEqual( len( dispatcher.jobPool().jobs() ), 0 )
+		self.assertEqual( len( dispatcher.jobPool().failedJobs() ), 1 )
+		dispatcher.jobPool()._remove( dispatcher.jobPool().failedJobs()[0], force = True )
+
+		for frame in range( 1, 5 ) :
+			self.assertFalse( os.path.isfile( "/tmp/dispatcherTest/n1_%04d.txt" % frame ) )
+
+	def testTaskHistory( self ) :
+
+		s = Gaffer.ScriptNode()
+		s["n1"] = GafferDispatchTest.TextWriter()
+		s["n1"]["fileName"].setValue( "/tmp/dispatcherTest/n1_####.txt" )
+		s["n1"]["text"].setValue( "n1 on ${frame}" )
+		s["n1"]["dispatcher"]["batchSize"].setValue( 2 )
+
+		dispatcher = GafferDispatch.Dispatcher.create( "LocalTest" )
+		dispatcher["framesMode"].setValue( GafferDispatch.Dispatcher.FramesMode.CustomRange )
+		dispatcher["frameRange"].setValue( "1-10" )
+		dispatcher.dispatch( [ s["n1"] ] )
+
+		# The duration of the node has been recorded, independent of the frame.
+
+		historyFile = os.path.join( os.path.dirname( dispatcher.jobDirectory() ), "taskHistory.json" )
+		with open( historyFile ) as f :
+			history = json.load( f )
+
+		self.assertEqual( len( history ), 1 )
+		key = history.keys()[0]
+		self.assertTrue( key.startswith( "n1:" ) )
+		self.assertGreater( history[key], 0 )
+
+		# Batch sizes are only tuned when a target duration is specified.
+
+		self.assertEqual( dispatcher.batchSize( s["n1"]["task"], s.context() ), 2 )
+
+		with open( historyFile, "w" ) as f :
+			json.dump( { key : 0.1 }, f )
+
+		dispatcher["targetBatchDuration"].setValue( 0.5 )
+		self.assertEqual( dispatcher.batchSize( s["n1"]["task"], s.context() ), 5 )
+
+		# Changing the node invalidates its history.
+
+		s["n1"]["text"].setValue( "n1 on frame ${frame}" )
+		self.assertEqual( dispatcher.batchSize( s["n1"]["task"], s.context() ), 2 )
+
+	def testFailureWithConcurrentJobs( self ) :
+
+		s = Gaffer.ScriptNode()
+
+		s["n1"] = GafferDispatchTest.TextWriter()
+		s["n1"]["fileName"].setValue( "/tmp/dispatcherTest/n1_####.txt" )
+		s["n1"]["text"].setValue( "n1 on ${frame}" )
+
+		s["n2a"] = GafferDispatchTest.TextWriter()
+		s["n2a"]["fileName"].setValue( "" )
+		s["n2a"]["text"].setValue( "n2a on ${frame}" )
+		s["n1"]["preTasks"][0].setInput( s["n2a"]["task"] )
+
+		s["n2b"] = GafferDispatchTest.TextWriter()
+		s["n2b"]["fileName"].setValue( "/tmp/dispatcherTest/n2b_####.txt" )
+		s["n2b"]["text"].setValue( "n2b on ${frame}" )
+		s["n1"]["preTasks"][1].setInput( s["n2b"]["task"] )
+
+		dispatcher = GafferDispatch.Dispatcher.create( "LocalTest" )
+		dispatcher["executeInBackground"].setValue( True )
+		dispatcher["maxConcurrentJobs"].setValue( 4 )
+
+		dispatcher.dispatch( [ s["n1"] ] )
+		dispatcher.jobPool().waitForAll()
+		self.assertEqual( len( dispatcher.jobPool().jobs() ), 0 )
+		self.assertEqual( len( dispatcher.jobPool().failedJobs() ), 1 )
+
+		# n2a failed, so n1 never executed
+		self.assertFalse( os.path.isfile( s.context().substitute( s["n1"]["fileName"].getValue() ) ) )
+
+		dispatcher.jobPool()._remove( dispatcher.jobPool().failedJobs()[0], force = True )
+
+	def testWorkerProcesses( self ) :
+
+		s = Gaffer.ScriptNode()
+
+		s["c"] = GafferDispatch.PythonCommand()
+		s["c"]["command"].setValue( inspect.cleandoc(
+			"""
+			import os
+			with open( "/tmp/dispatcherTest/pids.txt", "a" ) as f :
+				f.write( "%d %d\\n" % ( context.getFrame(), os.getpid() ) )
+			"""
+		) )
+
+		s["w"] = GafferDispatchTest.TextWriter()
+		s["w"]["fileName"].setValue( "" )
+		s["w"]["preTasks"][0].setInput( s["c"]["task"] )
+
+		dispatcher = GafferDispatch.Dispatcher.create( "LocalTest" )
+		dispatcher["executeInBackground"].setValue( True )
+		dispatcher["useWorkerProcesses"].setValue( True )
+		dispatcher["framesMode"].setValue( GafferDispatch.Dispatcher.FramesMode.CustomRange )
+		dispatcher["frameRange"].setValue( "1-4" )
+
+		dispatcher.dispatch( [ s["c"] ] )
+		dispatcher.jobPool().waitForAll()
+		self.assertEqual( len( dispatcher.jobPool().failedJobs() ), 0 )
+
+		# Every batch was executed, and the script was only
+		# loaded once, by a single worker.
+		with open( "/tmp/dispatcherTest/pids.txt" ) as f :
+			lines = [ l.split() for l in f.readlines() ]
+		self.assertEqual( sorted( int( l[0] ) for l in lines ), [ 1, 2, 3, 4 ] )
+		self.assertEqual( len( set( l[1] for l in lines ) ), 1 )
+
+		# Failures in a worker are reported in the usual way.
+		dispatcher.dispatch( [ s["w"] ] )
+		dispatcher.jobPool().waitForAll()
+		self.assertEqual( len( dispatcher.jobPool().jobs() ), 0 )
+		self.assertEqual( len( dispatcher.jobPool().failedJobs() ), 1 )
+
+		dispatcher.jobPool()._remove( dispatcher.jobPool().failedJobs()[0], force = True )
+
+	def testWorkerReuseAfterFailure( self ) :
+
+		s = Gaffer.ScriptNode()
+
+		s["c"] = GafferDispatch.PythonCommand()
+		s["c"]["command"].setValue( inspect.cleandoc(
+			"""
+			import os
+			with open( "/tmp/dispatcherTest/pids.txt", "a" ) as f :
+				f.write( "%d %d\\n" % ( context.getFrame(), os.getpid() ) )
+			if context.getFrame() == variables["failFrame"] :
+				raise Exception( "Failing on frame %d" % context.getFrame() )
+			"""
+		) )
+		failFrame = s["c"]["variables"].addMember( "failFrame", 6 )
+
+		dispatcher = GafferDispatch.Dispatcher.create( "LocalTest" )
+		dispatcher["executeInBackground"].setValue( True )
+		dispatcher["useWorkerProcesses"].setValue( True )
+		dispatcher["maxConcurrentJobs"].setValue( 2 )
+		dispatcher["framesMode"].setValue( GafferDispatch.Dispatcher.FramesMode.CustomRange )
+		dispatcher["frameRange"].setValue( "1-20" )
+
+		# Workers are reused for consecutive batches, and a failure
+		# in one of them must be reported as such, even when the
+		# other worker is busy completing batches of its own.
+
+		dispatcher.dispatch( [ s["c"] ] )
+		dispatcher.jobPool().waitForAll()
+		self.assertEqual( len( dispatcher.jobPool().jobs() ), 0 )
+		self.assertEqual( len( dispatcher.jobPool().failedJobs() ), 1 )
+		dispatcher.jobPool()._remove( dispatcher.jobPool().failedJobs()[0], force = True )
+
+		with open( "/tmp/dispatcherTest/pids.txt" ) as f :
+			lines = [ l.split() for l in f.readlines() ]
+		frames = [ int( l[0] ) for l in lines ]
+		self.assertEqual( len( frames ), len( set( frames ) ) )
+		self.assertTrue( { 1, 2, 6 }.issubset( frames ) )
+		self.assertLess( max( frames ), 20 )
+		self.assertLessEqual( len( set( l[1] for l in lines ) ), 2 )
+
+		# And a subsequent job which doesn't fail succeeds.
+
+		os.remove( "/tmp/dispatcherTest/pids.txt" )
+		failFrame["value"].setValue( 0 )
+
+		dispatcher.dispatch( [ s["c"] ] )
+		dispatcher.jobPool().waitForAll()
+		self.assertEqual( len( dispatcher.jobPool().failedJobs() ), 0 )
+
+		with open( "/tmp/dispatcherTest/pids.txt" ) as f :
+			lines = [ l.split() for l in f.readlines() ]
+		self.assertEqual( sorted( int( l[0] ) for l in lines ), range( 1, 21 ) )
+		self.assertLessEqual( len( set( l[1] for l in lines ) ), 2 )
+
+	def testBatchStatistics( self ) :
+
+		s = Gaffer.ScriptNode()
+
+		s["n1"] = GafferDispatchTest.TextWriter()
+		s["n1"]["fileName"].setValue( "/tmp/dispatcherTest/n1_####.txt" )
+		s["n1"]["text"].setValue( "n1 on ${frame}" )
+
+		s["n2"] = GafferDispatchTest.TextWriter()
+		s["n2"]["fileName"].setValue( "/tmp/dispatcherTest/n2_####.txt" )
+		s["n2"]["text"].setValue( "n2 on ${frame}" )
+		s["n2"]["preTasks"][0].setInput( s["n1"]["task"] )
+
+		dispatcher = GafferDispatch.Dispatcher.create( "LocalTest" )
+		dispatcher["executeInBackground"].setValue( True )
+		dispatcher["framesMode"].setValue( GafferDispatch.Dispatcher.FramesMode.CustomRange )
+		dispatcher["frameRange"].setValue( "1-2" )
+
+		dispatcher.dispatch( [ s["n2"] ] )
+		dispatcher.jobPool().waitForAll()
+
+		with open( os.path.join( dispatcher.jobDirectory(), "batchStatistics.json" ) ) as f :
+			statistics = json.load( f )
+
+		self.assertEqual( len( statistics ), 4 )
+		self.assertEqual(
+			sorted( ( b["node"], b["frames"] ) for b in statistics ),
+			[ ( "n1", "1" ), ( "n1", "2" ), ( "n2", "1" ), ( "n2", "2" ) ]
+		)
+
+		for b in statistics :
+			self.assertGreater( b["wallTime"], 0 )
+			self.assertGreater( b["cpuTime"], 0 )
+			self.assertGreater( b["peakRSS"], 0 )
+			self.assertGreaterEqual( b["readBytes"], 0 )
+			self.assertGreaterEqual( b["writeBytes"], 0 )
+
 	def tearDown( self ) :
 
 		GafferTest.TestCase.tearDown( self )
@@ -365,5 +365,144 @@ class WedgeTest( GafferTest.TestCase ) :
 		# the wedge variable at all.
 		self.assertEqual( len( script["constant"].log ), 1 )
 
+	def testSingleProcess( self ) :
+
+		script = Gaffer.ScriptNode()
+
+		script["constant"] = GafferDispatchTest.LoggingTaskNode()
+
+		script["writer"] = GafferDispatchTest.TextWriter()
+		script["writer"]["preTasks"][0].setInput( script["constant"]["task"] )
+		script["writer"]["fileName"].setValue( self.temporaryDirectory() + "/${name}.####.txt" )
+		script["writer"]["text"].setValue( "${name}" )
+
+		script["wedge"] = GafferDispatch.Wedge()
+		script["wedge"]["preTasks"][0].setInput( script["writer"]["task"] )
+		script["wedge"]["variable"].setValue( "name" )
+		script["wedge"]["mode"].setValue( int( GafferDispatch.Wedge.Mode.StringList ) )
+		script["wedge"]["strings"].setValue( IECore.StringVectorData( [ "tom", "dick", "harry" ] ) )
+		script["wedge"]["singleProcess"].setValue( True )
+		script["wedge"]["maxConcurrentVariants"].setValue( 3 )
+
+		# The upstream tasks are no longer dispatched separately.
+		with Gaffer.Context() :
+			self.assertEqual( script["wedge"]["task"].preTasks(), [] )
+			self.assertNotEqual( script["wedge"]["task"].hash(), IECore.MurmurHash() )
+
+		self.__dispatcher( frameRange = "1-2" ).dispatch( [ script["wedge"] ] )
+
+		self.assertEqual(
+			set( glob.glob( self.temporaryDirectory() + "/*.txt" ) ),
+			{
+				self.temporaryDirectory() + "/tom.0001.txt",
+				self.temporaryDirectory() + "/tom.0002.txt",
+				self.temporaryDirectory() + "/dick.0001.txt",
+				self.temporaryDirectory() + "/dick.0002.txt",
+				self.temporaryDirectory() + "/harry.0001.txt",
+				self.temporaryDirectory() + "/harry.0002.txt",
+			}
+		)
+
+		with open( self.temporaryDirectory() + "/dick.0002.txt" ) as f :
+			self.assertEqual( f.read(), "dick" )
+
+		# The constant node is shared by all the variants,
+		# so is only executed once per frame.
+		self.assertEqual( len( script["constant"].log ), 2 )
+
+		# Changing the wedge values changes the hash, because
+		# the upstream tasks change.
+		with Gaffer.Context() :
+			h = script["wedge"]["task"].hash()
+			script["wedge"]["strings"].setValue( IECore.StringVectorData( [ "tom", "dick" ] ) )
+			self.assertNotEqual( script["wedge"]["task"].hash(), h )
+
+	def testTaskListBetweenWedgeAndWriter( self ) :
+
+		# TaskList has a constant hash, but must still
+		# pass each wedged context on to its preTasks.
+		# There are two of them, to check that single
+		# process mode doesn't mistake one for the other
+		# just because their hashes are equal.
+
+		script = Gaffer.ScriptNode()
+
+		script["wedge"] = GafferDispatch.Wedge()
+		script["wedge"]["variable"].setValue( "name" )
+		script["wedge"]["mode"].setValue( int( GafferDispatch.Wedge.Mode.StringList ) )
+		script["wedge"]["strings"].setValue( IECore.StringVectorData( [ "tom", "dick", "harry" ] ) )
+
+		for i, suffix in enumerate( [ "A", "B" ] ) :
+
+			script["writer" + suffix] = GafferDispatchTest.TextWriter()
+			script["writer" + suffix]["fileName"].setValue( self.temporaryDirectory() + "/${name}" + suffix + ".txt" )
+
+			script["taskList" + suffix] = GafferDispatch.TaskList()
+			script["taskList" + suffix]["preTasks"][0].setInput( script["writer" + suffix]["task"] )
+
+			script["wedge"]["preTasks"][i].setInput( script["taskList" + suffix]["task"] )
+
+		for singleProcess in ( False, True ) :
+
+			for f in glob.glob( self.temporaryDirectory() + "/*.txt" ) :
+				os.remove( f )
+
+			script["wedge"]["singleProcess"].setValue( singleProcess )
+			self.__dispatcher().dispatch( [ script["wedge"] ] )
+
+			self.assertEqual(
+				set( glob.glob( self.temporaryDirectory() + "/*.txt" ) ),
+				{
+					self.temporaryDirectory() + "/tomA.txt",
+					self.temporaryDirectory() + "/dickA.txt",
+					self.temporaryDirectory() + "/harryA.txt",
+					self.temporaryDirectory() + "/tomB.txt",
+					self.temporaryDirectory() + "/dickB.txt",
+					self.temporaryDirectory() + "/harryB.txt",
+				}
+			)
+
+	def testSingleProcessWithSequenceExecution( self ) :
+
+		script = Gaffer.ScriptNode()
+
+		script["writer"] = GafferDispatchTest.TextWriter( requiresSequenceExecution = True )
+		script["writer"]["fileName"].setValue( self.temporaryDirectory() + "/${name}.####.txt" )
+
+		script["wedge"] = GafferDispatch.Wedge()
+		script["wedge"]["preTasks"][0].setInput( script["writer"]["task"] )
+		script["wedge"]["variable"].setValue( "name" )
+		script["wedge"]["mode"].setValue( int( GafferDispatch.Wedge.Mode.StringList ) )
+		script["wedge"]["strings"].setValue( IECore.StringVectorData( [ "tom", "dick" ] ) )
+		script["wedge"]["singleProcess"].setValue( True )
+
+		# Sequences can't be executed a frame at a time, so
+		# single process mode must refuse rather than doing so.
+
+		with Gaffer.Context() :
+			self.assertRaisesRegexp( RuntimeError, "requires sequence execution", script["wedge"]["task"].hash )
+
+		self.assertRaisesRegexp(
+			RuntimeError, "requires sequence execution",
+			self.__dispatcher( frameRange = "1-2" ).dispatch, [ script["wedge"] ]
+		)
+		self.assertEqual( glob.glob( self.temporaryDirectory() + "/*.txt" ), [] )
+
+		# Without single process mode, the sequence is dispatched
+		# as normal.
+
+		script["wedge"]["singleProcess"].setValue( False )
+		self.__dispatcher( frameRange = "1-2" ).dispatch( [ script["wedge"] ] )
+
+		self.assertEqual(
+			set( glob.glob( self.temporaryDirectory() + "/*.txt" ) ),
+			{
+				self.temporaryDirectory() + "/tom.0001.txt",
+				self.temporaryDirectory() + "/tom.0002.txt",
+				self.temporaryDirectory() + "/dick.0001.txt",
+				self.temporaryDirectory() + "/dick.0002.txt",
+			}
+		)
+
 if __name__ == "__main__":
 	unittest.main()
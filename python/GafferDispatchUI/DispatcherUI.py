@@ -114,6 +114,21 @@ Gaffer.Metadata.registerNode(
 
 		),
 
+		"incremental" : (
+
+			"description",
+			"""
+			Skips tasks which have already been executed successfully
+			by a previous dispatch of the same job. A task is only
+			skipped if its hash matches that of its most recent
+			execution, and all the tasks
+			it depends on are being skipped too. The record of executed
+			tasks is kept in the directory containing the job directories,
+			and may be deleted to force everything to execute again.
+			""",
+
+		),
+
 	}
 
 )
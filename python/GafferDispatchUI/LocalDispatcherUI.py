@@ -97,6 +97,56 @@ Gaffer.Metadata.registerNode(
 
 		),
 
+		"maxConcurrentJobs" : (
+
+			"description",
+			"""
+			The maximum number of batches which may be executed at the
+			same time. Batches are only launched once all their preTasks
+			have completed, so independent batches run concurrently while
+			dependent ones are still executed in order.
+
+			In the background, each batch is executed in a separate
+			process. In the foreground, batches are executed on threads
+			within the current process, sharing its cache. Nodes which
+			are not safe to execute on multiple threads may opt out by
+			registering a "localDispatcher:threadSafe" metadata value
+			of False, in which case their batches are executed with
+			nothing else running alongside them.
+
+			Nodes may declare that their batches consume more than one
+			slot by registering an integer "localDispatcher:weight"
+			metadata value.
+			""",
+
+		),
+
+		"useWorkerProcesses" : (
+
+			"description",
+			"""
+			Executes background batches in long-lived worker processes
+			which load the script only once per job, rather than launching
+			a new `gaffer execute` process for every batch. This avoids
+			the cost of loading the script repeatedly, and allows later
+			batches to benefit from values cached by earlier ones.
+			""",
+
+		),
+
+		"targetBatchDuration" : (
+
+			"description",
+			"""
+			The duration, in seconds, that batches should ideally take
+			to execute. When non-zero, the batch size for each node is
+			chosen automatically from the durations measured in previous
+			dispatches of the same job, overriding the node's own batch
+			size. Nodes without any measurements use their own batch size.
+			""",
+
+		),
+
 	}
 
 )
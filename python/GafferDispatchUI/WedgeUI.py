@@ -60,6 +60,7 @@ Gaffer.Metadata.registerNode(
 	"layout:activator:modeIsFloatList", lambda node : node["mode"].getValue() == int( node.Mode.FloatList ),
 	"layout:activator:modeIsIntList", lambda node : node["mode"].getValue() == int( node.Mode.IntList ),
 	"layout:activator:modeIsStringList", lambda node : node["mode"].getValue() == int( node.Mode.StringList ),
+	"layout:activator:singleProcessOn", lambda node : node["singleProcess"].getValue(),
 	"layout:activator:modeIsNumeric", lambda node : node["mode"].getValue() in ( int( node.Mode.IntRange ), int( node.Mode.FloatRange ) ),
 
 	"layout:customWidget:numericValues:widgetType", "GafferUI.WedgeUI._NumericValuesPreview",
@@ -279,6 +280,36 @@ Gaffer.Metadata.registerNode(
 
 		],
 
+		"singleProcess" : [
+
+			"description",
+			"""
+			Executes the upstream tasks for all the variants within
+			the Wedge's own task, rather than dispatching them
+			separately. All variants then share a single process and
+			its cache, so upstream work common to all of them, such
+			as loading a heavy asset, is only done once. Progress is
+			reported as each variant completes. Upstream tasks are
+			executed one frame at a time, so tasks requiring sequence
+			execution are not supported, and neither are post tasks.
+			""",
+
+		],
+
+		"maxConcurrentVariants" : [
+
+			"description",
+			"""
+			The maximum number of variants executed at the same time
+			in single process mode. Variants are executed one at a time
+			if any upstream node has registered a "localDispatcher:threadSafe"
+			metadata value of False.
+			""",
+
+			"layout:activator", "singleProcessOn",
+
+		],
+
 	}
 
 )
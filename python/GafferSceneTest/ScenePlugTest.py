@@ -233,5 +233,42 @@ class ScenePlugTest( GafferSceneTest.SceneTestCase ) :
 		self.assertEqual( p.globalsHash(), p["globals"].hash() )
 		self.assertEqual( p.setNamesHash(), p["setNames"].hash() )
 
+	def testPythonComputeNodeDownstreamOfScenePathEvaluation( self ) :
+
+		class ContextRecordingNode( Gaffer.ComputeNode ) :
+
+			def __init__( self, name = "ContextRecordingNode" ) :
+
+				Gaffer.ComputeNode.__init__( self, name )
+
+				self["out"] = Gaffer.FloatPlug( direction = Gaffer.Plug.Direction.Out )
+				self.contexts = []
+
+			def hash( self, output, context, h ) :
+
+				h.append( len( context.get( "scene:path", IECore.InternedStringVectorData() ) ) )
+
+			def compute( self, plug, context ) :
+
+				# Deliberately keep the context alive beyond the
+				# lifetime of the scope that made it current.
+				self.contexts.append( context )
+				plug.setValue( 1 + len( context.get( "scene:path", IECore.InternedStringVectorData() ) ) )
+
+		IECore.registerRunTimeTyped( ContextRecordingNode, typeName = "GafferSceneTest::ContextRecordingNode" )
+
+		n = ContextRecordingNode()
+		s = GafferScene.Sphere()
+		s["radius"].setInput( n["out"] )
+
+		for i in range( 0, 10 ) :
+			self.assertEqual( s["out"].object( "/sphere" ).radius(), 2 )
+			self.assertEqual( s["out"].bound( "/sphere" ), IECore.Box3f( IECore.V3f( -2 ), IECore.V3f( 2 ) ) )
+			self.assertEqual( s["out"].transform( "/sphere" ), IECore.M44f() )
+
+		self.assertTrue( len( n.contexts ) )
+		for c in n.contexts :
+			self.assertEqual( c["scene:path"], IECore.InternedStringVectorData( [ "sphere" ] ) )
+
 if __name__ == "__main__":
 	unittest.main()
@@ -35,6 +35,7 @@
 ##########################################################################
 
 import unittest
+import threading
 
 import IECore
 
@@ -270,5 +271,70 @@ class SetTest( GafferSceneTest.SceneTestCase ) :
 		f["paths"].setValue( IECore.StringVectorData( [ "/group/plane*2" ] ) )
 		self.assertEqual( set( s["out"].set( "n" ).value.paths() ), set( [ "/group/plane2", "/group/plane12", "/group/plane22" ] ) )
 
+	def testSetFilterReadingSetInThreads( self ) :
+
+		# Set computes its set with a parallel traversal, evaluating
+		# its filter at each location. Here that filter reads another
+		# Set, which does the same. Threads share the Standard computes
+		# in between, which used to deadlock with the traversal tasks.
+
+		plane = GafferScene.Plane()
+
+		innerGroup = GafferScene.Group()
+		for i in range( 0, 20 ) :
+			innerGroup["in"][i].setInput( plane["out"] )
+
+		outerGroup = GafferScene.Group()
+		for i in range( 0, 20 ) :
+			outerGroup["in"][i].setInput( innerGroup["out"] )
+
+		pathFilter = GafferScene.PathFilter()
+
+		setA = GafferScene.Set()
+		setA["in"].setInput( outerGroup["out"] )
+		setA["name"].setValue( "a" )
+		setA["filter"].setInput( pathFilter["out"] )
+
+		setAFilter = GafferScene.SetFilter()
+		setAFilter["set"].setValue( "a" )
+
+		setB = GafferScene.Set()
+		setB["in"].setInput( setA["out"] )
+		setB["name"].setValue( "b" )
+		setB["filter"].setInput( setAFilter["out"] )
+
+		setBFilter = GafferScene.SetFilter()
+		setBFilter["set"].setValue( "b" )
+
+		attributes = GafferScene.CustomAttributes()
+		attributes["in"].setInput( setB["out"] )
+		attributes["filter"].setInput( setBFilter["out"] )
+		attributes["attributes"].addMember( "test", 1 )
+
+		for i in range( 1, 11 ) :
+
+			# Change the paths, so that everything must be recomputed.
+			pathFilter["paths"].setValue( IECore.StringVectorData( [ "/group/group*/plane%d" % i ] ) )
+
+			exceptions = []
+			def traverser() :
+
+				try :
+					GafferSceneTest.traverseScene( attributes["out"] )
+				except Exception, e :
+					exceptions.append( e )
+
+			threads = []
+			for j in range( 0, 8 ) :
+				thread = threading.Thread( target = traverser )
+				threads.append( thread )
+				thread.start()
+
+			for thread in threads :
+				thread.join()
+
+			self.assertEqual( exceptions, [] )
+			self.assertEqual( len( setB["out"].set( "b" ).value.paths() ), 20 )
+
 if __name__ == "__main__":
 	unittest.main()
@@ -97,6 +97,20 @@ Gaffer.Metadata.registerNode(
 
 		],
 
+		"checkpointInterval" : [
+
+			"description",
+			"""
+			Controls how iterations are evaluated. Every Nth iteration
+			is evaluated first, in order, so that each later iteration
+			only needs to recurse back as far as the previous checkpoint.
+			This prevents loops with many iterations from exhausting the
+			stack. A value of 0 disables checkpointing, so that iterations
+			are evaluated purely recursively.
+			""",
+
+		],
+
 	}
 
 )
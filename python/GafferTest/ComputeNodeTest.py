@@ -44,6 +44,44 @@ import IECore
 import Gaffer
 import GafferTest
 
+class SlowNode( Gaffer.ComputeNode ) :
+
+	def __init__( self, name = "SlowNode", cachePolicy = Gaffer.ValuePlug.CachePolicy.Standard ) :
+
+		Gaffer.ComputeNode.__init__( self, name )
+
+		self["in"] = Gaffer.IntPlug()
+		self["out"] = Gaffer.IntPlug( direction = Gaffer.Plug.Direction.Out )
+
+		self.cachePolicy = cachePolicy
+		self.numComputeCalls = 0
+
+	def affects( self, input ) :
+
+		result = Gaffer.ComputeNode.affects( self, input )
+		if input.isSame( self["in"] ) :
+			result.append( self["out"] )
+
+		return result
+
+	def hash( self, output, context, h ) :
+
+		if output.isSame( self["out"] ) :
+			self["in"].hash( h )
+
+	def compute( self, plug, context ) :
+
+		if plug.isSame( self["out"] ) :
+			self.numComputeCalls += 1
+			time.sleep( 0.2 )
+			plug.setValue( self["in"].getValue() )
+
+	def computeCachePolicy( self, output ) :
+
+		return self.cachePolicy
+
+IECore.registerRunTimeTyped( SlowNode, typeName = "GafferTest::ComputeNodeTest::SlowNode" )
+
 class ComputeNodeTest( GafferTest.TestCase ) :
 
 	def testOperation( self ) :
@@ -484,5 +522,130 @@ class ComputeNodeTest( GafferTest.TestCase ) :
 
 		GafferTest.testComputeNodeThreading()
 
+	def __computeInThreads( self, plug, numThreads = 10 ) :
+
+		results = []
+		def f() :
+			results.append( plug.getValue() )
+
+		threads = []
+		for i in range( 0, numThreads ) :
+			t = threading.Thread( target = f )
+			t.start()
+			threads.append( t )
+
+		for t in threads :
+			t.join()
+
+		return results
+
+	def testConcurrentComputesAreShared( self ) :
+
+		n = SlowNode()
+		n["in"].setValue( 10 )
+
+		with Gaffer.PerformanceMonitor() as m :
+			results = self.__computeInThreads( n["out"] )
+
+		self.assertEqual( results, [ 10 ] * 10 )
+		self.assertEqual( n.numComputeCalls, 1 )
+		self.assertEqual( m.plugStatistics( n["out"] ).computeCount, 1 )
+		self.assertEqual( m.plugStatistics( n["out"] ).waitCount, 9 )
+
+	def testTaskParallelComputesAreNotShared( self ) :
+
+		n = SlowNode( cachePolicy = Gaffer.ValuePlug.CachePolicy.TaskParallel )
+		n["in"].setValue( 10 )
+
+		with Gaffer.PerformanceMonitor() as m :
+			results = self.__computeInThreads( n["out"] )
+
+		self.assertEqual( results, [ 10 ] * 10 )
+		self.assertGreater( n.numComputeCalls, 1 )
+		self.assertEqual( m.plugStatistics( n["out"] ).waitCount, 0 )
+
+	def testFailedSharedComputeIsReportedToAllThreads( self ) :
+
+		class FailingNode( SlowNode ) :
+
+			def compute( self, plug, context ) :
+
+				time.sleep( 0.2 )
+				raise RuntimeError( "Compute failed" )
+
+		IECore.registerRunTimeTyped( FailingNode )
+
+		n = FailingNode()
+
+		errors = []
+		def f() :
+			try :
+				n["out"].getValue()
+			except Exception as e :
+				errors.append( str( e ) )
+
+		threads = [ threading.Thread( target = f ) for i in range( 0, 4 ) ]
+		for t in threads :
+			t.start()
+		for t in threads :
+			t.join()
+
+		self.assertEqual( len( errors ), 4 )
+		for e in errors :
+			self.assertTrue( "Compute failed" in e )
+
+	def testComputeCacheCost( self ) :
+
+		class LargeValueNode( Gaffer.ComputeNode ) :
+
+			def __init__( self, name = "LargeValueNode" ) :
+
+				Gaffer.ComputeNode.__init__( self, name )
+
+				self["out"] = Gaffer.ObjectPlug( direction = Gaffer.Plug.Direction.Out, defaultValue = IECore.NullObject() )
+
+				self.computeCost = Gaffer.ValuePlug.ComputeCost.MeasuredCost
+				self.numComputeCalls = 0
+
+			def hash( self, output, context, h ) :
+
+				h.append( self.computeCost )
+
+			def compute( self, plug, context ) :
+
+				self.numComputeCalls += 1
+				plug.setValue( IECore.IntVectorData( range( 0, 10000 ) ) )
+
+			def computeCacheCost( self, output ) :
+
+				return self.computeCost
+
+		IECore.registerRunTimeTyped( LargeValueNode )
+
+		n = LargeValueNode()
+
+		originalCacheMemoryLimit = Gaffer.ValuePlug.getCacheMemoryLimit()
+		Gaffer.ValuePlug.setCacheMemoryLimit( 100000 )
+		try :
+
+			# Cheap values which would occupy a significant
+			# fraction of the cache aren't cached.
+
+			n.computeCost = Gaffer.ValuePlug.ComputeCost.CheapCost
+			n["out"].getValue()
+			n["out"].getValue()
+			self.assertEqual( n.numComputeCalls, 2 )
+
+			# But expensive ones are.
+
+			n.computeCost = Gaffer.ValuePlug.ComputeCost.ExpensiveCost
+			n["out"].getValue()
+			n["out"].getValue()
+			self.assertEqual( n.numComputeCalls, 3 )
+
+		finally :
+
+			Gaffer.ValuePlug.setCacheMemoryLimit( originalCacheMemoryLimit )
+
 if __name__ == "__main__":
 	unittest.main()
@@ -617,5 +617,35 @@ class ContextTest( GafferTest.TestCase ) :
 		self.assertEqual( c.getFramesPerSecond(), 48.0 )
 		self.assertAlmostEqual( c.getTime(), 12.0 / 48.0 )
 
+	def testHashAfterEditingCopies( self ) :
+
+		c = Gaffer.Context()
+		c["a"] = 1
+		c["b"] = IECore.StringVectorData( [ "one" ] )
+		h = c.hash()
+
+		for ownership in ( Gaffer.Context.Ownership.Copied, Gaffer.Context.Ownership.Shared, Gaffer.Context.Ownership.Borrowed ) :
+
+			c2 = Gaffer.Context( c, ownership )
+			self.assertEqual( c2.hash(), h )
+
+			c2["a"] = 2
+			self.assertNotEqual( c2.hash(), h )
+
+			c3 = Gaffer.Context()
+			c3["a"] = 2
+			c3["b"] = IECore.StringVectorData( [ "one" ] )
+			self.assertEqual( c2.hash(), c3.hash() )
+
+			c2["a"] = 1
+			self.assertEqual( c2.hash(), h )
+
+			c2.remove( "a" )
+			self.assertNotEqual( c2.hash(), h )
+			c2["a"] = 1
+			self.assertEqual( c2.hash(), h )
+
+		self.assertEqual( c.hash(), h )
+
 if __name__ == "__main__":
 	unittest.main()
@@ -614,5 +614,124 @@ class DependencyNodeTest( GafferTest.TestCase ) :
 
 		s["n2"]["op1"].setInput( s["n1"]["product"] )
 
+	def testDirtyPropagationFollowsGraphEdits( self ) :
+
+		m1 = GafferTest.MultiplyNode()
+		m2 = GafferTest.MultiplyNode()
+		m3 = GafferTest.MultiplyNode()
+
+		m2["op1"].setInput( m1["product"] )
+
+		cs2 = GafferTest.CapturingSlot( m2.plugDirtiedSignal() )
+		cs3 = GafferTest.CapturingSlot( m3.plugDirtiedSignal() )
+
+		for i in range( 0, 2 ) :
+			m1["op1"].setValue( i + 1 )
+			self.assertEqual( [ x[0].getName() for x in cs2 ], [ "op1", "product" ] )
+			self.assertEqual( len( cs3 ), 0 )
+			del cs2[:]
+
+		m2["op1"].setInput( None )
+		m3["op1"].setInput( m1["product"] )
+		del cs2[:]
+		del cs3[:]
+
+		m1["op1"].setValue( 10 )
+		self.assertEqual( len( cs2 ), 0 )
+		self.assertEqual( [ x[0].getName() for x in cs3 ], [ "op1", "product" ] )
+
+		n = Gaffer.Node()
+		n["in"] = Gaffer.IntPlug( flags = Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic )
+		n["in"].setInput( m1["product"] )
+		csN = GafferTest.CapturingSlot( n.plugDirtiedSignal() )
+
+		m1["op1"].setValue( 11 )
+		self.assertEqual( len( csN ), 1 )
+		self.assertTrue( csN[0][0].isSame( n["in"] ) )
+
+		del n["in"]
+		del cs3[:]
+
+		m1["op1"].setValue( 12 )
+		self.assertEqual( [ x[0].getName() for x in cs3 ], [ "op1", "product" ] )
+
+	def testDirtyPropagationCacheInvalidation( self ) :
+
+		s = Gaffer.ScriptNode()
+
+		s["n1"] = GafferTest.MultiplyNode()
+		s["n2"] = GafferTest.MultiplyNode()
+		s["n3"] = GafferTest.MultiplyNode()
+		for a, b in [ ( "n1", "n2" ), ( "n2", "n3" ) ] :
+			s[b]["op1"].setInput( s[a]["product"] )
+			s[b]["op2"].setInput( s[a]["product"] )
+
+		cs = GafferTest.CapturingSlot( s["n2"].plugDirtiedSignal(), s["n3"].plugDirtiedSignal() )
+
+		def dirtied() :
+
+			del cs[:]
+			s["n1"]["op1"].setValue( s["n1"]["op1"].getValue() + 1 )
+			return sorted( c[0].fullName() for c in cs )
+
+		expected = [
+			"ScriptNode.n2.op1", "ScriptNode.n2.op2", "ScriptNode.n2.product",
+			"ScriptNode.n3.op1", "ScriptNode.n3.op2", "ScriptNode.n3.product",
+		]
+		self.assertEqual( dirtied(), expected )
+		self.assertEqual( dirtied(), expected )
+
+		# Edits which don't affect propagation.
+
+		unrelatedPlug = Gaffer.Plug()
+		unrelatedPlug.setFlags( Gaffer.Plug.Flags.Serialisable, False )
+		self.assertEqual( dirtied(), expected )
+
+		# Edits which do.
+
+		s["n3"]["op2"].setName( "renamed" )
+		expected = sorted( [ e.replace( "n3.op2", "n3.renamed" ) for e in expected ] )
+		self.assertEqual( dirtied(), expected )
+		self.assertEqual( dirtied(), expected )
+
+		s["n3"]["op1"].setInput( None )
+		self.assertEqual( dirtied(), [ e for e in expected if e != "ScriptNode.n3.op1" ] )
+
+		s["n3"]["op1"].setInput( s["n2"]["product"] )
+		self.assertEqual( dirtied(), expected )
+
+		s["n2"]["op1"].setInput( None )
+		s["n2"]["op2"].setInput( None )
+		self.assertEqual( dirtied(), [] )
+
+		s["n2"]["op2"].setInput( s["n1"]["product"] )
+		self.assertEqual( dirtied(), [ e for e in expected if e != "ScriptNode.n2.op1" ] )
+
+	def testDirtyPropagationPerformance( self ) :
+
+		# A long chain of nodes, each with its inputs fanned out
+		# from the previous node, edited repeatedly. Edits to the
+		# same plug reuse the cached propagation, unless each is
+		# preceded by a change to the graph, so we time both.
+
+		nodes = [ GafferTest.MultiplyNode() ]
+		for i in range( 0, 1000 ) :
+			n = GafferTest.MultiplyNode()
+			n["op1"].setInput( nodes[-1]["product"] )
+			n["op2"].setInput( nodes[-1]["product"] )
+			nodes.append( n )
+
+		cs = GafferTest.CapturingSlot( nodes[-1].plugDirtiedSignal() )
+
+		unrelatedPlug = Gaffer.Plug()
+		for i in range( 0, 100 ) :
+			unrelatedPlug.setFlags( Gaffer.Plug.Flags.Serialisable, bool( i % 2 ) )
+			nodes[0]["op1"].setValue( i + 1 )
+
+		for i in range( 0, 100 ) :
+			nodes[0]["op1"].setValue( i + 101 )
+
+		self.assertEqual( len( cs ), 600 )
+
 if __name__ == "__main__":
 	unittest.main()
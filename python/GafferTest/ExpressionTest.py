@@ -176,6 +176,44 @@ class ExpressionTest( GafferTest.TestCase ) :
 
 		self.assertEqual( s["n"]["v"]["x"].getValue(), 21 )
 
+	def testNestedInputsAndOutputs( self ) :
+
+		s = Gaffer.ScriptNode()
+
+		s["a"] = Gaffer.Node()
+		s["a"]["user"]["f"] = Gaffer.FloatPlug( flags = Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic )
+		s["a"]["user"]["v"] = Gaffer.V3fPlug( flags = Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic )
+
+		s["b"] = Gaffer.Node()
+		s["b"]["user"]["f"] = Gaffer.FloatPlug( flags = Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic )
+		s["b"]["user"]["s"] = Gaffer.StringPlug( flags = Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic )
+		s["b"]["user"]["v"] = Gaffer.V3fPlug( flags = Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic )
+
+		s["e"] = Gaffer.Expression()
+		s["e"].setExpression(
+			inspect.cleandoc(
+				"""
+				f = parent["a"]["user"]["f"] * context.getFrame()
+				parent["b"]["user"]["f"] = f
+				parent["b"]["user"]["s"] = "%.1f" % f
+				parent["b"]["user"]["v"]["y"] = parent["a"]["user"]["v"]["z"] + f
+				"""
+			),
+			"python",
+		)
+
+		s["a"]["user"]["f"].setValue( 2 )
+		s["a"]["user"]["v"].setValue( IECore.V3f( 1, 2, 3 ) )
+
+		c = Gaffer.Context()
+		for frame in range( 1, 5 ) :
+			c.setFrame( frame )
+			with c :
+				self.assertEqual( s["b"]["user"]["f"].getValue(), 2 * frame )
+				self.assertEqual( s["b"]["user"]["s"].getValue(), "%.1f" % ( 2 * frame ) )
+				self.assertEqual( s["b"]["user"]["v"]["y"].getValue(), 3 + 2 * frame )
+				self.assertEqual( s["b"]["user"]["v"]["x"].getValue(), 0 )
+
 	def testInputsAsInputs( self ) :
 
 		s = Gaffer.ScriptNode()
@@ -1235,5 +1273,30 @@ class ExpressionTest( GafferTest.TestCase ) :
 			"parent['n']['user']['p'] = parent['n']['user']['p'] * 2"
 		)
 
+	def testExecutionContextContainsOnlyReferencedVariables( self ) :
+
+		s = Gaffer.ScriptNode()
+		s["n"] = Gaffer.Node()
+		s["n"]["user"]["s"] = Gaffer.StringPlug( flags = Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic )
+
+		s["e"] = Gaffer.Expression()
+		s["e"].setExpression(
+			'a = context.get( "a", "" )\n'
+			'parent["n"]["user"]["s"] = a + " " + " ".join( sorted( context.keys() ) )'
+		)
+
+		with Gaffer.Context() as c :
+
+			c["a"] = "A"
+			c["b"] = "B"
+			c.setFrame( 10 )
+			self.assertEqual( s["n"]["user"]["s"].getValue(), "A a frame framesPerSecond" )
+			h1 = s["e"]["__execute"].hash()
+
+			c["b"] = "C"
+			c.setFrame( 20 )
+			self.assertEqual( s["n"]["user"]["s"].getValue(), "A a frame framesPerSecond" )
+			self.assertEqual( s["e"]["__execute"].hash(), h1 )
+
 if __name__ == "__main__":
 	unittest.main()
@@ -760,5 +760,70 @@ class GraphComponentTest( GafferTest.TestCase ) :
 		self.assertRaisesRegexp( KeyError, "'a' is not a child of 'GraphComponent'", g.__getitem__, "a" )
 		self.assertRaisesRegexp( KeyError, "'a' is not a child of 'GraphComponent'", g.__delitem__, "a" )
 
+	def testUniqueNamingWithManyChildren( self ) :
+
+		g = Gaffer.GraphComponent()
+		for i in range( 0, 100 ) :
+			g.addChild( Gaffer.GraphComponent( "a" ) )
+		for i in range( 0, 100 ) :
+			g.addChild( Gaffer.GraphComponent( "b1" ) )
+
+		self.assertEqual( [ c.getName() for c in g.children()[:100] ], [ "a" ] + [ "a%d" % i for i in range( 1, 100 ) ] )
+		self.assertEqual( [ c.getName() for c in g.children()[100:] ], [ "b%d" % i for i in range( 1, 101 ) ] )
+
+		for i in range( 0, 200 ) :
+			self.assertTrue( g.getChild( g[i].getName() ).isSame( g[i] ) )
+
+		# Removing the child with the highest suffix frees the suffix up again.
+		a99 = g["a99"]
+		g.removeChild( a99 )
+		self.assertEqual( g.getChild( "a99" ), None )
+		g.addChild( Gaffer.GraphComponent( "a" ) )
+		self.assertEqual( g[-1].getName(), "a99" )
+
+		# Renaming a child to its own name doesn't change it.
+		g["a50"].setName( "a50" )
+		self.assertEqual( g[50].getName(), "a50" )
+
+		# Renaming a child to an existing name makes it unique,
+		# without considering the child's own suffix.
+		c = g["a98"]
+		c.setName( "a" )
+		self.assertEqual( c.getName(), "a100" )
+		self.assertTrue( g["a100"].isSame( c ) )
+		self.assertEqual( g.getChild( "a98" ), None )
+
+		c.setName( "c" )
+		self.assertTrue( g["c"].isSame( c ) )
+		self.assertEqual( g.getChild( "a100" ), None )
+
+		g["a50"]["child"] = Gaffer.GraphComponent()
+		self.assertTrue( g.descendant( "a50.child" ).isSame( g["a50"]["child"] ) )
+
+		g.clearChildren()
+		self.assertEqual( g.getChild( "a" ), None )
+		g.addChild( Gaffer.GraphComponent( "a" ) )
+		self.assertEqual( g[0].getName(), "a" )
+
+	def testUndoRenamesWithManyChildren( self ) :
+
+		s = Gaffer.ScriptNode()
+		for i in range( 0, 100 ) :
+			s.addChild( Gaffer.Node( "n" ) )
+
+		with Gaffer.UndoContext( s ) :
+			s["n10"].setName( "n" )
+
+		self.assertEqual( s.getChild( "n10" ), None )
+		self.assertTrue( "n100" in s )
+
+		s.undo()
+		self.assertTrue( "n10" in s )
+		self.assertEqual( s.getChild( "n100" ), None )
+
+		s.redo()
+		self.assertEqual( s.getChild( "n10" ), None )
+		self.assertTrue( "n100" in s )
+
 if __name__ == "__main__":
 	unittest.main()
@@ -178,5 +178,41 @@ class LoopTest( GafferTest.TestCase ) :
 
 		self.assertTrue( n.correspondingInput( n["out"] ).isSame( n["in"] ) )
 
+	def testCheckpointInterval( self ) :
+
+		s = Gaffer.ScriptNode()
+
+		s["n"] = self.intLoop()
+		s["a"] = GafferTest.AddNode()
+
+		s["n"]["in"].setValue( 0 )
+		s["n"]["next"].setInput( s["a"]["sum"] )
+		s["a"]["op1"].setInput( s["n"]["previous"] )
+
+		s["e"] = Gaffer.Expression()
+		s["e"].setExpression( 'parent["a"]["op2"] = context.get( "loop:index", 0 )' )
+
+		self.assertEqual( s["n"]["checkpointInterval"].getValue(), 10 )
+
+		# Changing the interval doesn't change the result, so we
+		# use a new input value for each test, to ensure that we
+		# evaluate from scratch rather than from the cache.
+		inValue = 0
+		for iterations in ( 0, 1, 9, 10, 11, 25, 2000 ) :
+			s["n"]["iterations"].setValue( iterations )
+			for checkpointInterval in ( 0, 1, 7, 10 ) :
+				if iterations > 100 and checkpointInterval == 0 :
+					continue
+				inValue += 1
+				s["n"]["in"].setValue( inValue )
+				s["n"]["checkpointInterval"].setValue( checkpointInterval )
+				self.assertEqual( s["n"]["out"].getValue(), inValue + sum( range( 0, iterations ) ) )
+
+		# Evaluating from the middle of the loop must also work.
+		s["n"]["in"].setValue( 0 )
+		with Gaffer.Context() as c :
+			c["loop:index"] = 1500
+			self.assertEqual( s["n"]["previous"].getValue(), sum( range( 0, 1500 ) ) )
+
 if __name__ == "__main__":
 	unittest.main()
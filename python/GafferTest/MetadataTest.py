@@ -997,5 +997,56 @@ class MetadataTest( GafferTest.TestCase ) :
 			self.assertEqual( Gaffer.Metadata.nodeValue( s2["n"], "test" ), value )
 			self.assertEqual( Gaffer.Metadata.plugValue( s2["n"]["p"], "test" ), value )
 
+	def testWildcardMatchingAndRegistrationChanges( self ) :
+
+		class MetadataTestNodeE( Gaffer.Node ) :
+
+			def __init__( self, name = "MetadataTestNodeE" ) :
+
+				Gaffer.Node.__init__( self, name )
+
+				self["bbx"] = Gaffer.IntPlug()
+				self["c"] = Gaffer.CompoundPlug()
+				self["c"]["d"] = Gaffer.IntPlug()
+
+		IECore.registerRunTimeTyped( MetadataTestNodeE )
+
+		n = MetadataTestNodeE()
+
+		self.assertEqual( Gaffer.Metadata.plugValue( n["bbx"], "test" ), None )
+		self.assertEqual( Gaffer.Metadata.plugValue( n["c"]["d"], "test" ), None )
+
+		# Registrations must be visible even after the
+		# queries above have been made.
+
+		Gaffer.Metadata.registerPlugValue( MetadataTestNodeE, "bb*", "test", "bb" )
+		self.assertEqual( Gaffer.Metadata.plugValue( n["bbx"], "test" ), "bb" )
+
+		Gaffer.Metadata.registerPlugValue( MetadataTestNodeE, "b*", "test", "b" )
+		self.assertEqual( Gaffer.Metadata.plugValue( n["bbx"], "test" ), "b" )
+
+		Gaffer.Metadata.registerPlugValue( MetadataTestNodeE, "c.*", "test", "c" )
+		self.assertEqual( Gaffer.Metadata.plugValue( n["c"]["d"], "test" ), "c" )
+		self.assertEqual( Gaffer.Metadata.plugValue( n["c"], "test" ), None )
+
+		Gaffer.Metadata.registerPlugValue( Gaffer.Node, "*d", "test", "base" )
+		self.assertEqual( Gaffer.Metadata.plugValue( n["c"]["d"], "test" ), "c" )
+		self.assertEqual( Gaffer.Metadata.plugValue( n["c"]["d"], "test", inherit = False ), "c" )
+
+		Gaffer.Metadata.deregisterPlugValue( MetadataTestNodeE, "c.*", "test" )
+		self.assertEqual( Gaffer.Metadata.plugValue( n["c"]["d"], "test" ), "base" )
+		self.assertEqual( Gaffer.Metadata.plugValue( n["c"]["d"], "test", inherit = False ), None )
+
+		Gaffer.Metadata.deregisterPlugValue( Gaffer.Node, "*d", "test" )
+		self.assertEqual( Gaffer.Metadata.plugValue( n["c"]["d"], "test" ), None )
+
+		# Dynamic values must still be evaluated on every query.
+
+		values = [ 1 ]
+		Gaffer.Metadata.registerPlugValue( MetadataTestNodeE, "c.*", "dynamic", lambda plug : values[0] )
+		self.assertEqual( Gaffer.Metadata.plugValue( n["c"]["d"], "dynamic" ), 1 )
+		values[0] = 2
+		self.assertEqual( Gaffer.Metadata.plugValue( n["c"]["d"], "dynamic" ), 2 )
+
 if __name__ == "__main__":
 	unittest.main()
@@ -113,23 +113,31 @@ class PerformanceMonitorTest( GafferTest.TestCase ) :
 			hashCount = 10,
 			computeCount = 20,
 			hashDuration = 100,
-			computeDuration = 200
+			computeDuration = 200,
+			waitCount = 5,
+			waitDuration = 50
 		)
 
 		self.assertEqual( s.hashCount, 10 )
 		self.assertEqual( s.computeCount, 20 )
 		self.assertEqual( s.hashDuration, 100 )
 		self.assertEqual( s.computeDuration, 200 )
+		self.assertEqual( s.waitCount, 5 )
+		self.assertEqual( s.waitDuration, 50 )
 
 		s.hashCount = 20
 		s.computeCount = 30
 		s.hashDuration = 200
 		s.computeDuration = 300
+		s.waitCount = 6
+		s.waitDuration = 60
 
 		self.assertEqual( s.hashCount, 20 )
 		self.assertEqual( s.computeCount, 30 )
 		self.assertEqual( s.hashDuration, 200 )
 		self.assertEqual( s.computeDuration, 300 )
+		self.assertEqual( s.waitCount, 6 )
+		self.assertEqual( s.waitDuration, 60 )
 
 	def testEnterReturnValue( self ) :
 
@@ -35,7 +35,9 @@
 #
 ##########################################################################
 
+import os
 import gc
+import threading
 
 import IECore
 
@@ -617,17 +619,192 @@ class ValuePlugTest( GafferTest.TestCase ) :
 
 		self.failUnless( n["p"] is p )
 
+	def testHashesAndGetValues( self ) :
+
+		n = GafferTest.FrameNode()
+
+		frames = [ 1, 2, 3, 2, 1 ]
+		contexts = []
+		for frame in frames :
+			c = Gaffer.Context()
+			c.setFrame( frame )
+			contexts.append( c )
+
+		self.assertEqual( n["output"].getValues( contexts ), frames )
+		self.assertEqual( n["output"].getValues( [] ), [] )
+
+		hashes = n["output"].hashes( contexts )
+		self.assertEqual( len( hashes ), len( contexts ) )
+		for c, h in zip( contexts, hashes ) :
+			with c :
+				self.assertEqual( n["output"].hash(), h )
+
+		self.assertEqual( hashes[0], hashes[4] )
+		self.assertNotEqual( hashes[0], hashes[1] )
+
+		p = Gaffer.ObjectPlug( defaultValue = IECore.IntData( 1 ) )
+		self.assertEqual( p.getValues( contexts ), [ IECore.IntData( 1 ) ] * len( contexts ) )
+
+	def testCacheStatisticsDisabledByDefault( self ) :
+
+		self.assertFalse( Gaffer.ValuePlug.getCacheStatisticsEnabled() )
+
+		Gaffer.ValuePlug.resetCacheStatistics()
+
+		n = GafferTest.CachingTestNode()
+		n["in"].setValue( "testCacheStatisticsDisabledByDefault" )
+		n["out"].getValue()
+		n["out"].getValue()
+
+		s = Gaffer.ValuePlug.cacheStatistics().get( ( "GafferTest::CachingTestNode", "out" ), Gaffer.ValuePlug.CacheStatistics() )
+		self.assertEqual( s.hits, 0 )
+		self.assertEqual( s.misses, 0 )
+
+	def testCacheStatistics( self ) :
+
+		Gaffer.ValuePlug.setCacheStatisticsEnabled( True )
+		self.addCleanup( Gaffer.ValuePlug.setCacheStatisticsEnabled, False )
+
+		# Clear the cache, so that it only contains
+		# entries which have statistics.
+		cacheMemoryLimit = Gaffer.ValuePlug.getCacheMemoryLimit()
+		Gaffer.ValuePlug.setCacheMemoryLimit( 0 )
+		Gaffer.ValuePlug.setCacheMemoryLimit( cacheMemoryLimit )
+
+		n = GafferTest.CachingTestNode()
+		n["in"].setValue( "testCacheStatistics" )
+
+		Gaffer.ValuePlug.resetCacheStatistics()
+
+		n["out"].getValue()
+		n["out"].getValue()
+
+		s = Gaffer.ValuePlug.cacheStatistics()[( "GafferTest::CachingTestNode", "out" )]
+		self.assertEqual( s.hits, 1 )
+		self.assertEqual( s.misses, 1 )
+		self.assertGreaterEqual( s.entries, 1 )
+		self.assertGreater( s.memoryUsage, 0 )
+
+		Gaffer.ValuePlug.resetCacheStatistics()
+		s = Gaffer.ValuePlug.cacheStatistics()[( "GafferTest::CachingTestNode", "out" )]
+		self.assertEqual( s.hits, 0 )
+		self.assertEqual( s.misses, 0 )
+
+		total = Gaffer.ValuePlug.CacheStatistics()
+		for s in Gaffer.ValuePlug.cacheStatistics().values() :
+			total += s
+		self.assertEqual( total.memoryUsage, Gaffer.ValuePlug.cacheMemoryUsage() )
+
+	def testHashCacheSizeLimit( self ) :
+
+		Gaffer.ValuePlug.setHashCacheSizeLimit( 10 )
+		self.assertEqual( Gaffer.ValuePlug.getHashCacheSizeLimit(), 10 )
+
+		n = GafferTest.AddNode()
+		c = Gaffer.Context()
+		with c :
+			for i in range( 0, 100 ) :
+				c.setFrame( i )
+				n["sum"].hash()
+				self.assertLessEqual( Gaffer.ValuePlug.hashCacheSize(), 10 )
+
+	def testHashCacheIsSharedBetweenThreads( self ) :
+
+		n = GafferTest.CachingTestNode()
+		n["in"].setValue( "a" )
+
+		c = Gaffer.Context()
+		with c :
+			h = n["out"].hash()
+
+		self.assertEqual( n.numHashCalls, 1 )
+
+		hits = Gaffer.ValuePlug.hashCacheHits()
+		misses = Gaffer.ValuePlug.hashCacheMisses()
+
+		hashes = []
+		def f() :
+			with c :
+				hashes.append( n["out"].hash() )
+
+		t = threading.Thread( target = f )
+		t.start()
+		t.join()
+
+		self.assertEqual( hashes, [ h ] )
+		self.assertEqual( n.numHashCalls, 1 )
+		self.assertEqual( Gaffer.ValuePlug.hashCacheHits(), hits + 1 )
+		self.assertEqual( Gaffer.ValuePlug.hashCacheMisses(), misses )
+
+	def testHashCacheClearedByDirtyPropagation( self ) :
+
+		n = GafferTest.CachingTestNode()
+		n["in"].setValue( "a" )
+		n["out"].hash()
+		self.assertGreater( Gaffer.ValuePlug.hashCacheSize(), 0 )
+
+		n["in"].setValue( "b" )
+		self.assertEqual( Gaffer.ValuePlug.hashCacheSize(), 0 )
+
+	def testDiskCache( self ) :
+
+		Gaffer.ValuePlug.setDiskCacheDirectory( self.temporaryDirectory() + "/diskCache" )
+		self.assertEqual( Gaffer.ValuePlug.getDiskCacheDirectory(), self.temporaryDirectory() + "/diskCache" )
+		self.assertTrue( os.path.isdir( self.temporaryDirectory() + "/diskCache" ) )
+
+		self.assertFalse( Gaffer.ValuePlug.getDiskCacheEnabled( Gaffer.ObjectPlug.staticTypeId() ) )
+		Gaffer.ValuePlug.setDiskCacheEnabled( Gaffer.ObjectPlug.staticTypeId(), True )
+		self.assertTrue( Gaffer.ValuePlug.getDiskCacheEnabled( Gaffer.ObjectPlug.staticTypeId() ) )
+
+		n = GafferTest.CachingTestNode()
+		n["in"].setValue( "a" )
+		self.assertEqual( n["out"].getValue(), IECore.StringData( "a" ) )
+		self.assertEqual( len( os.listdir( self.temporaryDirectory() + "/diskCache" ) ), 1 )
+		self.assertGreater( Gaffer.ValuePlug.diskCacheSize(), 0 )
+
+		# Empty the memory cache, so that the value must
+		# be loaded from disk rather than computed.
+
+		Gaffer.ValuePlug.setCacheMemoryLimit( 0 )
+
+		with Gaffer.PerformanceMonitor() as m :
+			self.assertEqual( n["out"].getValue(), IECore.StringData( "a" ) )
+
+		self.assertEqual( m.plugStatistics( n["out"] ).computeCount, 0 )
+
+		# Plugs which haven't been enabled don't use the disk cache.
+
+		Gaffer.ValuePlug.setDiskCacheEnabled( Gaffer.ObjectPlug.staticTypeId(), False )
+
+		with Gaffer.PerformanceMonitor() as m :
+			self.assertEqual( n["out"].getValue(), IECore.StringData( "a" ) )
+
+		self.assertEqual( m.plugStatistics( n["out"] ).computeCount, 1 )
+
+		# Limiting the size removes files.
+
+		Gaffer.ValuePlug.setDiskCacheSizeLimit( 0 )
+		self.assertEqual( Gaffer.ValuePlug.getDiskCacheSizeLimit(), 0 )
+		self.assertEqual( Gaffer.ValuePlug.diskCacheSize(), 0 )
+		self.assertEqual( os.listdir( self.temporaryDirectory() + "/diskCache" ), [] )
+
 	def setUp( self ) :
 
 		GafferTest.TestCase.setUp( self )
 
 		self.__originalCacheMemoryLimit = Gaffer.ValuePlug.getCacheMemoryLimit()
+		self.__originalHashCacheSizeLimit = Gaffer.ValuePlug.getHashCacheSizeLimit()
+		self.__originalDiskCacheSizeLimit = Gaffer.ValuePlug.getDiskCacheSizeLimit()
 
 	def tearDown( self ) :
 
 		GafferTest.TestCase.tearDown( self )
 
 		Gaffer.ValuePlug.setCacheMemoryLimit( self.__originalCacheMemoryLimit )
+		Gaffer.ValuePlug.setHashCacheSizeLimit( self.__originalHashCacheSizeLimit )
+		Gaffer.ValuePlug.setDiskCacheEnabled( Gaffer.ObjectPlug.staticTypeId(), False )
+		Gaffer.ValuePlug.setDiskCacheDirectory( "" )
+		Gaffer.ValuePlug.setDiskCacheSizeLimit( self.__originalDiskCacheSizeLimit )
 
 if __name__ == "__main__":
 	unittest.main()
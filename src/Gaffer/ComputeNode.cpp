@@ -76,3 +76,13 @@ void ComputeNode::hash( const ValuePlug *output, const Context *context, IECore:
 void ComputeNode::compute( ValuePlug *output, const Context *context ) const
 {
 }
+
+ValuePlug::CachePolicy ComputeNode::computeCachePolicy( const ValuePlug *output ) const
+{
+	return ValuePlug::Standard;
+}
+
+ValuePlug::ComputeCost ComputeNode::computeCacheCost( const ValuePlug *output ) const
+{
+	return ValuePlug::MeasuredCost;
+}
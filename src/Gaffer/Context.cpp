@@ -45,6 +45,7 @@ static char **environ = *_NSGetEnviron();
 #endif
 
 #include <stack>
+#include <vector>
 
 #include "tbb/enumerable_thread_specific.h"
 
@@ -117,6 +118,7 @@ Environment g_environment;
 
 static InternedString g_frame( "frame" );
 static InternedString g_framesPerSecond( "framesPerSecond" );
+static const MurmurHash g_invalidHash;
 
 Context::Context()
 	:	m_changedSignal( NULL ), m_hashValid( false )
@@ -167,6 +169,34 @@ Context::~Context()
 	delete m_changedSignal;
 }
 
+void Context::borrow( const Context &other )
+{
+	clear();
+	m_map = other.m_map;
+	for( Map::iterator it = m_map.begin(), eIt = m_map.end(); it != eIt; ++it )
+	{
+		it->second.ownership = Borrowed;
+	}
+	m_hash = other.m_hash;
+	m_hashValid = other.m_hashValid;
+}
+
+void Context::clear()
+{
+	for( Map::const_iterator it = m_map.begin(), eIt = m_map.end(); it != eIt; ++it )
+	{
+		if( it->second.ownership != Borrowed )
+		{
+			it->second.data->removeRef();
+		}
+	}
+	m_map.clear();
+	m_hashValid = false;
+
+	delete m_changedSignal;
+	m_changedSignal = NULL;
+}
+
 void Context::remove( const IECore::InternedString &name )
 {
 	Map::iterator it = m_map.find( name );
@@ -179,6 +209,11 @@ void Context::remove( const IECore::InternedString &name )
 
 void Context::changed( const IECore::InternedString &name )
 {
+	Map::iterator it = m_map.find( name );
+	if( it != m_map.end() )
+	{
+		it->second.hash = IECore::MurmurHash();
+	}
 	m_hashValid = false;
 	if( m_changedSignal )
 	{
@@ -259,8 +294,13 @@ IECore::MurmurHash Context::hash() const
 		{
 			continue;
 		}
-		m_hash.append( (uint64_t)&name );
-		it->second.data->hash( m_hash );
+		MurmurHash &entryHash = it->second.hash;
+		if( entryHash == g_invalidHash )
+		{
+			entryHash.append( (uint64_t)&name );
+			it->second.data->hash( entryHash );
+		}
+		m_hash.append( entryHash );
 	}
 	m_hashValid = true;
 	return m_hash;
@@ -524,6 +564,71 @@ Context::Scope::~Scope()
 	}
 }
 
+namespace
+{
+
+// Contexts used by EditableScope are recycled via a per-thread pool,
+// so that in the common case an EditableScope doesn't need to make
+// any heap allocations.
+typedef std::vector<ContextPtr> ContextPool;
+typedef tbb::enumerable_thread_specific<ContextPool, tbb::cache_aligned_allocator<ContextPool>, tbb::ets_key_per_instance> ThreadSpecificContextPool;
+ThreadSpecificContextPool g_contextPools;
+const size_t g_maxContextPoolSize = 64;
+
+} // namespace
+
+ContextPtr Context::EditableScope::acquireContext( const Context *context )
+{
+	ContextPool &pool = g_contextPools.local();
+	if( pool.empty() )
+	{
+		return new Context( *context, Borrowed );
+	}
+
+	ContextPtr result = pool.back();
+	pool.pop_back();
+	result->borrow( *context );
+	return result;
+}
+
+Context::EditableScope::EditableScope( const Context *context )
+	:	m_context( acquireContext( context ) ), m_scope( m_context.get() )
+{
+}
+
+Context::EditableScope::~EditableScope()
+{
+	// We can only recycle the context if no-one else has kept a
+	// reference to it. Otherwise we simply let it go, and it will
+	// be destroyed when the last reference is removed.
+	if( m_context->refCount() == 1 )
+	{
+		ContextPool &pool = g_contextPools.local();
+		if( pool.size() < g_maxContextPoolSize )
+		{
+			// Clear now, so that we don't hold on to
+			// any values we took ownership of.
+			m_context->clear();
+			pool.push_back( m_context );
+		}
+	}
+}
+
+void Context::EditableScope::setFrame( float frame )
+{
+	m_context->setFrame( frame );
+}
+
+void Context::EditableScope::setTime( float timeInSeconds )
+{
+	m_context->setTime( timeInSeconds );
+}
+
+void Context::EditableScope::remove( const IECore::InternedString &name )
+{
+	m_context->remove( name );
+}
+
 const Context *Context::current()
 {
 	ContextStack &stack = g_threadContexts.local();
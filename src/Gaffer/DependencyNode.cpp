@@ -58,6 +58,11 @@ void DependencyNode::affects( const Plug *input, AffectedPlugsContainer &outputs
 	}
 }
 
+bool DependencyNode::affectsDependsOnValues() const
+{
+	return false;
+}
+
 
 BoolPlug *DependencyNode::enabledPlug()
 {
@@ -35,6 +35,8 @@
 //
 //////////////////////////////////////////////////////////////////////////
 
+#include <algorithm>
+
 #include "boost/bind.hpp"
 #include "boost/bind/placeholders.hpp"
 
@@ -55,6 +57,9 @@ using namespace Gaffer;
 // Expression implementation
 //////////////////////////////////////////////////////////////////////////
 
+static IECore::InternedString g_frame( "frame" );
+static IECore::InternedString g_framesPerSecond( "framesPerSecond" );
+
 size_t Expression::g_firstPlugIndex;
 
 IE_CORE_DEFINERUNTIMETYPED( Expression );
@@ -327,7 +332,8 @@ void Expression::compute( ValuePlug *output, const Context *context ) const
 			{
 				inputs.push_back( it->get() );
 			}
-			static_cast<ObjectVectorPlug *>( output )->setValue( m_engine->execute( context, inputs ) );
+			ConstContextPtr reducedContext = executionContext( context );
+			static_cast<ObjectVectorPlug *>( output )->setValue( m_engine->execute( reducedContext.get(), inputs ) );
 		}
 		else
 		{
@@ -375,6 +381,40 @@ void Expression::compute( ValuePlug *output, const Context *context ) const
 	ComputeNode::compute( output, context );
 }
 
+ConstContextPtr Expression::executionContext( const Context *context ) const
+{
+	// Our hash only accounts for the context variables the engine
+	// declared in parse(), so execution results are shared between
+	// all contexts which differ only in other variables. We guarantee
+	// that this is valid by executing in a context containing only
+	// the declared variables. This is equivalent to a default
+	// constructed context with the declared variables added, but is
+	// cheaper to make because it doesn't copy any values.
+	static ConstContextPtr defaultContext = new Context;
+	ContextPtr result = new Context( *context, Context::Borrowed );
+
+	std::vector<IECore::InternedString> names;
+	context->names( names );
+	for( std::vector<IECore::InternedString>::const_iterator it = names.begin(), eIt = names.end(); it != eIt; ++it )
+	{
+		if( std::find( m_contextNames.begin(), m_contextNames.end(), *it ) == m_contextNames.end() )
+		{
+			result->remove( *it );
+		}
+	}
+
+	if( std::find( m_contextNames.begin(), m_contextNames.end(), g_frame ) == m_contextNames.end() )
+	{
+		result->setFrame( defaultContext->getFrame() );
+	}
+	if( std::find( m_contextNames.begin(), m_contextNames.end(), g_framesPerSecond ) == m_contextNames.end() )
+	{
+		result->setFramesPerSecond( defaultContext->getFramesPerSecond() );
+	}
+
+	return result;
+}
+
 void Expression::updatePlugs( const std::vector<ValuePlug *> &inPlugs, const std::vector<ValuePlug *> &outPlugs )
 {
 	for( size_t i = 0, e = inPlugs.size(); i < e; ++i )
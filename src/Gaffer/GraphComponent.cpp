@@ -36,11 +36,13 @@
 //////////////////////////////////////////////////////////////////////////
 
 #include <set>
+#include <map>
 
 #include "boost/format.hpp"
 #include "boost/bind.hpp"
 #include "boost/regex.hpp"
 #include "boost/lexical_cast.hpp"
+#include "boost/unordered_map.hpp"
 
 #include "IECore/Exception.h"
 
@@ -53,10 +55,155 @@ using namespace Gaffer;
 using namespace IECore;
 using namespace std;
 
+//////////////////////////////////////////////////////////////////////////
+// ChildIndex
+//////////////////////////////////////////////////////////////////////////
+
+namespace
+{
+
+// We only index the children of components with at least this many
+// children. For fewer children a linear search is just as quick, and
+// we avoid the memory overhead of an index for every plug.
+const size_t g_minIndexedChildren = 32;
+
+// Splits a name into the stem and numeric suffix used by setName()
+// when making names unique. Names without a numeric suffix are
+// considered to have a suffix of 0.
+long stemAndSuffix( const std::string &name, std::string &stem )
+{
+	size_t i = name.size();
+	while( i && isdigit( name[i-1] ) )
+	{
+		--i;
+	}
+	stem = name.substr( 0, i );
+	return strtol( name.c_str() + i, NULL, 10 );
+}
+
+} // namespace
+
+class GraphComponent::ChildIndex : boost::noncopyable
+{
+
+	public :
+
+		ChildIndex( const ChildContainer &children )
+			:	m_duplicates( 0 )
+		{
+			for( ChildContainer::const_iterator it = children.begin(), eIt = children.end(); it != eIt; ++it )
+			{
+				add( it->get() );
+			}
+		}
+
+		const GraphComponent *find( const IECore::InternedString &name ) const
+		{
+			NameMap::const_iterator it = m_names.find( name );
+			return it != m_names.end() ? it->second : NULL;
+		}
+
+		void add( const GraphComponent *child )
+		{
+			if( !m_names.insert( NameMap::value_type( child->m_name, child ) ).second )
+			{
+				// Names are normally unique, but undo and redo can
+				// briefly give two siblings the same name. We only
+				// index the first, and count the others so that
+				// remove() knows when to look for them.
+				m_duplicates++;
+				return;
+			}
+
+			std::string stem;
+			const long suffix = stemAndSuffix( child->m_name.string(), stem );
+			m_suffixes[stem].insert( suffix );
+		}
+
+		void remove( const GraphComponent *child, const ChildContainer &siblings )
+		{
+			NameMap::iterator it = m_names.find( child->m_name );
+			if( it == m_names.end() || it->second != child )
+			{
+				assert( m_duplicates );
+				m_duplicates--;
+				return;
+			}
+
+			m_names.erase( it );
+
+			std::string stem;
+			const long suffix = stemAndSuffix( child->m_name.string(), stem );
+			SuffixMap::iterator sIt = m_suffixes.find( stem );
+			sIt->second.erase( sIt->second.find( suffix ) );
+			if( sIt->second.empty() )
+			{
+				m_suffixes.erase( sIt );
+			}
+
+			if( m_duplicates )
+			{
+				for( ChildContainer::const_iterator cIt = siblings.begin(), cEIt = siblings.end(); cIt != cEIt; ++cIt )
+				{
+					if( cIt->get() != child && (*cIt)->m_name == child->m_name )
+					{
+						m_duplicates--;
+						add( cIt->get() );
+						break;
+					}
+				}
+			}
+		}
+
+		// Returns the largest suffix of any indexed child with
+		// the specified stem, ignoring `exclude`. Returns -1 if
+		// there are no such children.
+		long maxSuffix( const std::string &stem, const GraphComponent *exclude ) const
+		{
+			SuffixMap::const_iterator it = m_suffixes.find( stem );
+			if( it == m_suffixes.end() )
+			{
+				return -1;
+			}
+
+			Suffixes::const_reverse_iterator rIt = it->second.rbegin();
+			if( find( exclude->m_name ) == exclude )
+			{
+				std::string excludeStem;
+				const long excludeSuffix = stemAndSuffix( exclude->m_name.string(), excludeStem );
+				if( excludeStem == stem && excludeSuffix == *rIt )
+				{
+					if( ++rIt == it->second.rend() )
+					{
+						return -1;
+					}
+				}
+			}
+
+			return *rIt;
+		}
+
+	private :
+
+		typedef boost::unordered_map<IECore::InternedString, const GraphComponent *> NameMap;
+		NameMap m_names;
+
+		typedef std::multiset<long> Suffixes;
+		typedef std::map<std::string, Suffixes> SuffixMap;
+		SuffixMap m_suffixes;
+
+		size_t m_duplicates;
+
+};
+
+//////////////////////////////////////////////////////////////////////////
+// GraphComponent
+//////////////////////////////////////////////////////////////////////////
+
 IE_CORE_DEFINERUNTIMETYPED( GraphComponent );
 
 GraphComponent::GraphComponent( const std::string &name )
-	: m_name( name ), m_parent( 0 )
+	: m_name( name ), m_parent( 0 ), m_childIndex( 0 )
 {
 }
 
@@ -73,6 +220,8 @@ GraphComponent::~GraphComponent()
 		(*it)->parentChanging( 0 );
 		(*it)->parentChangedSignal()( (*it).get(), 0 );
 	}
+
+	delete m_childIndex;
 }
 
 const IECore::InternedString &GraphComponent::setName( const IECore::InternedString &name )
@@ -90,12 +239,20 @@ const IECore::InternedString &GraphComponent::setName( const IECore::InternedStr
 	if( m_parent )
 	{
 		bool uniqueAlready = true;
-		for( ChildContainer::const_iterator it=m_parent->m_children.begin(), eIt=m_parent->m_children.end(); it != eIt; it++ )
+		if( m_parent->m_childIndex )
+		{
+			const GraphComponent *sibling = m_parent->m_childIndex->find( newName );
+			uniqueAlready = !sibling || sibling == this;
+		}
+		else
 		{
-			if( *it != this && (*it)->m_name == newName )
+			for( ChildContainer::const_iterator it=m_parent->m_children.begin(), eIt=m_parent->m_children.end(); it != eIt; it++ )
 			{
-				uniqueAlready = false;
-				break;
+				if( *it != this && (*it)->m_name == newName )
+				{
+					uniqueAlready = false;
+					break;
+				}
 			}
 		}
 
@@ -106,21 +263,32 @@ const IECore::InternedString &GraphComponent::setName( const IECore::InternedStr
 			std::string prefix;
 			int suffix = numericSuffix( newName.value(), 1, &prefix );
 
-			// iterate over all the siblings to find the minimum value for the suffix which
-			// will be greater than any existing suffix.
-			for( ChildContainer::const_iterator it=m_parent->m_children.begin(), eIt=m_parent->m_children.end(); it != eIt; it++ )
+			// find the minimum value for the suffix which will be greater
+			// than any existing suffix.
+			if( m_parent->m_childIndex )
 			{
-				if( *it == this )
+				const long siblingSuffix = m_parent->m_childIndex->maxSuffix( prefix, this );
+				if( siblingSuffix >= 0 )
 				{
-					continue;
+					suffix = max( suffix, (int)siblingSuffix + 1 );
 				}
-				if( (*it)->m_name.value().compare( 0, prefix.size(), prefix ) == 0 )
+			}
+			else
+			{
+				for( ChildContainer::const_iterator it=m_parent->m_children.begin(), eIt=m_parent->m_children.end(); it != eIt; it++ )
 				{
-					char *endPtr = 0;
-					long siblingSuffix = strtol( (*it)->m_name.value().c_str() + prefix.size(), &endPtr, 10 );
-					if( *endPtr == '\0' )
+					if( *it == this )
+					{
+						continue;
+					}
+					if( (*it)->m_name.value().compare( 0, prefix.size(), prefix ) == 0 )
 					{
-						suffix = max( suffix, (int)siblingSuffix + 1 );
+						char *endPtr = 0;
+						long siblingSuffix = strtol( (*it)->m_name.value().c_str() + prefix.size(), &endPtr, 10 );
+						if( *endPtr == '\0' )
+						{
+							suffix = max( suffix, (int)siblingSuffix + 1 );
+						}
 					}
 				}
 			}
@@ -148,7 +316,16 @@ const IECore::InternedString &GraphComponent::setName( const IECore::InternedStr
 
 void GraphComponent::setNameInternal( const IECore::InternedString &name )
 {
+	ChildIndex *siblingIndex = m_parent ? m_parent->m_childIndex : NULL;
+	if( siblingIndex )
+	{
+		siblingIndex->remove( this, m_parent->m_children );
+	}
 	m_name = name;
+	if( siblingIndex )
+	{
+		siblingIndex->add( this );
+	}
 	nameChangedSignal()( this );
 }
 
@@ -304,7 +481,15 @@ void GraphComponent::addChildInternal( GraphComponentPtr child )
 	}
 	m_children.push_back( child );
 	child->m_parent = this;
+	if( m_childIndex )
+	{
+		m_childIndex->add( child.get() );
+	}
 	child->setName( child->m_name.value() ); // to force uniqueness
+	if( !m_childIndex && m_children.size() >= g_minIndexedChildren )
+	{
+		m_childIndex = new ChildIndex( m_children );
+	}
 	childAddedSignal()( this, child.get() );
 	child->parentChangedSignal()( child.get(), previousParent );
 }
@@ -366,6 +551,10 @@ void GraphComponent::removeChildInternal( GraphComponentPtr child, bool emitPare
 		throw Exception( boost::str( boost::format( "GraphComponent::removeChildInternal : \"%s\" is not a child of \"%s\"." ) % child->fullName() % fullName() ) );
 	}
 	m_children.erase( it );
+	if( m_childIndex )
+	{
+		m_childIndex->remove( child.get(), m_children );
+	}
 	child->m_parent = 0;
 	childRemovedSignal()( this, child.get() );
 	if( emitParentChanged )
@@ -379,6 +568,23 @@ const GraphComponent::ChildContainer &GraphComponent::children() const
 	return m_children;
 }
 
+const GraphComponent *GraphComponent::getChildInternal( const IECore::InternedString &name ) const
+{
+	if( m_childIndex )
+	{
+		return m_childIndex->find( name );
+	}
+
+	for( ChildContainer::const_iterator it=m_children.begin(), eIt=m_children.end(); it!=eIt; it++ )
+	{
+		if( (*it)->m_name==name )
+		{
+			return it->get();
+		}
+	}
+	return 0;
+}
+
 GraphComponent *GraphComponent::ancestor( IECore::TypeId type )
 {
 	GraphComponent *a = m_parent;
@@ -43,6 +43,8 @@
 #include "boost/multi_index/ordered_index.hpp"
 #include "boost/multi_index/member.hpp"
 #include "boost/optional.hpp"
+#include "boost/functional/hash.hpp"
+#include "boost/shared_ptr.hpp"
 
 #include "IECore/CompoundData.h"
 #include "IECore/SimpleTypedData.h"
@@ -86,7 +88,12 @@ struct NodeMetadata
 {
 
 	typedef std::pair<InternedString, Metadata::NodeValueFunction> NamedNodeValue;
-	typedef std::pair<InternedString, Metadata::PlugValueFunction> NamedPlugValue;
+	// Plug value functions are held by pointer, so that the memo cache
+	// below can share them without copying. Copying may not be done
+	// safely from arbitrary threads, because the functions registered
+	// from Python hold Python objects.
+	typedef boost::shared_ptr<const Metadata::PlugValueFunction> PlugValueFunctionPtr;
+	typedef std::pair<InternedString, PlugValueFunctionPtr> NamedPlugValue;
 
 	typedef multi_index::multi_index_container<
 		NamedNodeValue,
@@ -110,8 +117,61 @@ struct NodeMetadata
 
 	typedef map<MatchPattern, PlugValues> PlugPathsToValues;
 
+	// Patterns containing wildcards, indexed by the literal prefix
+	// preceding the first wildcard. A pattern can only match plug
+	// paths starting with its prefix, so this lets us consider only
+	// the candidate patterns for each path.
+	typedef multimap<std::string, PlugPathsToValues::const_iterator> WildcardPatterns;
+
 	NodeValues nodeValues;
 	PlugPathsToValues plugPathsToValues;
+	WildcardPatterns wildcardPatterns;
+
+	PlugValues &plugValues( const MatchPattern &plugPath )
+	{
+		PlugPathsToValues::iterator it = plugPathsToValues.find( plugPath );
+		if( it == plugPathsToValues.end() )
+		{
+			it = plugPathsToValues.insert( PlugPathsToValues::value_type( plugPath, PlugValues() ) ).first;
+			const size_t wildcard = plugPath.find( '*' );
+			if( wildcard != std::string::npos )
+			{
+				wildcardPatterns.insert( WildcardPatterns::value_type( plugPath.substr( 0, wildcard ), it ) );
+			}
+		}
+		return it->second;
+	}
+
+	// Appends the wildcard patterns which might match plugPath, in
+	// the same order as they appear in plugPathsToValues.
+	void candidatePatterns( const std::string &plugPath, std::vector<PlugPathsToValues::const_iterator> &candidates ) const
+	{
+		if( wildcardPatterns.empty() )
+		{
+			return;
+		}
+
+		std::string prefix;
+		prefix.reserve( plugPath.size() );
+		for( size_t i = 0; i <= plugPath.size(); ++i )
+		{
+			std::pair<WildcardPatterns::const_iterator, WildcardPatterns::const_iterator> range = wildcardPatterns.equal_range( prefix );
+			for( WildcardPatterns::const_iterator it = range.first; it != range.second; ++it )
+			{
+				candidates.push_back( it->second );
+			}
+			if( i < plugPath.size() )
+			{
+				prefix.push_back( plugPath[i] );
+			}
+		}
+		sort( candidates.begin(), candidates.end(), patternLess );
+	}
+
+	static bool patternLess( PlugPathsToValues::const_iterator a, PlugPathsToValues::const_iterator b )
+	{
+		return a->first < b->first;
+	}
 
 };
 
@@ -123,6 +183,108 @@ NodeMetadataMap &nodeMetadataMap()
 	return m;
 }
 
+// Memoises the plug value registrations found by Metadata::plugValueInternal(),
+// since matching the plug path against the registered patterns for each node
+// type is comparatively expensive, and the UI performs the same queries
+// many times over. Registering or deregistering a plug value clears the
+// cache and increments a generation count. `concurrent_hash_map::clear()`
+// is not safe to call concurrently with lookups, so lookups hold a read
+// lock on the mutex below and clearing holds a write lock. The generation
+// invalidates any entries stored by lookups which began before the clear.
+struct PlugValueCacheKey
+{
+
+	PlugValueCacheKey( IECore::TypeId typeId, const std::string &plugPath, IECore::InternedString key, bool inherit )
+		:	typeId( typeId ), plugPath( plugPath ), key( key ), inherit( inherit )
+	{
+	}
+
+	IECore::TypeId typeId;
+	std::string plugPath;
+	IECore::InternedString key;
+	bool inherit;
+
+};
+
+struct PlugValueCacheHashCompare
+{
+
+	static size_t hash( const PlugValueCacheKey &k )
+	{
+		size_t result = 0;
+		boost::hash_combine( result, (int)k.typeId );
+		boost::hash_combine( result, k.plugPath );
+		boost::hash_combine( result, k.key.c_str() );
+		boost::hash_combine( result, k.inherit );
+		return result;
+	}
+
+	static bool equal( const PlugValueCacheKey &a, const PlugValueCacheKey &b )
+	{
+		return a.typeId == b.typeId && a.key == b.key && a.inherit == b.inherit && a.plugPath == b.plugPath;
+	}
+
+};
+
+// Shares the registered function, which is null
+// if there is no registration.
+struct PlugValueCacheEntry
+{
+	size_t generation;
+	NodeMetadata::PlugValueFunctionPtr function;
+};
+
+typedef concurrent_hash_map<PlugValueCacheKey, PlugValueCacheEntry, PlugValueCacheHashCompare> PlugValueCache;
+
+PlugValueCache &plugValueCache()
+{
+	static PlugValueCache c;
+	return c;
+}
+
+typedef spin_rw_mutex PlugValueCacheMutex;
+PlugValueCacheMutex g_plugValueCacheMutex;
+tbb::atomic<size_t> g_plugValueCacheGeneration;
+
+void invalidatePlugValueCache()
+{
+	PlugValueCacheMutex::scoped_lock lock( g_plugValueCacheMutex, /* write = */ true );
+	g_plugValueCacheGeneration++;
+	plugValueCache().clear();
+}
+
+const NodeMetadata::PlugValueFunctionPtr *plugValueFunction( const NodeMetadata &nodeMetadata, const std::string &plugPath, IECore::InternedString key )
+{
+	// First do a direct lookup using the plug path.
+	NodeMetadata::PlugPathsToValues::const_iterator it = nodeMetadata.plugPathsToValues.find( plugPath );
+	if( it != nodeMetadata.plugPathsToValues.end() )
+	{
+		NodeMetadata::PlugValues::const_iterator vIt = it->second.find( key );
+		if( vIt != it->second.end() )
+		{
+			return &vIt->second;
+		}
+	}
+
+	// And only if the direct lookups fails, do a search of the
+	// wildcard patterns which could match.
+	std::vector<NodeMetadata::PlugPathsToValues::const_iterator> candidates;
+	nodeMetadata.candidatePatterns( plugPath, candidates );
+	for( std::vector<NodeMetadata::PlugPathsToValues::const_iterator>::const_iterator cIt = candidates.begin(), cEIt = candidates.end(); cIt != cEIt; ++cIt )
+	{
+		if( match( plugPath, (*cIt)->first ) )
+		{
+			NodeMetadata::PlugValues::const_iterator vIt = (*cIt)->second.find( key );
+			if( vIt != (*cIt)->second.end() )
+			{
+				return &vIt->second;
+			}
+		}
+	}
+
+	return NULL;
+}
+
 struct NamedInstanceValue
 {
 	NamedInstanceValue( InternedString n, ConstDataPtr v, bool p )
@@ -501,9 +663,9 @@ void Metadata::registerPlugValue( IECore::TypeId nodeTypeId, const MatchPattern
 void Metadata::registerPlugValue( IECore::TypeId nodeTypeId, const MatchPattern &plugPath, IECore::InternedString key, PlugValueFunction value )
 {
 	NodeMetadata &nodeMetadata = nodeMetadataMap()[nodeTypeId];
-	NodeMetadata::PlugValues &plugValues = nodeMetadata.plugPathsToValues[plugPath];
+	NodeMetadata::PlugValues &plugValues = nodeMetadata.plugValues( plugPath );
 
-	NodeMetadata::NamedPlugValue namedValue( key, value );
+	NodeMetadata::NamedPlugValue namedValue( key, NodeMetadata::PlugValueFunctionPtr( new PlugValueFunction( value ) ) );
 
 	NodeMetadata::PlugValues::const_iterator it = plugValues.find( key );
 	if( it == plugValues.end() )
@@ -515,6 +677,7 @@ void Metadata::registerPlugValue( IECore::TypeId nodeTypeId, const MatchPattern
 		plugValues.replace( it, namedValue );
 	}
 
+	invalidatePlugValueCache();
 	plugValueChangedSignal()( nodeTypeId, plugPath, key, NULL );
 }
 
@@ -575,48 +738,64 @@ IECore::ConstDataPtr Metadata::plugValueInternal( const Plug *plug, IECore::Inte
 		return NULL;
 	}
 
-	const string plugPath = plug->relativeName( node );
+	const PlugValueCacheKey cacheKey( node->typeId(), plug->relativeName( node ), key, inherit );
 
-	IECore::TypeId typeId = node->typeId();
+	// Take a copy of the generation before looking anything up, so that
+	// a concurrent registration can only cause us to store an entry which
+	// is already out of date, and never one which is wrongly up to date.
+	const size_t generation = g_plugValueCacheGeneration;
+
+	// We release the lock before calling the function, since it may
+	// perform arbitrary work, including further metadata queries.
+	NodeMetadata::PlugValueFunctionPtr function;
+	{
+		PlugValueCacheMutex::scoped_lock lock( g_plugValueCacheMutex, /* write = */ false );
+		PlugValueCache &cache = plugValueCache();
+		PlugValueCache::const_accessor readAccessor;
+		if( cache.find( readAccessor, cacheKey ) && readAccessor->second.generation == generation )
+		{
+			function = readAccessor->second.function;
+			readAccessor.release();
+			lock.release();
+			return function ? (*function)( plug ) : NULL;
+		}
+	}
+
+	const NodeMetadata::PlugValueFunctionPtr *f = NULL;
+	IECore::TypeId typeId = cacheKey.typeId;
 	while( typeId != InvalidTypeId )
 	{
 		NodeMetadataMap::const_iterator nIt = nodeMetadataMap().find( typeId );
 		if( nIt != nodeMetadataMap().end() )
 		{
-			// First do a direct lookup using the plug path.
-			NodeMetadata::PlugPathsToValues::const_iterator it = nIt->second.plugPathsToValues.find( plugPath );
-			const NodeMetadata::PlugPathsToValues::const_iterator eIt = nIt->second.plugPathsToValues.end();
-			if( it != eIt )
+			if( ( f = plugValueFunction( nIt->second, cacheKey.plugPath, key ) ) )
 			{
-				NodeMetadata::PlugValues::const_iterator vIt = it->second.find( key );
-				if( vIt != it->second.end() )
-				{
-					return vIt->second( plug );
-				}
-			}
-			// And only if the direct lookups fails, do a full search using
-			// wildcard matches.
-			for( it = nIt->second.plugPathsToValues.begin(); it != eIt; ++it )
-			{
-				if( match( plugPath, it->first ) )
-				{
-					NodeMetadata::PlugValues::const_iterator vIt = it->second.find( key );
-					if( vIt != it->second.end() )
-					{
-						return vIt->second( plug );
-					}
-				}
+				break;
 			}
 		}
 		typeId = inherit ? RunTimeTyped::baseTypeId( typeId ) : InvalidTypeId;
 	}
-	return NULL;
+
+	if( f )
+	{
+		function = *f;
+	}
+
+	{
+		PlugValueCacheMutex::scoped_lock lock( g_plugValueCacheMutex, /* write = */ false );
+		PlugValueCache::accessor writeAccessor;
+		plugValueCache().insert( writeAccessor, cacheKey );
+		writeAccessor->second.generation = generation;
+		writeAccessor->second.function = function;
+	}
+
+	return function ? (*function)( plug ) : NULL;
 }
 
 void Metadata::deregisterPlugValue( IECore::TypeId nodeTypeId, const MatchPattern &plugPath, IECore::InternedString key )
 {
 	NodeMetadata &nodeMetadata = nodeMetadataMap()[nodeTypeId];
-	NodeMetadata::PlugValues &plugValues = nodeMetadata.plugPathsToValues[plugPath];
+	NodeMetadata::PlugValues &plugValues = nodeMetadata.plugValues( plugPath );
 
 	NodeMetadata::PlugValues::const_iterator it = plugValues.find( key );
 	if( it == plugValues.end() )
@@ -625,6 +804,7 @@ void Metadata::deregisterPlugValue( IECore::TypeId nodeTypeId, const MatchPatter
 	}
 
 	plugValues.erase( it );
+	invalidatePlugValueCache();
 	plugValueChangedSignal()( nodeTypeId, plugPath, key, NULL );
 }
 
@@ -203,6 +203,40 @@ struct HashesPerComputeMetric
 
 };
 
+struct WaitCountMetric
+{
+
+	typedef size_t ResultType;
+
+	ResultType operator() ( const PerformanceMonitor::Statistics &s ) const
+	{
+		return s.waitCount;
+	}
+
+	const char *description() const
+	{
+		return "number of computes shared with another thread";
+	}
+
+};
+
+struct WaitDurationMetric
+{
+
+	typedef boost::chrono::duration<double> ResultType;
+
+	ResultType operator() ( const PerformanceMonitor::Statistics &s ) const
+	{
+		return s.waitDuration;
+	}
+
+	const char *description() const
+	{
+		return "time spent waiting for computes on another thread";
+	}
+
+};
+
 // Utility for invoking a templated functor with a particular metric.
 template<typename F>
 typename F::ResultType dispatchMetric( const F &f, PerformanceMetric performanceMetric )
@@ -225,6 +259,10 @@ typename F::ResultType dispatchMetric( const F &f, PerformanceMetric performance
 			return f( PerComputeDurationMetric() );
 		case HashesPerCompute :
 			return f( HashesPerComputeMetric() );
+		case WaitCount :
+			return f( WaitCountMetric() );
+		case WaitDuration :
+			return f( WaitDurationMetric() );
 		default :
 			return f( InvalidMetric() );
 	}
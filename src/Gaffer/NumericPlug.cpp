@@ -146,6 +146,23 @@ T NumericPlug<T>::getValue( const IECore::MurmurHash *precomputedHash ) const
 	return d->readable();
 }
 
+template<class T>
+void NumericPlug<T>::getValues( const std::vector<const Context *> &contexts, std::vector<T> &values ) const
+{
+	std::vector<ConstObjectPtr> objects;
+	getObjectValues( contexts, objects );
+	values.resize( objects.size() );
+	for( size_t i = 0, e = objects.size(); i < e; ++i )
+	{
+		const DataType *d = IECore::runTimeCast<const DataType>( objects[i].get() );
+		if( !d )
+		{
+			throw IECore::Exception( "NumericPlug::getObjectValues() didn't return expected type - is the hash being computed correctly?" );
+		}
+		values[i] = d->readable();
+	}
+}
+
 template<class T>
 void NumericPlug<T>::setFrom( const ValuePlug *other )
 {
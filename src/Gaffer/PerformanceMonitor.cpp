@@ -44,14 +44,19 @@ using namespace Gaffer;
 /// then we can use the types defined there directly.
 static IECore::InternedString g_hashType( "computeNode:hash" );
 static IECore::InternedString g_computeType( "computeNode:compute" );
+static IECore::InternedString g_waitType( "computeNode:wait" );
+/// \todo Similarly, we could use the type from TaskNode directly if it was
+/// exposed, but GafferDispatch depends on Gaffer rather than the other way
+/// round.
+static IECore::InternedString g_taskHashType( "taskNode:hash" );
 static PerformanceMonitor::Statistics g_emptyStatistics;
 
 //////////////////////////////////////////////////////////////////////////
 // PerformanceMonitor::Statistics
 //////////////////////////////////////////////////////////////////////////
 
-PerformanceMonitor::Statistics::Statistics( size_t hashCount, size_t computeCount, boost::chrono::nanoseconds hashDuration, boost::chrono::nanoseconds computeDuration )
-	:	hashCount( hashCount ), computeCount( computeCount ), hashDuration( hashDuration ), computeDuration( computeDuration )
+PerformanceMonitor::Statistics::Statistics( size_t hashCount, size_t computeCount, boost::chrono::nanoseconds hashDuration, boost::chrono::nanoseconds computeDuration, size_t waitCount, boost::chrono::nanoseconds waitDuration )
+	:	hashCount( hashCount ), computeCount( computeCount ), hashDuration( hashDuration ), computeDuration( computeDuration ), waitCount( waitCount ), waitDuration( waitDuration )
 {
 }
 
@@ -61,6 +66,8 @@ PerformanceMonitor::Statistics & PerformanceMonitor::Statistics::operator += ( c
 	computeCount += rhs.computeCount;
 	hashDuration += rhs.hashDuration;
 	computeDuration += rhs.computeDuration;
+	waitCount += rhs.waitCount;
+	waitDuration += rhs.waitDuration;
 	return *this;
 }
 
@@ -70,7 +77,9 @@ bool PerformanceMonitor::Statistics::operator == ( const Statistics &rhs )
 		hashCount == rhs.hashCount &&
 		computeCount == rhs.computeCount &&
 		hashDuration == rhs.hashDuration &&
-		computeDuration == rhs.computeDuration
+		computeDuration == rhs.computeDuration &&
+		waitCount == rhs.waitCount &&
+		waitDuration == rhs.waitDuration
 	;
 }
 
@@ -111,7 +120,7 @@ const PerformanceMonitor::Statistics &PerformanceMonitor::plugStatistics( const
 void PerformanceMonitor::processStarted( const Process *process )
 {
 	const IECore::InternedString type = process->type();
-	if( type != g_hashType && type != g_computeType )
+	if( type != g_hashType && type != g_computeType && type != g_waitType && type != g_taskHashType )
 	{
 		return;
 	}
@@ -126,22 +135,27 @@ void PerformanceMonitor::processStarted( const Process *process )
 	threadData.then = now;
 
 	Statistics &s = threadData.statistics[process->plug()];
-	if( type == g_hashType )
+	if( type == g_hashType || type == g_taskHashType )
 	{
 		s.hashCount++;
 		threadData.durationStack.push( &s.hashDuration );
 	}
-	else
+	else if( type == g_computeType )
 	{
 		s.computeCount++;
 		threadData.durationStack.push( &s.computeDuration );
 	}
+	else
+	{
+		s.waitCount++;
+		threadData.durationStack.push( &s.waitDuration );
+	}
 }
 
 void PerformanceMonitor::processFinished( const Process *process )
 {
 	const IECore::InternedString type = process->type();
-	if( type != g_hashType && type != g_computeType )
+	if( type != g_hashType && type != g_computeType && type != g_waitType && type != g_taskHashType )
 	{
 		return;
 	}
@@ -36,12 +36,14 @@
 //////////////////////////////////////////////////////////////////////////
 
 #include "tbb/enumerable_thread_specific.h"
+#include "tbb/atomic.h"
 
 #include "boost/format.hpp"
 #include "boost/bind.hpp"
 #include "boost/graph/adjacency_list.hpp"
 #include "boost/graph/topological_sort.hpp"
 #include "boost/unordered_map.hpp"
+#include "boost/shared_ptr.hpp"
 
 #include "IECore/Exception.h"
 
@@ -87,6 +89,18 @@ class ScopedAssignment : boost::noncopyable
 
 };
 
+// Incremented whenever the graph is edited in a way which might
+// change the results of dirty propagation, invalidating the
+// caches held by Plug::DirtyPlugs.
+tbb::atomic<uint64_t> g_dependencyEpoch;
+
+void dependenciesChanged()
+{
+	++g_dependencyEpoch;
+}
+
+const size_t g_maxDependentsCacheSize = 10000;
+
 } // namespace
 
 //////////////////////////////////////////////////////////////////////////
@@ -100,10 +114,13 @@ Plug::Plug( const std::string &name, Direction direction, unsigned flags )
 {
 	setFlags( flags );
 	parentChangedSignal().connect( boost::bind( &Plug::parentChanged, this ) );
+	// Some affects() implementations depend on plug names.
+	nameChangedSignal().connect( boost::bind( &dependenciesChanged ) );
 }
 
 Plug::~Plug()
 {
+	dependenciesChanged();
 	setInputInternal( 0, false );
 	for( OutputContainer::iterator it=m_outputs.begin(); it!=m_outputs.end(); )
 	{
@@ -213,6 +230,7 @@ void Plug::setFlags( unsigned flags, bool enable )
 void Plug::setFlagsInternal( unsigned flags )
 {
 	m_flags = flags;
+	dependenciesChanged();
 
 	if( Node *n = node() )
 	{
@@ -445,6 +463,7 @@ void Plug::setInput( PlugPtr input, bool setChildInputs, bool updateParentInput
 
 void Plug::setInputInternal( PlugPtr input, bool emit )
 {
+	dependenciesChanged();
 	if( m_input )
 	{
 		m_input->m_outputs.remove( this );
@@ -566,6 +585,8 @@ PlugPtr Plug::createCounterpart( const std::string &name, Direction direction )
 
 void Plug::parentChanging( Gaffer::GraphComponent *newParent )
 {
+	dependenciesChanged();
+
 	if( getFlags( Dynamic ) )
 	{
 		// When a dynamic plug is removed from a node, we
@@ -663,6 +684,8 @@ void Plug::parentChanging( Gaffer::GraphComponent *newParent )
 
 void Plug::parentChanged()
 {
+	dependenciesChanged();
+
 	if( getFlags( Dynamic ) )
 	{
 		if( node() )
@@ -717,7 +740,7 @@ class Plug::DirtyPlugs
 	public :
 
 		DirtyPlugs()
-			:	m_scopeCount( 0 ), m_emitting( false )
+			:	m_scopeCount( 0 ), m_emitting( false ), m_cacheEpoch( 0 )
 		{
 		}
 
@@ -728,30 +751,23 @@ class Plug::DirtyPlugs
 				return;
 			}
 
-			if( !insertVertex( plugToDirty ).second )
+			if( m_plugs.find( plugToDirty ) != m_plugs.end() )
 			{
 				// Previously inserted, so we'll already
 				// have visited the dependents.
 				return;
 			}
 
-			for( DownstreamIterator it( plugToDirty ); !it.done(); ++it )
-			{
-				InsertedVertex v = insertVertex( &*it );
-				if( !it->getFlags( Plug::AcceptsDependencyCycles ) )
-				{
-					add_edge(
-						v.first,
-						insertVertex( it.upstream() ).first,
-						m_graph
-					);
-				}
+			ConstDependentsPtr d = dependents( plugToDirty );
+			m_dependents.push_back( DependentsAndFirstVertex( d, m_plugs.size() ) );
 
-				if( !v.second )
+			// Hold a reference to each of the plugs, because
+			// otherwise they might be deleted between now and emit().
+			for( std::vector<Plug *>::const_iterator it = d->plugs.begin(), eIt = d->plugs.end(); it != eIt; ++it )
+			{
+				if( m_plugs.insert( PlugMap::value_type( *it, m_plugs.size() ) ).second )
 				{
-					// Already visited this plug by another path,
-					// so we can prune the iteration.
-					it.prune();
+					m_plugRefs.push_back( *it );
 				}
 			}
 		}
@@ -788,10 +804,113 @@ class Plug::DirtyPlugs
 		// sort on the graph to give us an appropriate order to emit the dirty
 		// signals in, so that dirtiness is only signalled for an affected plug
 		// after it has been signalled for all upstream dirty plugs.
-		typedef boost::adjacency_list<vecS, vecS, directedS, PlugPtr> Graph;
+		typedef boost::adjacency_list<vecS, vecS, directedS> Graph;
 		typedef Graph::vertex_descriptor VertexDescriptor;
+		typedef std::pair<VertexDescriptor, VertexDescriptor> Edge;
+
+		typedef boost::unordered_map<const Plug *, VertexDescriptor> PlugMap;
+
+		// Traversing the graph and sorting the dirtied plugs accounts for
+		// most of the cost of dirty propagation, so we cache the results
+		// for each plug that is dirtied, and reuse them until the graph
+		// is next edited. This means that repeated edits to the same plug
+		// (dragging a slider for instance) only pay for the emission of
+		// plugDirtiedSignal().
+		struct Dependents
+		{
+			// The source plug and all the plugs it dirties,
+			// in the order they were visited.
+			std::vector<Plug *> plugs;
+			// Edges between plugs, as indices into the vector above.
+			std::vector<Edge> edges;
+			// Indices into plugs, in the order dirtiness should be signalled.
+			std::vector<VertexDescriptor> sorted;
+			// Error message if sorting failed.
+			std::string error;
+		};
+
+		typedef boost::shared_ptr<const Dependents> ConstDependentsPtr;
+		typedef boost::unordered_map<const Plug *, ConstDependentsPtr> DependentsCache;
+		// Dependents inserted into the current scope, along with the number
+		// of plugs that had already been visited at the time of insertion.
+		typedef std::pair<ConstDependentsPtr, VertexDescriptor> DependentsAndFirstVertex;
+
+		ConstDependentsPtr dependents( Plug *plugToDirty )
+		{
+			const uint64_t epoch = g_dependencyEpoch;
+			if( epoch != m_cacheEpoch || m_cache.size() > g_maxDependentsCacheSize )
+			{
+				m_cache.clear();
+				m_cacheEpoch = epoch;
+			}
+
+			DependentsCache::const_iterator it = m_cache.find( plugToDirty );
+			if( it != m_cache.end() )
+			{
+				return it->second;
+			}
+
+			bool cacheable = true;
+			ConstDependentsPtr result = computeDependents( plugToDirty, cacheable );
+			if( cacheable )
+			{
+				m_cache[plugToDirty] = result;
+			}
+			return result;
+		}
+
+		static ConstDependentsPtr computeDependents( Plug *plugToDirty, bool &cacheable )
+		{
+			boost::shared_ptr<Dependents> result( new Dependents );
+
+			PlugMap plugs;
+			insertVertex( plugToDirty, *result, plugs );
+
+			for( DownstreamIterator it( plugToDirty ); !it.done(); ++it )
+			{
+				if( cacheable )
+				{
+					const DependencyNode *node = IECore::runTimeCast<const DependencyNode>( it->node() );
+					if( node && node->affectsDependsOnValues() )
+					{
+						cacheable = false;
+					}
+				}
+
+				InsertedVertex v = insertVertex( &*it, *result, plugs );
+				if( !it->getFlags( Plug::AcceptsDependencyCycles ) )
+				{
+					result->edges.push_back(
+						Edge( v.first, insertVertex( it.upstream(), *result, plugs ).first )
+					);
+				}
+
+				if( !v.second )
+				{
+					// Already visited this plug by another path,
+					// so we can prune the iteration.
+					it.prune();
+				}
+			}
+
+			Graph graph( result->plugs.size() );
+			for( std::vector<Edge>::const_iterator it = result->edges.begin(), eIt = result->edges.end(); it != eIt; ++it )
+			{
+				add_edge( it->first, it->second, graph );
+			}
+
+			try
+			{
+				topological_sort( graph, std::back_inserter( result->sorted ) );
+			}
+			catch( const std::exception &e )
+			{
+				result->sorted.clear();
+				result->error = e.what();
+			}
 
-		typedef std::map<const Plug *, VertexDescriptor> PlugMap;
+			return result;
+		}
 
 		// Equivalent to the return type for map::insert - the first
 		// field is the vertex descriptor, and the second field is
@@ -799,33 +918,33 @@ class Plug::DirtyPlugs
 		// inserted.
 		typedef std::pair<VertexDescriptor, bool> InsertedVertex;
 
-		InsertedVertex insertVertex( const Plug *plug )
+		static InsertedVertex insertVertex( const Plug *plug, Dependents &dependents, PlugMap &plugs )
 		{
 			// We need to hold a reference to the plug, because otherwise
-			// it might be deleted between now and emit(). But if there is
+			// it might be deleted before emit(). But if there is
 			// no reference yet, the plug is still being constructed, and
 			// we'd end up deleting it in emit() since we'd have sole
 			// ownership. Nobody wants that. If we had weak pointers, this
 			// would make for an ideal use.
 			assert( plug->refCount() );
 
-			PlugMap::const_iterator it = m_plugs.find( plug );
-			if( it != m_plugs.end() )
+			PlugMap::const_iterator it = plugs.find( plug );
+			if( it != plugs.end() )
 			{
 				return InsertedVertex( it->second, false );
 			}
 
-			VertexDescriptor result = add_vertex( m_graph );
-			m_graph[result] = const_cast<Plug *>( plug );
-			m_plugs[plug] = result;
+			VertexDescriptor result = dependents.plugs.size();
+			dependents.plugs.push_back( const_cast<Plug *>( plug ) );
+			plugs[plug] = result;
 
 			// Insert parent plug.
 			if( const Plug *parent = plug->parent<Plug>() )
 			{
 				if( parent->refCount() )
 				{
-					VertexDescriptor parentVertex = insertVertex( parent ).first;
-					add_edge( parentVertex, result, m_graph );
+					VertexDescriptor parentVertex = insertVertex( parent, dependents, plugs ).first;
+					dependents.edges.push_back( Edge( parentVertex, result ) );
 				}
 				else
 				{
@@ -844,9 +963,9 @@ class Plug::DirtyPlugs
 
 		void emit()
 		{
-			// Because we hold a reference to the plugs via m_graph,
+			// Because we hold a reference to the plugs via m_plugRefs,
 			// we may be the last owner. This means that when we clear
-			// the graph below, those plugs may be destroyed, which can
+			// them below, those plugs may be destroyed, which can
 			// trigger another dirty propagation as their child plugs are
 			// removed etc.
 			//
@@ -866,35 +985,86 @@ class Plug::DirtyPlugs
 
 			ScopedAssignment<bool> scopedAssignment( m_emitting, true );
 
-			std::vector<VertexDescriptor> sorted;
-			try
+			if( m_dependents.size() == 1 )
 			{
-				topological_sort( m_graph, std::back_inserter( sorted ) );
+				// Common case - we can use the cached ordering
+				// directly.
+				const Dependents &d = *m_dependents[0].first;
+				if( d.error.size() )
+				{
+					IECore::msg( IECore::Msg::Error, "Plug dirty propagation", d.error );
+				}
+				emit( d.plugs, d.sorted );
 			}
-			catch( const std::exception &e )
+			else if( m_dependents.size() )
 			{
-				IECore::msg( IECore::Msg::Error, "Plug dirty propagation", e.what() );
+				// Several plugs have been dirtied, so we must merge
+				// their dependents into a single graph before sorting.
+				// We ignore edges from plugs visited by a previous
+				// Dependents, just as the traversal in computeDependents()
+				// prunes plugs it has already visited.
+				std::vector<Plug *> plugs( m_plugRefs.size() );
+				for( PlugMap::const_iterator it = m_plugs.begin(), eIt = m_plugs.end(); it != eIt; ++it )
+				{
+					plugs[it->second] = const_cast<Plug *>( it->first );
+				}
+
+				Graph graph( plugs.size() );
+				for( std::vector<DependentsAndFirstVertex>::const_iterator it = m_dependents.begin(), eIt = m_dependents.end(); it != eIt; ++it )
+				{
+					const Dependents &d = *it->first;
+					for( std::vector<Edge>::const_iterator edgeIt = d.edges.begin(), edgeEIt = d.edges.end(); edgeIt != edgeEIt; ++edgeIt )
+					{
+						const VertexDescriptor upstream = m_plugs[d.plugs[edgeIt->second]];
+						if( upstream >= it->second )
+						{
+							add_edge( m_plugs[d.plugs[edgeIt->first]], upstream, graph );
+						}
+					}
+				}
+
+				std::vector<VertexDescriptor> sorted;
+				try
+				{
+					topological_sort( graph, std::back_inserter( sorted ) );
+				}
+				catch( const std::exception &e )
+				{
+					IECore::msg( IECore::Msg::Error, "Plug dirty propagation", e.what() );
+				}
+
+				emit( plugs, sorted );
 			}
 
+			m_dependents.clear();
+			m_plugs.clear();
+			m_plugRefs.clear();
+		}
+
+		static void emit( const std::vector<Plug *> &plugs, const std::vector<VertexDescriptor> &sorted )
+		{
 			for( std::vector<VertexDescriptor>::const_iterator it = sorted.begin(), eIt = sorted.end(); it != eIt; ++it )
 			{
-				Plug *plug = m_graph[*it].get();
+				Plug *plug = plugs[*it];
 				plug->dirty();
 				if( Node *node = plug->node() )
 				{
 					node->plugDirtiedSignal()( plug );
 				}
 			}
-
-			m_graph.clear();
-			m_plugs.clear();
 		}
 
-		Graph m_graph;
+		// The plugs to be dirtied, mapped to their index
+		// in m_plugRefs.
 		PlugMap m_plugs;
+		std::vector<PlugPtr> m_plugRefs;
+		std::vector<DependentsAndFirstVertex> m_dependents;
 		size_t m_scopeCount;
 		bool m_emitting;
 
+		DependentsCache m_cache;
+		uint64_t m_cacheEpoch;
+
 };
 
 void Plug::propagateDirtiness( Plug *plugToDirty )
@@ -111,6 +111,37 @@ std::string StringPlug::getValue( const IECore::MurmurHash *precomputedHash ) co
 	return performSubstitution ? Context::current()->substitute( s->readable(), m_substitutions ) : s->readable();
 }
 
+void StringPlug::getValues( const std::vector<const Context *> &contexts, std::vector<std::string> &values ) const
+{
+	std::vector<IECore::ConstObjectPtr> objects;
+	getObjectValues( contexts, objects );
+
+	const bool performSubstitutions =
+		m_substitutions &&
+		direction()==Plug::In &&
+		Process::current() &&
+		Plug::getFlags( Plug::PerformsSubstitutions );
+
+	values.resize( objects.size() );
+	for( size_t i = 0, e = objects.size(); i < e; ++i )
+	{
+		const IECore::StringData *s = IECore::runTimeCast<const IECore::StringData>( objects[i].get() );
+		if( !s )
+		{
+			throw IECore::Exception( "StringPlug::getObjectValues() didn't return StringData - is the hash being computed correctly?" );
+		}
+
+		if( performSubstitutions && Context::hasSubstitutions( s->readable() ) )
+		{
+			values[i] = contexts[i]->substitute( s->readable(), m_substitutions );
+		}
+		else
+		{
+			values[i] = s->readable();
+		}
+	}
+}
+
 void StringPlug::setFrom( const ValuePlug *other )
 {
 	const StringPlug *tOther = IECore::runTimeCast<const StringPlug >( other );
@@ -35,12 +35,28 @@
 //
 //////////////////////////////////////////////////////////////////////////
 
+#include <set>
+#include <algorithm>
+#include <ctime>
+
+#include "tbb/atomic.h"
 #include "tbb/enumerable_thread_specific.h"
+#include "tbb/concurrent_hash_map.h"
+#include "tbb/mutex.h"
+#include "tbb/tbb_thread.h"
+#include "tbb/spin_rw_mutex.h"
+#include "tbb/parallel_for.h"
 
 #include "boost/bind.hpp"
+#include "boost/shared_ptr.hpp"
 #include "boost/format.hpp"
+#include "boost/filesystem.hpp"
+#include "boost/chrono.hpp"
 #include "boost/unordered_map.hpp"
 
+#include "IECore/FileIndexedIO.h"
+#include "IECore/MessageHandler.h"
+
 #include "Gaffer/Private/IECorePreview/LRUCache.h"
 
 #include "Gaffer/ValuePlug.h"
@@ -77,6 +93,32 @@ inline const ValuePlug *sourcePlug( const ValuePlug *p )
 	return p;
 }
 
+// Functor for computing hashes for a plug in many contexts in parallel.
+struct Hashes
+{
+
+	Hashes( const ValuePlug *plug, const std::vector<const Context *> &contexts, std::vector<IECore::MurmurHash> &hashes )
+		:	m_plug( plug ), m_contexts( contexts ), m_hashes( hashes )
+	{
+	}
+
+	void operator()( const tbb::blocked_range<size_t> &r ) const
+	{
+		for( size_t i = r.begin(); i != r.end(); ++i )
+		{
+			Context::Scope scope( m_contexts[i] );
+			m_hashes[i] = m_plug->hash();
+		}
+	}
+
+	private :
+
+		const ValuePlug *m_plug;
+		const std::vector<const Context *> &m_contexts;
+		std::vector<IECore::MurmurHash> &m_hashes;
+
+};
+
 } // namespace
 
 //////////////////////////////////////////////////////////////////////////
@@ -118,61 +160,70 @@ class ValuePlug::HashProcess : public Process
 			// one per context, computed by ComputeNode::hash(). First we see if we can retrieve the hash
 			// from our cache, and if we can't we'll compute it using a HashProcess instance.
 
-			ThreadData &threadData = g_threadData.local();
-			if( !Process::current() )
-			{
-				// Starting a new root computation.
-				if( ++(threadData.cacheClearCount) == 3200 )
-				{
-					// Prevent unbounded growth in the hash cache
-					// if many computations are being performed
-					// without any plugs being dirtied in between,
-					// by clearing it after every Nth computation.
-					// N == 3200 was observed to be 6x faster than
-					// N == 100 for a procedural instancing scene at
-					// a memory cost of about 100 mb.
-					threadData.clearCache = 1;
-				}
-			}
-
-			if( threadData.clearCache )
-			{
-				threadData.cache.clear();
-				threadData.cacheClearCount = 0;
-				threadData.clearCache = 0;
-			}
-
 			const CacheKey key( p, Context::current()->hash() );
-			Cache::iterator it = threadData.cache.find( key );
-			if( it != threadData.cache.end() )
+			ThreadData &threadData = g_threadData.local();
+			IECore::MurmurHash result = g_cache.get( key );
+			if( result != IECore::MurmurHash() )
 			{
-				return it->second;
+				threadData.hits++;
+				return result;
 			}
 
+			// Not in the cache. Note that we can't compute the hash via the
+			// getter for the cache, because computing it will recurse to
+			// upstream plugs and therefore back into the cache. Instead we
+			// compute it here and then store it explicitly.
+			threadData.misses++;
 			HashProcess process( p, plug );
-			threadData.cache[key] = process.m_result;
+			g_cache.set( key, process.m_result, 1 );
 			return process.m_result;
 		}
 
+		// Returns the cached hash for the current context,
+		// or a default hash if it isn't in the cache.
+		static IECore::MurmurHash cachedHash( const ValuePlug *p )
+		{
+			return g_cache.get( CacheKey( p, Context::current()->hash() ) );
+		}
+
+		static size_t getCacheSizeLimit()
+		{
+			return g_cache.getMaxCost();
+		}
+
+		static void setCacheSizeLimit( size_t maxEntries )
+		{
+			g_cache.setMaxCost( maxEntries );
+		}
+
+		static size_t cacheSize()
+		{
+			return g_cache.currentCost();
+		}
+
 		static void clearCache()
 		{
-			// The docs for enumerable_thread_specific aren't particularly clear
-			// on whether or not it's ok to iterate an e_t_s while concurrently using
-			// local(), which is what we do here. So far in practice it seems to be
-			// OK.
-			tbb::enumerable_thread_specific<ThreadData>::iterator it, eIt;
-			for( it = g_threadData.begin(), eIt = g_threadData.end(); it != eIt; ++it )
+			g_cache.clear();
+		}
+
+		static size_t cacheHits()
+		{
+			size_t result = 0;
+			for( ThreadDataContainer::const_iterator it = g_threadData.begin(), eIt = g_threadData.end(); it != eIt; ++it )
 			{
-				// We can't clear the cache now, because it is most likely
-				// in use by the owning thread. Instead we set this flag to
-				// politely request that the thread clears the cache itself
-				// at its earliest convenience - in the HashProcess constructor.
-				// This delay in clearing is OK, because it is illegal to modify
-				// a graph while a computation is being performed with it, and
-				// we know that the plug requesting the clear will be removed
-				// from the cache before the next computation starts.
-				it->clearCache = 1;
+				result += it->hits;
 			}
+			return result;
+		}
+
+		static size_t cacheMisses()
+		{
+			size_t result = 0;
+			for( ThreadDataContainer::const_iterator it = g_threadData.begin(), eIt = g_threadData.end(); it != eIt; ++it )
+			{
+				result += it->misses;
+			}
+			return result;
 		}
 
 		static const IECore::InternedString staticType;
@@ -212,33 +263,305 @@ class ValuePlug::HashProcess : public Process
 		// in the length of the chain of nodes - not good. Thanks is due to David Minor for
 		// being the first to point this out.
 		//
-		// We address this problem by keeping a per-thread cache of hashes, indexed
-		// by the plug the hash is for and the context the hash was performed in. The
-		// typedefs below describe that data structure. We use Plug::dirty() to empty
-		// the caches, because they are invalidated whenever an upstream value or
-		// connection is changed. We also clear the cache unconditionally every N
-		// computations, to prevent unbounded growth.
+		// We address this problem by keeping a cache of hashes, indexed by the plug
+		// the hash is for and the context the hash was performed in. The cache is
+		// shared between all threads, so that hashes computed on one thread can be
+		// reused by any other. It is an LRUCache, which stripes its locking across
+		// several bins to reduce contention, and which bounds its size by evicting
+		// the least recently used entries. Each entry is given a cost of 1, so the
+		// maximum cost is simply the maximum number of entries. We use Plug::dirty()
+		// to clear the cache, because it is invalidated whenever an upstream value
+		// or connection is changed.
 		typedef std::pair<const ValuePlug *, IECore::MurmurHash> CacheKey;
-		typedef boost::unordered_map<CacheKey, IECore::MurmurHash> Cache;
+		typedef IECorePreview::LRUCache<CacheKey, IECore::MurmurHash> Cache;
+
+		static IECore::MurmurHash nullGetter( const CacheKey &key, size_t &cost )
+		{
+			cost = 0;
+			return IECore::MurmurHash();
+		}
 
-		// To support multithreading, each thread has it's own state.
+		static Cache g_cache;
+
+		// Per-thread statistics, so that we don't introduce contention
+		// by counting cache hits and misses.
 		struct ThreadData
 		{
-			ThreadData() : cacheClearCount( 0 ) {}
-			int cacheClearCount;
-			Cache cache;
-			// Flag to request that hashCache be cleared.
-			tbb::atomic<int> clearCache;
+			ThreadData() : hits( 0 ), misses( 0 ) {}
+			size_t hits;
+			size_t misses;
 		};
 
-		static tbb::enumerable_thread_specific<ThreadData, tbb::cache_aligned_allocator<ThreadData>, tbb::ets_key_per_instance > g_threadData;
+		typedef tbb::enumerable_thread_specific<ThreadData, tbb::cache_aligned_allocator<ThreadData>, tbb::ets_key_per_instance> ThreadDataContainer;
+		static ThreadDataContainer g_threadData;
 
 		IECore::MurmurHash m_result;
 
 };
 
 const IECore::InternedString ValuePlug::HashProcess::staticType( "computeNode:hash" );
-tbb::enumerable_thread_specific<ValuePlug::HashProcess::ThreadData, tbb::cache_aligned_allocator<ValuePlug::HashProcess::ThreadData>, tbb::ets_key_per_instance > ValuePlug::HashProcess::g_threadData;
+ValuePlug::HashProcess::Cache ValuePlug::HashProcess::g_cache( nullGetter, 100000 );
+ValuePlug::HashProcess::ThreadDataContainer ValuePlug::HashProcess::g_threadData;
+
+//////////////////////////////////////////////////////////////////////////
+// The DiskCache provides an optional second tier of caching for computed
+// values, storing them in files on disk so that they can be shared between
+// processes running on the same machine.
+//////////////////////////////////////////////////////////////////////////
+
+namespace
+{
+
+class DiskCache : boost::noncopyable
+{
+
+	public :
+
+		DiskCache()
+			:	m_sizeLimit( 1024 * 1024 * 1024 )
+		{
+			m_active = false;
+			m_size = 0;
+		}
+
+		void setDirectory( const std::string &directory )
+		{
+			if( !directory.empty() )
+			{
+				boost::filesystem::create_directories( directory );
+			}
+
+			Mutex::scoped_lock lock( m_mutex, /* write = */ true );
+			m_directory = directory;
+			m_active = !m_directory.empty() && !m_types.empty();
+			lock.release();
+
+			m_size = scan( /* limit = */ false );
+		}
+
+		std::string getDirectory() const
+		{
+			Mutex::scoped_lock lock( m_mutex, /* write = */ false );
+			return m_directory;
+		}
+
+		void setSizeLimit( size_t bytes )
+		{
+			m_sizeLimit = bytes;
+			m_size = scan( /* limit = */ true );
+		}
+
+		size_t getSizeLimit() const
+		{
+			return m_sizeLimit;
+		}
+
+		size_t size()
+		{
+			// Other processes may be writing to the same directory,
+			// so we can't rely on our own running total.
+			m_size = scan( /* limit = */ false );
+			return m_size;
+		}
+
+		void setEnabled( IECore::TypeId plugType, bool enabled )
+		{
+			Mutex::scoped_lock lock( m_mutex, /* write = */ true );
+			if( enabled )
+			{
+				m_types.insert( plugType );
+			}
+			else
+			{
+				m_types.erase( plugType );
+			}
+			m_active = !m_directory.empty() && !m_types.empty();
+		}
+
+		bool getEnabled( IECore::TypeId plugType ) const
+		{
+			Mutex::scoped_lock lock( m_mutex, /* write = */ false );
+			return m_types.find( plugType ) != m_types.end();
+		}
+
+		// Returns the path of the file used to store values for
+		// plugs of the specified type, or an empty path if values
+		// for such plugs should not be stored.
+		boost::filesystem::path fileName( IECore::TypeId plugType, const IECore::MurmurHash &hash ) const
+		{
+			if( !m_active )
+			{
+				return boost::filesystem::path();
+			}
+
+			Mutex::scoped_lock lock( m_mutex, /* write = */ false );
+			if( m_directory.empty() || m_types.find( plugType ) == m_types.end() )
+			{
+				return boost::filesystem::path();
+			}
+
+			return boost::filesystem::path( m_directory ) / ( hash.toString() + ".fio" );
+		}
+
+		IECore::ConstObjectPtr get( const boost::filesystem::path &fileName ) const
+		{
+			try
+			{
+				if( !boost::filesystem::exists( fileName ) )
+				{
+					return NULL;
+				}
+				IECore::ConstIndexedIOPtr io = new IECore::FileIndexedIO( fileName.string(), IECore::IndexedIO::rootPath, IECore::IndexedIO::Read );
+				IECore::ConstObjectPtr result = IECore::Object::load( io, g_valueEntry );
+				// Update the modification time, because it is used
+				// to decide which files are least recently used.
+				boost::filesystem::last_write_time( fileName, std::time( NULL ) );
+				return result;
+			}
+			catch( const std::exception & )
+			{
+				// The file may have been removed by another process
+				// limiting the size of the cache. We just treat that
+				// as a miss.
+				return NULL;
+			}
+		}
+
+		void set( const boost::filesystem::path &fileName, const IECore::Object *value )
+		{
+			// We write to a temporary file and then rename it, so that
+			// other processes never see a partially written file.
+			const boost::filesystem::path tmpFileName = boost::filesystem::unique_path( fileName.string() + ".%%%%-%%%%-%%%%.tmp" );
+			try
+			{
+				{
+					IECore::IndexedIOPtr io = new IECore::FileIndexedIO( tmpFileName.string(), IECore::IndexedIO::rootPath, IECore::IndexedIO::Write );
+					value->save( io, g_valueEntry );
+				}
+				boost::filesystem::rename( tmpFileName, fileName );
+				m_size += boost::filesystem::file_size( fileName );
+			}
+			catch( const std::exception &e )
+			{
+				boost::system::error_code ec;
+				boost::filesystem::remove( tmpFileName, ec );
+				IECore::msg( IECore::Msg::Warning, "ValuePlug disk cache", e.what() );
+				return;
+			}
+
+			if( m_size > m_sizeLimit )
+			{
+				m_size = scan( /* limit = */ true );
+			}
+		}
+
+	private :
+
+		struct File
+		{
+			std::time_t time;
+			boost::filesystem::path path;
+			size_t size;
+
+			bool operator < ( const File &other ) const
+			{
+				return time < other.time;
+			}
+		};
+
+		// Returns the total size of the files in the cache directory,
+		// optionally removing the least recently used files if the
+		// size exceeds the limit.
+		size_t scan( bool limit )
+		{
+			tbb::mutex::scoped_lock scanLock;
+			if( limit && !scanLock.try_acquire( m_scanMutex ) )
+			{
+				// Another thread is already limiting the size.
+				return m_size;
+			}
+
+			const boost::filesystem::path directory = getDirectory();
+			if( directory.empty() )
+			{
+				return 0;
+			}
+
+			std::vector<File> files;
+			size_t totalSize = 0;
+			boost::system::error_code ec;
+			for( boost::filesystem::directory_iterator it( directory, ec ), eIt; it != eIt; it.increment( ec ) )
+			{
+				if( ec )
+				{
+					break;
+				}
+				if( it->path().extension() != ".fio" )
+				{
+					continue;
+				}
+				File file;
+				file.path = it->path();
+				file.size = boost::filesystem::file_size( file.path, ec );
+				if( !ec )
+				{
+					file.time = boost::filesystem::last_write_time( file.path, ec );
+				}
+				if( ec )
+				{
+					// Removed by another process.
+					ec.clear();
+					continue;
+				}
+				totalSize += file.size;
+				files.push_back( file );
+			}
+
+			if( !limit || totalSize <= m_sizeLimit )
+			{
+				return totalSize;
+			}
+
+			// Remove the least recently used files until we're comfortably
+			// under the limit, so that we don't need to scan again as soon
+			// as the next value is written.
+			const size_t targetSize = m_sizeLimit - m_sizeLimit / 4;
+			std::sort( files.begin(), files.end() );
+			for( std::vector<File>::const_iterator it = files.begin(), eIt = files.end(); it != eIt && totalSize > targetSize; ++it )
+			{
+				boost::filesystem::remove( it->path, ec );
+				totalSize -= it->size;
+			}
+
+			return totalSize;
+		}
+
+		typedef tbb::spin_rw_mutex Mutex;
+		mutable Mutex m_mutex;
+		std::string m_directory;
+		std::set<IECore::TypeId> m_types;
+		// True when m_directory and m_types are both non-empty,
+		// so that we can avoid locking m_mutex when the cache
+		// is not in use.
+		tbb::atomic<bool> m_active;
+
+		size_t m_sizeLimit;
+		tbb::atomic<size_t> m_size;
+		tbb::mutex m_scanMutex;
+
+		static const IECore::IndexedIO::EntryID g_valueEntry;
+
+};
+
+const IECore::IndexedIO::EntryID DiskCache::g_valueEntry( "value" );
+
+DiskCache &diskCache()
+{
+	static DiskCache d;
+	return d;
+}
+
+} // namespace
 
 //////////////////////////////////////////////////////////////////////////
 // The ComputeProcess manages the task of calling ComputeNode::compute()
@@ -265,6 +588,42 @@ class ValuePlug::ComputeProcess : public Process
 			return g_cache.currentCost();
 		}
 
+		static bool isCached( const IECore::MurmurHash &hash )
+		{
+			return g_cache.get( hash ).value.get() != NULL;
+		}
+
+		static void setCacheStatisticsEnabled( bool enabled )
+		{
+			g_cacheStatisticsEnabled = enabled;
+		}
+
+		static bool getCacheStatisticsEnabled()
+		{
+			return g_cacheStatisticsEnabled;
+		}
+
+		static CacheStatisticsMap cacheStatistics()
+		{
+			CacheStatisticsMap result;
+			CacheRecordsMutex::scoped_lock lock( g_cacheRecordsMutex, /* write = */ true );
+			for( CacheRecords::const_iterator it = g_cacheRecords.begin(), eIt = g_cacheRecords.end(); it != eIt; ++it )
+			{
+				result[it->first] = CacheStatistics( it->second.entries, it->second.memoryUsage, it->second.hits, it->second.misses );
+			}
+			return result;
+		}
+
+		static void resetCacheStatistics()
+		{
+			CacheRecordsMutex::scoped_lock lock( g_cacheRecordsMutex, /* write = */ true );
+			for( CacheRecords::iterator it = g_cacheRecords.begin(), eIt = g_cacheRecords.end(); it != eIt; ++it )
+			{
+				it->second.hits = 0;
+				it->second.misses = 0;
+			}
+		}
+
 		static IECore::ConstObjectPtr value( const ValuePlug *plug, const IECore::MurmurHash *precomputedHash )
 		{
 			const ValuePlug *p = sourcePlug( plug );
@@ -288,30 +647,27 @@ class ValuePlug::ComputeProcess : public Process
 				// First see if we've done this computation already, and reuse the
 				// result if we have.
 				IECore::MurmurHash hash = precomputedHash ? *precomputedHash : p->hash();
-				IECore::ConstObjectPtr result = g_cache.get( hash );
-				if( result )
+				const CacheEntry entry = g_cache.get( hash );
+				if( entry.value )
 				{
-					return result;
+					if( entry.record && g_cacheStatisticsEnabled )
+					{
+						entry.record->hits++;
+					}
+					return entry.value;
 				}
 
-				// Otherwise, use a ComputeProcess instance to do the work.
-				ComputeProcess process( p, plug );
-				// Store the value in the cache, after first checking that this hasn't
-				// been done already. The check is useful because it's common for an
-				// upstream compute triggered by to have already
-				// done the work, and calling memoryUsage() can be very expensive for some
-				// datatypes. A prime example of this is the attribute state passed around
-				// in GafferScene - it's common for a selective filter to mean that the
-				// attribute compute is implemented as a pass-through (thus an upstream node
-				// will already have computed the same result) and the attribute data itself
-				// consists of many small objects for which computing memory usage is slow.
-				/// \todo Accessing the LRUCache multiple times like this does have an
-				/// overhead, and at some point we'll need to address that.
-				if( !g_cache.get( hash ) )
+				// Otherwise, do the work ourselves, or wait for another thread
+				// that is already doing it.
+				if( cachePolicy( p ) == Standard )
+				{
+					return sharedValue( p, plug, hash );
+				}
+				else
 				{
-					g_cache.set( hash, process.m_result, process.m_result->memoryUsage() );
+					TaskParallelScope taskParallelScope;
+					return cachedValue( p, plug, hash );
 				}
-				return process.m_result;
 			}
 			else
 			{
@@ -321,6 +677,51 @@ class ValuePlug::ComputeProcess : public Process
 			}
 		}
 
+		static void values( const ValuePlug *plug, const std::vector<const Context *> &contexts, const std::vector<IECore::MurmurHash> &hashes, std::vector<IECore::ConstObjectPtr> &values )
+		{
+			values.resize( contexts.size() );
+
+			// Different contexts often yield identical hashes - for instance
+			// when sampling a transform which isn't animated. We only compute
+			// each unique value once.
+			typedef boost::unordered_map<IECore::MurmurHash, size_t> FirstIndices;
+			FirstIndices firstIndices;
+			std::vector<size_t> uniqueIndices;
+			for( size_t i = 0, e = contexts.size(); i < e; ++i )
+			{
+				if( firstIndices.insert( FirstIndices::value_type( hashes[i], i ) ).second )
+				{
+					uniqueIndices.push_back( i );
+				}
+			}
+
+			// While waiting for the parallel_for, TBB may steal unrelated
+			// tasks onto this thread, so we must not block on computations
+			// being performed by other threads.
+			Values valuesCompute( plug, contexts, hashes, uniqueIndices, values );
+			{
+				TaskParallelScope taskParallelScope;
+				tbb::parallel_for( tbb::blocked_range<size_t>( 0, uniqueIndices.size() ), valuesCompute );
+			}
+
+			if( uniqueIndices.size() != contexts.size() )
+			{
+				for( size_t i = 0, e = contexts.size(); i < e; ++i )
+				{
+					values[i] = values[firstIndices[hashes[i]]];
+				}
+			}
+		}
+
+		static void hashes( const ValuePlug *plug, const std::vector<const Context *> &contexts, std::vector<IECore::MurmurHash> &hashes )
+		{
+			hashes.resize( contexts.size() );
+			// As for values().
+			Hashes hashesCompute( plug, contexts, hashes );
+			TaskParallelScope taskParallelScope;
+			tbb::parallel_for( tbb::blocked_range<size_t>( 0, contexts.size() ), hashesCompute );
+		}
+
 		static void receiveResult( const ValuePlug *plug, IECore::ConstObjectPtr result )
 		{
 			const Process *process = Process::current();
@@ -378,15 +779,418 @@ class ValuePlug::ComputeProcess : public Process
 			}
 		}
 
-		static IECore::ObjectPtr nullGetter( const IECore::MurmurHash &h, size_t &cost )
+		static CachePolicy cachePolicy( const ValuePlug *plug )
+		{
+			if( plug->getInput<ValuePlug>() )
+			{
+				// Conversion from an input of a different type
+				// via setFrom().
+				return Standard;
+			}
+
+			const ComputeNode *n = plug->ancestor<ComputeNode>();
+			return n ? n->computeCachePolicy( plug ) : Standard;
+		}
+
+		// Performs the computation and stores the result in the cache.
+		static IECore::ConstObjectPtr cachedValue( const ValuePlug *p, const ValuePlug *plug, const IECore::MurmurHash &hash )
+		{
+			// Looking up the record is relatively expensive, so we
+			// only do it when statistics have been requested.
+			CacheRecord *record = g_cacheStatisticsEnabled ? cacheRecord( p ) : NULL;
+			if( record )
+			{
+				record->misses++;
+			}
+
+			IECore::ConstObjectPtr result;
+			boost::chrono::nanoseconds duration( 0 );
+			const boost::filesystem::path diskCacheFileName = diskCache().fileName( p->typeId(), hash );
+			{
+				ComputeTimer timer( g_threadData.local(), duration );
+				// See if a previous computation has been stored on disk, possibly by
+				// another process.
+				if( !diskCacheFileName.empty() )
+				{
+					result = diskCache().get( diskCacheFileName );
+				}
+				if( !result )
+				{
+					result = ComputeProcess( p, plug ).m_result;
+					if( !diskCacheFileName.empty() )
+					{
+						diskCache().set( diskCacheFileName, result.get() );
+					}
+				}
+			}
+
+			// Store the value in the cache, after first checking that this hasn't
+			// been done already. The check is useful because it's common for an
+			// upstream compute triggered by to have already
+			// done the work, and calling memoryUsage() can be very expensive for some
+			// datatypes. A prime example of this is the attribute state passed around
+			// in GafferScene - it's common for a selective filter to mean that the
+			// attribute compute is implemented as a pass-through (thus an upstream node
+			// will already have computed the same result) and the attribute data itself
+			// consists of many small objects for which computing memory usage is slow.
+			/// \todo Accessing the LRUCache multiple times like this does have an
+			/// overhead, and at some point we'll need to address that.
+			if( !g_cache.get( hash ).value )
+			{
+				const size_t memoryUsage = result->memoryUsage();
+				const unsigned char priority = cachePriority( p, duration, memoryUsage );
+				// Values which are cheap to recompute aren't worth caching if
+				// they would evict a significant fraction of the cache.
+				if( priority || memoryUsage <= g_cache.getMaxCost() / 8 )
+				{
+					// We update the record before storing the entry, because
+					// the entry may be evicted by another thread as soon as
+					// it is stored.
+					if( record )
+					{
+						record->entries++;
+						record->memoryUsage += memoryUsage;
+					}
+					if( !g_cache.set( hash, CacheEntry( result, record, memoryUsage ), memoryUsage, priority ) && record )
+					{
+						record->entries--;
+						record->memoryUsage -= memoryUsage;
+					}
+				}
+			}
+			return result;
+		}
+
+		static ComputeCost computeCost( const ValuePlug *plug )
+		{
+			if( plug->getInput<ValuePlug>() )
+			{
+				// Conversion from an input of a different type
+				// via setFrom().
+				return CheapCost;
+			}
+
+			const ComputeNode *n = plug->ancestor<ComputeNode>();
+			return n ? n->computeCacheCost( plug ) : MeasuredCost;
+		}
+
+		// Returns the cache priority for a value, which determines how
+		// long it survives in the cache when it is not being used.
+		static unsigned char cachePriority( const ValuePlug *plug, boost::chrono::nanoseconds duration, size_t memoryUsage )
+		{
+			static const unsigned char maxPriority = 3;
+			switch( computeCost( plug ) )
+			{
+				case CheapCost :
+					return 0;
+				case ExpensiveCost :
+					return maxPriority;
+				default :
+				{
+					// Each priority level represents an order of magnitude
+					// increase in the time spent computing each byte.
+					double nanosecondsPerByte = (double)duration.count() / (double)std::max( memoryUsage, (size_t)1 );
+					unsigned char priority = 0;
+					while( nanosecondsPerByte >= 1.0 && priority < maxPriority )
+					{
+						nanosecondsPerByte /= 10.0;
+						priority++;
+					}
+					return priority;
+				}
+			}
+		}
+
+		// Performs the computation on behalf of all threads requesting the same
+		// value, or waits for another thread which is already doing so.
+		static IECore::ConstObjectPtr sharedValue( const ValuePlug *p, const ValuePlug *plug, const IECore::MurmurHash &hash )
+		{
+			// Register our intention to perform the computation. We lock the
+			// mutex before registering, so that any thread which finds our
+			// registration will block until we have a result.
+			InFlightComputationPtr computation( new InFlightComputation );
+			InFlightComputation::Mutex::scoped_lock computationLock( computation->mutex );
+			computation->owner = tbb::this_tbb_thread::get_id();
+			{
+				InFlightComputations::accessor accessor;
+				if( !g_inFlightComputations.insert( accessor, hash ) )
+				{
+					// Someone got there first.
+					InFlightComputationPtr existing = accessor->second;
+					accessor.release();
+					computationLock.release();
+					// If it was us, then this is a pass-through computation
+					// sharing its hash with one further down our stack, and
+					// we must do the work ourselves. We also can't wait while
+					// any TaskParallel computation is in progress. While a
+					// thread waits for the subtasks of such a computation, TBB
+					// may steal unrelated tasks into its stack, and those may
+					// need a computation owned by the thread we would wait for.
+					// That includes the subtasks themselves, which may be run
+					// on any thread. Since TBB 3.0 provides no means of
+					// isolating the subtasks, we can't tell which threads are
+					// affected, so in that case, and if the other thread
+					// failed, we do the work ourselves.
+					if( existing->owner != computation->owner && !g_taskParallelCount )
+					{
+						if( IECore::ConstObjectPtr result = WaitProcess::wait( existing.get(), p, plug ) )
+						{
+							return result;
+						}
+					}
+					return cachedValue( p, plug, hash );
+				}
+				accessor->second = computation;
+			}
+
+			// We're responsible for the computation. The registration removes
+			// itself when we're done, and is destroyed before computationLock,
+			// so waiting threads are only released once the registration is gone.
+			InFlightRegistration registration( hash );
+			computation->result = cachedValue( p, plug, hash );
+			return computation->result;
+		}
+
+		// An entry in the registry of computations currently being performed.
+		struct InFlightComputation
+		{
+			typedef tbb::mutex Mutex;
+			// Held by the computing thread until the result is available.
+			Mutex mutex;
+			tbb::tbb_thread::id owner;
+			// Remains null if the computation failed, in which case
+			// waiting threads perform the computation themselves, so
+			// that they see the exception too.
+			IECore::ConstObjectPtr result;
+		};
+
+		typedef boost::shared_ptr<InFlightComputation> InFlightComputationPtr;
+		typedef tbb::concurrent_hash_map<IECore::MurmurHash, InFlightComputationPtr> InFlightComputations;
+		static InFlightComputations g_inFlightComputations;
+
+		// Removes a registry entry on destruction, whether
+		// the computation succeeded or not.
+		class InFlightRegistration : boost::noncopyable
+		{
+
+			public :
+
+				InFlightRegistration( const IECore::MurmurHash &hash )
+					:	m_hash( hash )
+				{
+				}
+
+				~InFlightRegistration()
+				{
+					g_inFlightComputations.erase( m_hash );
+				}
+
+			private :
+
+				const IECore::MurmurHash m_hash;
+
+		};
+
+		// Process used to represent the time a thread spends waiting
+		// for another thread to finish an identical computation. This
+		// allows monitors to report on the duplicate computations that
+		// have been avoided.
+		class WaitProcess : public Process
+		{
+
+			public :
+
+				static IECore::ConstObjectPtr wait( InFlightComputation *computation, const ValuePlug *plug, const ValuePlug *downstream )
+				{
+					WaitProcess process( plug, downstream );
+					InFlightComputation::Mutex::scoped_lock lock( computation->mutex );
+					return computation->result;
+				}
+
+				static const IECore::InternedString staticType;
+
+			private :
+
+				WaitProcess( const ValuePlug *plug, const ValuePlug *downstream )
+					:	Process( staticType, plug, downstream )
+				{
+				}
+
+		};
+
+		// Per-thread state for the computations currently being
+		// performed.
+		struct ThreadData
+		{
+			ThreadData() : childDuration( 0 ) {}
+			// Time taken by the cached computations performed
+			// within the current one.
+			boost::chrono::nanoseconds childDuration;
+		};
+
+		// Count of the TaskParallel computations in progress on
+		// all threads. Threads only wait for one another while
+		// this is zero - see sharedValue().
+		static tbb::atomic<int> g_taskParallelCount;
+
+		struct TaskParallelScope : boost::noncopyable
+		{
+			TaskParallelScope()
+			{
+				g_taskParallelCount++;
+			}
+
+			~TaskParallelScope()
+			{
+				g_taskParallelCount--;
+			}
+		};
+
+		static tbb::enumerable_thread_specific<ThreadData, tbb::cache_aligned_allocator<ThreadData>, tbb::ets_key_per_instance> g_threadData;
+
+		// Measures the time taken by a computation, excluding the time
+		// taken by any upstream computations performed within it, since
+		// their results are cached separately.
+		class ComputeTimer : boost::noncopyable
+		{
+
+			public :
+
+				ComputeTimer( ThreadData &threadData, boost::chrono::nanoseconds &duration )
+					:	m_threadData( threadData ), m_duration( duration ),
+						m_parentChildDuration( threadData.childDuration ),
+						m_start( boost::chrono::high_resolution_clock::now() )
+				{
+					m_threadData.childDuration = boost::chrono::nanoseconds( 0 );
+				}
+
+				~ComputeTimer()
+				{
+					const boost::chrono::nanoseconds total = boost::chrono::high_resolution_clock::now() - m_start;
+					m_duration = total - m_threadData.childDuration;
+					m_threadData.childDuration = m_parentChildDuration + total;
+				}
+
+			private :
+
+				ThreadData &m_threadData;
+				boost::chrono::nanoseconds &m_duration;
+				const boost::chrono::nanoseconds m_parentChildDuration;
+				const boost::chrono::high_resolution_clock::time_point m_start;
+
+		};
+
+		// Functor for computing values for a plug in many contexts in parallel.
+		struct Values
+		{
+
+			Values( const ValuePlug *plug, const std::vector<const Context *> &contexts, const std::vector<IECore::MurmurHash> &hashes, const std::vector<size_t> &indices, std::vector<IECore::ConstObjectPtr> &values )
+				:	m_plug( plug ), m_contexts( contexts ), m_hashes( hashes ), m_indices( indices ), m_values( values )
+			{
+			}
+
+			void operator()( const tbb::blocked_range<size_t> &r ) const
+			{
+				for( size_t i = r.begin(); i != r.end(); ++i )
+				{
+					const size_t index = m_indices[i];
+					Context::Scope scope( m_contexts[index] );
+					m_values[index] = value( m_plug, &m_hashes[index] );
+				}
+			}
+
+			private :
+
+				const ValuePlug *m_plug;
+				const std::vector<const Context *> &m_contexts;
+				const std::vector<IECore::MurmurHash> &m_hashes;
+				const std::vector<size_t> &m_indices;
+				std::vector<IECore::ConstObjectPtr> &m_values;
+
+		};
+
+		// Statistics for the cache entries computed by a particular plug
+		// on a particular type of node. Records are never removed, so
+		// cache entries may refer to them by pointer.
+		struct CacheRecord
+		{
+			CacheRecord()
+			{
+				entries = 0;
+				memoryUsage = 0;
+				hits = 0;
+				misses = 0;
+			}
+
+			tbb::atomic<size_t> entries;
+			tbb::atomic<size_t> memoryUsage;
+			tbb::atomic<size_t> hits;
+			tbb::atomic<size_t> misses;
+		};
+
+		typedef tbb::concurrent_hash_map<CacheStatisticsKey, CacheRecord> CacheRecords;
+		static CacheRecords g_cacheRecords;
+		// Traversing a concurrent_hash_map isn't safe concurrently with
+		// insertion, so insertions hold this for reading, and traversals
+		// hold it for writing.
+		typedef tbb::spin_rw_mutex CacheRecordsMutex;
+		static CacheRecordsMutex g_cacheRecordsMutex;
+		static tbb::atomic<bool> g_cacheStatisticsEnabled;
+
+		static CacheRecord *cacheRecord( const ValuePlug *plug )
+		{
+			const Node *node = plug->node();
+			const CacheStatisticsKey key(
+				node ? node->typeName() : "",
+				node ? plug->relativeName( node ) : plug->fullName()
+			);
+
+			CacheRecordsMutex::scoped_lock lock( g_cacheRecordsMutex, /* write = */ false );
+			CacheRecords::accessor accessor;
+			g_cacheRecords.insert( accessor, key );
+			return &accessor->second;
+		}
+
+		struct CacheEntry
+		{
+			CacheEntry()
+				:	record( NULL ), memoryUsage( 0 )
+			{
+			}
+
+			CacheEntry( IECore::ConstObjectPtr value, CacheRecord *record, size_t memoryUsage )
+				:	value( value ), record( record ), memoryUsage( memoryUsage )
+			{
+			}
+
+			bool operator == ( const CacheEntry &rhs ) const
+			{
+				return value == rhs.value && record == rhs.record && memoryUsage == rhs.memoryUsage;
+			}
+
+			IECore::ConstObjectPtr value;
+			CacheRecord *record;
+			size_t memoryUsage;
+		};
+
+		static CacheEntry nullGetter( const IECore::MurmurHash &h, size_t &cost )
 		{
 			cost = 0;
-			return NULL;
+			return CacheEntry();
+		}
+
+		static void cacheRemoval( const IECore::MurmurHash &h, const CacheEntry &entry )
+		{
+			if( entry.record )
+			{
+				entry.record->entries--;
+				entry.record->memoryUsage -= entry.memoryUsage;
+			}
 		}
 
 		// A cache mapping from ValuePlug::hash() to the result of the previous computation
 		// for that hash. This allows us to cache results for faster repeat evaluation
-		typedef IECorePreview::LRUCache<IECore::MurmurHash, IECore::ConstObjectPtr> Cache;
+		typedef IECorePreview::LRUCache<IECore::MurmurHash, CacheEntry> Cache;
 		static Cache g_cache;
 
 		IECore::ConstObjectPtr m_result;
@@ -394,7 +1198,14 @@ class ValuePlug::ComputeProcess : public Process
 };
 
 const IECore::InternedString ValuePlug::ComputeProcess::staticType( "computeNode:compute" );
-ValuePlug::ComputeProcess::Cache ValuePlug::ComputeProcess::g_cache( nullGetter, 1024 * 1024 * 500 );
+const IECore::InternedString ValuePlug::ComputeProcess::WaitProcess::staticType( "computeNode:wait" );
+ValuePlug::ComputeProcess::CacheRecords ValuePlug::ComputeProcess::g_cacheRecords;
+ValuePlug::ComputeProcess::CacheRecordsMutex ValuePlug::ComputeProcess::g_cacheRecordsMutex;
+tbb::atomic<bool> ValuePlug::ComputeProcess::g_cacheStatisticsEnabled;
+ValuePlug::ComputeProcess::Cache ValuePlug::ComputeProcess::g_cache( nullGetter, cacheRemoval, 1024 * 1024 * 500 );
+ValuePlug::ComputeProcess::InFlightComputations ValuePlug::ComputeProcess::g_inFlightComputations;
+tbb::atomic<int> ValuePlug::ComputeProcess::g_taskParallelCount;
+tbb::enumerable_thread_specific<ValuePlug::ComputeProcess::ThreadData, tbb::cache_aligned_allocator<ValuePlug::ComputeProcess::ThreadData>, tbb::ets_key_per_instance> ValuePlug::ComputeProcess::g_threadData;
 
 //////////////////////////////////////////////////////////////////////////
 // SetValueAction implementation
@@ -455,6 +1266,39 @@ class ValuePlug::SetValueAction : public Gaffer::Action
 
 IE_CORE_DEFINERUNTIMETYPED( ValuePlug::SetValueAction );
 
+//////////////////////////////////////////////////////////////////////////
+// CacheStatistics
+//////////////////////////////////////////////////////////////////////////
+
+ValuePlug::CacheStatistics::CacheStatistics( size_t entries, size_t memoryUsage, size_t hits, size_t misses )
+	:	entries( entries ), memoryUsage( memoryUsage ), hits( hits ), misses( misses )
+{
+}
+
+ValuePlug::CacheStatistics &ValuePlug::CacheStatistics::operator += ( const CacheStatistics &rhs )
+{
+	entries += rhs.entries;
+	memoryUsage += rhs.memoryUsage;
+	hits += rhs.hits;
+	misses += rhs.misses;
+	return *this;
+}
+
+bool ValuePlug::CacheStatistics::operator == ( const CacheStatistics &rhs ) const
+{
+	return
+		entries == rhs.entries &&
+		memoryUsage == rhs.memoryUsage &&
+		hits == rhs.hits &&
+		misses == rhs.misses
+	;
+}
+
+bool ValuePlug::CacheStatistics::operator != ( const CacheStatistics &rhs ) const
+{
+	return !( *this == rhs );
+}
+
 //////////////////////////////////////////////////////////////////////////
 // ValuePlug implementation
 //////////////////////////////////////////////////////////////////////////
@@ -677,6 +1521,11 @@ void ValuePlug::hash( IECore::MurmurHash &h ) const
 	h.append( hash() );
 }
 
+void ValuePlug::hashes( const std::vector<const Context *> &contexts, std::vector<IECore::MurmurHash> &hashes ) const
+{
+	ComputeProcess::hashes( this, contexts, hashes );
+}
+
 const IECore::Object *ValuePlug::defaultObjectValue() const
 {
 	return m_defaultValue.get();
@@ -687,6 +1536,37 @@ IECore::ConstObjectPtr ValuePlug::getObjectValue( const IECore::MurmurHash *prec
 	return ComputeProcess::value( this, precomputedHash );
 }
 
+bool ValuePlug::isCached( bool value ) const
+{
+	const ValuePlug *p = sourcePlug( this );
+	if( p->getInput<ValuePlug>() )
+	{
+		// A type conversion. We don't cache these directly,
+		// so conservatively assume they're not available.
+		return false;
+	}
+	else if( p->direction() == In || !p->ancestor<ComputeNode>() )
+	{
+		// Static value, which is always available.
+		return true;
+	}
+
+	const IECore::MurmurHash hash = HashProcess::cachedHash( p );
+	if( hash == IECore::MurmurHash() )
+	{
+		return false;
+	}
+
+	return !value || ( p->getFlags( Plug::Cacheable ) && ComputeProcess::isCached( hash ) );
+}
+
+void ValuePlug::getObjectValues( const std::vector<const Context *> &contexts, std::vector<IECore::ConstObjectPtr> &values ) const
+{
+	std::vector<IECore::MurmurHash> h;
+	hashes( contexts, h );
+	ComputeProcess::values( this, contexts, h, values );
+}
+
 void ValuePlug::setObjectValue( IECore::ConstObjectPtr value )
 {
 	bool haveInput = getInput<Plug>();
@@ -794,3 +1674,83 @@ size_t ValuePlug::cacheMemoryUsage()
 {
 	return ComputeProcess::cacheMemoryUsage();
 }
+
+void ValuePlug::setCacheStatisticsEnabled( bool enabled )
+{
+	ComputeProcess::setCacheStatisticsEnabled( enabled );
+}
+
+bool ValuePlug::getCacheStatisticsEnabled()
+{
+	return ComputeProcess::getCacheStatisticsEnabled();
+}
+
+ValuePlug::CacheStatisticsMap ValuePlug::cacheStatistics()
+{
+	return ComputeProcess::cacheStatistics();
+}
+
+void ValuePlug::resetCacheStatistics()
+{
+	ComputeProcess::resetCacheStatistics();
+}
+
+void ValuePlug::setDiskCacheDirectory( const std::string &directory )
+{
+	diskCache().setDirectory( directory );
+}
+
+std::string ValuePlug::getDiskCacheDirectory()
+{
+	return diskCache().getDirectory();
+}
+
+void ValuePlug::setDiskCacheSizeLimit( size_t bytes )
+{
+	diskCache().setSizeLimit( bytes );
+}
+
+size_t ValuePlug::getDiskCacheSizeLimit()
+{
+	return diskCache().getSizeLimit();
+}
+
+size_t ValuePlug::diskCacheSize()
+{
+	return diskCache().size();
+}
+
+void ValuePlug::setDiskCacheEnabled( IECore::TypeId plugType, bool enabled )
+{
+	diskCache().setEnabled( plugType, enabled );
+}
+
+bool ValuePlug::getDiskCacheEnabled( IECore::TypeId plugType )
+{
+	return diskCache().getEnabled( plugType );
+}
+
+size_t ValuePlug::getHashCacheSizeLimit()
+{
+	return HashProcess::getCacheSizeLimit();
+}
+
+void ValuePlug::setHashCacheSizeLimit( size_t maxEntries )
+{
+	HashProcess::setCacheSizeLimit( maxEntries );
+}
+
+size_t ValuePlug::hashCacheSize()
+{
+	return HashProcess::cacheSize();
+}
+
+size_t ValuePlug::hashCacheHits()
+{
+	return HashProcess::cacheHits();
+}
+
+size_t ValuePlug::hashCacheMisses()
+{
+	return HashProcess::cacheMisses();
+}
@@ -64,11 +64,13 @@ void exitScope( Monitor &m, object type, object value, object traceBack )
 std::string repr( PerformanceMonitor::Statistics &s )
 {
 	return boost::str(
-		boost::format( "Gaffer.PerformanceMonitor.Statistics( hashCount = %d, computeCount = %d, hashDuration = %d, computeDuration = %d )" )
+		boost::format( "Gaffer.PerformanceMonitor.Statistics( hashCount = %d, computeCount = %d, hashDuration = %d, computeDuration = %d, waitCount = %d, waitDuration = %d )" )
 			% s.hashCount
 			% s.computeCount
 			% s.hashDuration.count()
 			% s.computeDuration.count()
+			% s.waitCount
+			% s.waitDuration.count()
 	);
 }
 
@@ -76,10 +78,16 @@ PerformanceMonitor::Statistics *statisticsConstructor(
 	size_t hashCount,
 	size_t computeCount,
 	boost::chrono::nanoseconds::rep hashDuration,
-	boost::chrono::nanoseconds::rep computeDuration
+	boost::chrono::nanoseconds::rep computeDuration,
+	size_t waitCount,
+	boost::chrono::nanoseconds::rep waitDuration
 )
 {
-	return new PerformanceMonitor::Statistics( hashCount, computeCount, boost::chrono::nanoseconds( hashDuration ), boost::chrono::nanoseconds( computeDuration ) );
+	return new PerformanceMonitor::Statistics(
+		hashCount, computeCount,
+		boost::chrono::nanoseconds( hashDuration ), boost::chrono::nanoseconds( computeDuration ),
+		waitCount, boost::chrono::nanoseconds( waitDuration )
+	);
 }
 
 boost::chrono::nanoseconds::rep getHashDuration( PerformanceMonitor::Statistics &s )
@@ -102,6 +110,16 @@ void setComputeDuration( PerformanceMonitor::Statistics &s, boost::chrono::nanos
 	s.computeDuration = boost::chrono::nanoseconds( v );
 }
 
+boost::chrono::nanoseconds::rep getWaitDuration( PerformanceMonitor::Statistics &s )
+{
+	return s.waitDuration.count();
+}
+
+void setWaitDuration( PerformanceMonitor::Statistics &s, boost::chrono::nanoseconds::rep v )
+{
+	s.waitDuration = boost::chrono::nanoseconds( v );
+}
+
 dict allStatistics( PerformanceMonitor &m )
 {
 	dict result;
@@ -128,6 +146,8 @@ void GafferBindings::bindMonitor()
 		.value( "PerHashDuration", PerHashDuration )
 		.value( "PerComputeDuration", PerComputeDuration )
 		.value( "HashesPerCompute", HashesPerCompute )
+		.value( "WaitCount", WaitCount )
+		.value( "WaitDuration", WaitDuration )
 	;
 
 	def(
@@ -167,7 +187,9 @@ void GafferBindings::bindMonitor()
 					arg( "hashCount" ) = 0,
 					arg( "computeCount" ) = 0,
 					arg( "hashDuration" ) = 0,
-					arg( "computeDuration" ) = 0
+					arg( "computeDuration" ) = 0,
+					arg( "waitCount" ) = 0,
+					arg( "waitDuration" ) = 0
 				)
 			)
 		)
@@ -175,6 +197,8 @@ void GafferBindings::bindMonitor()
 		.def_readwrite( "computeCount", &PerformanceMonitor::Statistics::computeCount )
 		.add_property( "hashDuration", &getHashDuration, &setHashDuration )
 		.add_property( "computeDuration", &getComputeDuration, &setComputeDuration )
+		.def_readwrite( "waitCount", &PerformanceMonitor::Statistics::waitCount )
+		.add_property( "waitDuration", &getWaitDuration, &setWaitDuration )
 		.def( self == self )
 		.def( self != self )
 		.def( "__repr__", &repr )
@@ -72,6 +72,28 @@ typename T::ValueType getValue( const T *plug, const IECore::MurmurHash *precomp
 	return plug->getValue( precomputedHash );
 }
 
+template<typename T>
+boost::python::list getValues( const T *plug, const boost::python::object &pythonContexts )
+{
+	std::vector<const Context *> contexts;
+	contextsFromPython( pythonContexts, contexts );
+
+	std::vector<typename T::ValueType> values;
+	{
+		// Must release GIL in case computation spawns threads which need
+		// to reenter Python.
+		IECorePython::ScopedGILRelease r;
+		plug->getValues( contexts, values );
+	}
+
+	boost::python::list result;
+	for( typename std::vector<typename T::ValueType>::const_iterator it = values.begin(), eIt = values.end(); it != eIt; ++it )
+	{
+		result.append( *it );
+	}
+	return result;
+}
+
 template<typename T>
 void bind()
 {
@@ -96,6 +118,7 @@ void bind()
 		.def( "maxValue", &T::maxValue )
 		.def( "setValue", setValue<T> )
 		.def( "getValue", &getValue<T>, ( boost::python::arg( "_precomputedHash" ) = boost::python::object() ) )
+		.def( "getValues", &getValues<T> )
 	;
 
 }
@@ -64,6 +64,27 @@ std::string getValue( const StringPlug *plug, const IECore::MurmurHash *precompu
 	return plug->getValue( precomputedHash );
 }
 
+list getValues( const StringPlug *plug, const object &pythonContexts )
+{
+	std::vector<const Context *> contexts;
+	contextsFromPython( pythonContexts, contexts );
+
+	std::vector<std::string> values;
+	{
+		// Must release GIL in case computation spawns threads which need
+		// to reenter Python.
+		IECorePython::ScopedGILRelease r;
+		plug->getValues( contexts, values );
+	}
+
+	list result;
+	for( std::vector<std::string>::const_iterator it = values.begin(), eIt = values.end(); it != eIt; ++it )
+	{
+		result.append( *it );
+	}
+	return result;
+}
+
 std::string substitutionsRepr( unsigned substitutions )
 {
 	static const Context::Substitutions values[] = { Context::FrameSubstitutions, Context::VariableSubstitutions, Context::EscapeSubstitutions, Context::TildeSubstitutions, Context::NoSubstitutions };
@@ -143,6 +164,7 @@ void GafferBindings::bindStringPlug()
 		.def( "defaultValue", &StringPlug::defaultValue, return_value_policy<boost::python::copy_const_reference>() )
 		.def( "setValue", &setValue )
 		.def( "getValue", &getValue, ( boost::python::arg( "_precomputedHash" ) = object() ) )
+		.def( "getValues", &getValues )
 	;
 
 	Serialisation::registerSerialiser( StringPlug::staticTypeId(), new StringPlugSerialiser );
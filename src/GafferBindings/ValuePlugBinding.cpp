@@ -38,6 +38,8 @@
 #include "boost/python.hpp"
 #include "boost/format.hpp"
 
+#include "IECorePython/ScopedGILRelease.h"
+
 #include "Gaffer/ValuePlug.h"
 #include "Gaffer/Node.h"
 #include "Gaffer/Context.h"
@@ -267,9 +269,62 @@ bool ValuePlugSerialiser::valueNeedsSerialisation( const Gaffer::ValuePlug *plug
 	return true;
 }
 
+static list hashes( const ValuePlug &plug, object pythonContexts )
+{
+	std::vector<const Context *> contexts;
+	contextsFromPython( pythonContexts, contexts );
+
+	std::vector<IECore::MurmurHash> h;
+	{
+		// Must release GIL in case computation spawns threads which need
+		// to reenter Python.
+		IECorePython::ScopedGILRelease r;
+		plug.hashes( contexts, h );
+	}
+
+	list result;
+	for( std::vector<IECore::MurmurHash>::const_iterator it = h.begin(), eIt = h.end(); it != eIt; ++it )
+	{
+		result.append( *it );
+	}
+	return result;
+}
+
+static std::string cacheStatisticsRepr( const ValuePlug::CacheStatistics &s )
+{
+	return boost::str(
+		boost::format( "Gaffer.ValuePlug.CacheStatistics( entries = %d, memoryUsage = %d, hits = %d, misses = %d )" )
+			% s.entries
+			% s.memoryUsage
+			% s.hits
+			% s.misses
+	);
+}
+
+static dict cacheStatistics()
+{
+	dict result;
+	const ValuePlug::CacheStatisticsMap s = ValuePlug::cacheStatistics();
+	for( ValuePlug::CacheStatisticsMap::const_iterator it = s.begin(), eIt = s.end(); it != eIt; ++it )
+	{
+		result[make_tuple( it->first.first, it->first.second )] = it->second;
+	}
+	return result;
+}
+
+void GafferBindings::contextsFromPython( const boost::python::object &contexts, std::vector<const Gaffer::Context *> &result )
+{
+	const size_t size = len( contexts );
+	result.reserve( size );
+	for( size_t i = 0; i < size; ++i )
+	{
+		result.push_back( extract<const Context *>( contexts[i] ) );
+	}
+}
+
 void GafferBindings::bindValuePlug()
 {
-	PlugClass<ValuePlug, PlugWrapper<ValuePlug> >()
+	scope s = PlugClass<ValuePlug, PlugWrapper<ValuePlug> >()
 		.def( boost::python::init<const std::string &, Plug::Direction, unsigned>(
 				(
 					boost::python::arg_( "name" ) = GraphComponent::defaultName<ValuePlug>(),
@@ -284,14 +339,78 @@ void GafferBindings::bindValuePlug()
 		.def( "isSetToDefault", &ValuePlug::isSetToDefault )
 		.def( "hash", (IECore::MurmurHash (ValuePlug::*)() const)&ValuePlug::hash )
 		.def( "hash", (void (ValuePlug::*)( IECore::MurmurHash & ) const)&ValuePlug::hash )
+		.def( "hashes", &hashes )
 		.def( "getCacheMemoryLimit", &ValuePlug::getCacheMemoryLimit )
 		.staticmethod( "getCacheMemoryLimit" )
 		.def( "setCacheMemoryLimit", &ValuePlug::setCacheMemoryLimit )
 		.staticmethod( "setCacheMemoryLimit" )
 		.def( "cacheMemoryUsage", &ValuePlug::cacheMemoryUsage )
 		.staticmethod( "cacheMemoryUsage" )
+		.def( "setCacheStatisticsEnabled", &ValuePlug::setCacheStatisticsEnabled )
+		.staticmethod( "setCacheStatisticsEnabled" )
+		.def( "getCacheStatisticsEnabled", &ValuePlug::getCacheStatisticsEnabled )
+		.staticmethod( "getCacheStatisticsEnabled" )
+		.def( "cacheStatistics", &cacheStatistics )
+		.staticmethod( "cacheStatistics" )
+		.def( "resetCacheStatistics", &ValuePlug::resetCacheStatistics )
+		.staticmethod( "resetCacheStatistics" )
+		.def( "getHashCacheSizeLimit", &ValuePlug::getHashCacheSizeLimit )
+		.staticmethod( "getHashCacheSizeLimit" )
+		.def( "setHashCacheSizeLimit", &ValuePlug::setHashCacheSizeLimit )
+		.staticmethod( "setHashCacheSizeLimit" )
+		.def( "hashCacheSize", &ValuePlug::hashCacheSize )
+		.staticmethod( "hashCacheSize" )
+		.def( "hashCacheHits", &ValuePlug::hashCacheHits )
+		.staticmethod( "hashCacheHits" )
+		.def( "hashCacheMisses", &ValuePlug::hashCacheMisses )
+		.staticmethod( "hashCacheMisses" )
+		.def( "setDiskCacheDirectory", &ValuePlug::setDiskCacheDirectory )
+		.staticmethod( "setDiskCacheDirectory" )
+		.def( "getDiskCacheDirectory", &ValuePlug::getDiskCacheDirectory )
+		.staticmethod( "getDiskCacheDirectory" )
+		.def( "setDiskCacheSizeLimit", &ValuePlug::setDiskCacheSizeLimit )
+		.staticmethod( "setDiskCacheSizeLimit" )
+		.def( "getDiskCacheSizeLimit", &ValuePlug::getDiskCacheSizeLimit )
+		.staticmethod( "getDiskCacheSizeLimit" )
+		.def( "diskCacheSize", &ValuePlug::diskCacheSize )
+		.staticmethod( "diskCacheSize" )
+		.def( "setDiskCacheEnabled", &ValuePlug::setDiskCacheEnabled )
+		.staticmethod( "setDiskCacheEnabled" )
+		.def( "getDiskCacheEnabled", &ValuePlug::getDiskCacheEnabled )
+		.staticmethod( "getDiskCacheEnabled" )
 		.def( "__repr__", &repr )
 	;
 
+	enum_<ValuePlug::CachePolicy>( "CachePolicy" )
+		.value( "Standard", ValuePlug::Standard )
+		.value( "TaskParallel", ValuePlug::TaskParallel )
+	;
+
+	class_<ValuePlug::CacheStatistics>( "CacheStatistics" )
+		.def( init<size_t, size_t, size_t, size_t>(
+				(
+					arg( "entries" ) = 0,
+					arg( "memoryUsage" ) = 0,
+					arg( "hits" ) = 0,
+					arg( "misses" ) = 0
+				)
+			)
+		)
+		.def_readwrite( "entries", &ValuePlug::CacheStatistics::entries )
+		.def_readwrite( "memoryUsage", &ValuePlug::CacheStatistics::memoryUsage )
+		.def_readwrite( "hits", &ValuePlug::CacheStatistics::hits )
+		.def_readwrite( "misses", &ValuePlug::CacheStatistics::misses )
+		.def( self += self )
+		.def( self == self )
+		.def( self != self )
+		.def( "__repr__", &cacheStatisticsRepr )
+	;
+
+	enum_<ValuePlug::ComputeCost>( "ComputeCost" )
+		.value( "MeasuredCost", ValuePlug::MeasuredCost )
+		.value( "CheapCost", ValuePlug::CheapCost )
+		.value( "ExpensiveCost", ValuePlug::ExpensiveCost )
+	;
+
 	Serialisation::registerSerialiser( Gaffer::ValuePlug::staticTypeId(), new ValuePlugSerialiser );
 }
@@ -34,8 +34,26 @@
 //
 //////////////////////////////////////////////////////////////////////////
 
+#include <fstream>
+#include <cerrno>
+#include <cstdio>
+#include <cstring>
+
+#include <fcntl.h>
+#include <sys/file.h>
+#include <unistd.h>
+
+#include "tbb/atomic.h"
+#include "tbb/mutex.h"
+#include "tbb/spin_mutex.h"
+#include "tbb/parallel_for.h"
+#include "tbb/blocked_range.h"
+#include "tbb/concurrent_hash_map.h"
+
 #include "boost/filesystem.hpp"
+#include "boost/noncopyable.hpp"
 
+#include "IECore/Exception.h"
 #include "IECore/FrameRange.h"
 #include "IECore/MessageHandler.h"
 
@@ -57,6 +75,7 @@ static InternedString g_postTaskIndexBlindDataName( "dispatcher:postTaskIndex" )
 static InternedString g_immediateBlindDataName( "dispatcher:immediate" );
 static InternedString g_executedBlindDataName( "dispatcher:executed" );
 static InternedString g_jobDirectoryContextEntry( "dispatcher:jobDirectory" );
+static InternedString g_executedTasksFileContextEntry( "dispatcher:executedTasksFile" );
 
 size_t Dispatcher::g_firstPlugIndex = 0;
 Dispatcher::PreDispatchSignal Dispatcher::g_preDispatchSignal;
@@ -74,6 +93,7 @@ Dispatcher::Dispatcher( const std::string &name )
 	addChild( new StringPlug( "frameRange", Plug::In, "1-100x10" ) );
 	addChild( new StringPlug( "jobName", Plug::In, "" ) );
 	addChild( new StringPlug( "jobsDirectory", Plug::In, "" ) );
+	addChild( new BoolPlug( "incremental", Plug::In, false ) );
 }
 
 Dispatcher::~Dispatcher()
@@ -125,6 +145,16 @@ const std::string Dispatcher::jobDirectory() const
 	return m_jobDirectory;
 }
 
+BoolPlug *Dispatcher::incrementalPlug()
+{
+	return getChild<BoolPlug>( g_firstPlugIndex + 4 );
+}
+
+const BoolPlug *Dispatcher::incrementalPlug() const
+{
+	return getChild<BoolPlug>( g_firstPlugIndex + 4 );
+}
+
 std::string Dispatcher::createJobDirectory( const Context *context ) const
 {
 	boost::filesystem::path jobDirectory( context->substitute( jobsDirectoryPlug()->getValue() ) );
@@ -213,6 +243,19 @@ FrameListPtr Dispatcher::frameRange( const ScriptNode *script, const Context *co
 	}
 }
 
+size_t Dispatcher::batchSize( const TaskNode::TaskPlug *plug, const Context *context ) const
+{
+	const TaskNode *node = runTimeCast<const TaskNode>( plug->node() );
+	const IntPlug *batchSizePlug = node ? node->dispatcherPlug()->getChild<const IntPlug>( g_batchSize ) : NULL;
+	if( !batchSizePlug )
+	{
+		return 1;
+	}
+
+	Context::Scope scopedContext( context );
+	return batchSizePlug->getValue();
+}
+
 //////////////////////////////////////////////////////////////////////////
 // TaskBatch implementation
 //////////////////////////////////////////////////////////////////////////
@@ -288,6 +331,159 @@ const CompoundData *Dispatcher::TaskBatch::blindData() const
 	return m_blindData.get();
 }
 
+//////////////////////////////////////////////////////////////////////////
+// Executed task database. This is just a text file containing a line
+// of the form "<key> <taskHash>" for each task that has been executed
+// successfully, which is appended to as tasks complete. Later lines
+// supersede earlier ones with the same key, so only the hash of the
+// most recent execution of each task is considered. The file may be
+// shared by concurrent processes, so all access is made while holding
+// an exclusive lock on an accompanying ".lock" file.
+//////////////////////////////////////////////////////////////////////////
+
+namespace
+{
+
+// Maps from executedTaskKey() to the hash of the last
+// successful execution.
+typedef std::map<std::string, std::string> ExecutedTasks;
+
+tbb::mutex g_executedTasksFileMutex;
+
+// Provides exclusive access to the executed task file, both between
+// threads and between processes. We lock a separate file, rather than
+// the executed task file itself, because compaction replaces the latter.
+class ExecutedTasksFileLock : boost::noncopyable
+{
+
+	public :
+
+		ExecutedTasksFileLock( const std::string &fileName )
+			:	m_threadLock( g_executedTasksFileMutex )
+		{
+			const std::string lockFileName = fileName + ".lock";
+			m_fd = ::open( lockFileName.c_str(), O_RDWR | O_CREAT, 0666 );
+			if( m_fd == -1 )
+			{
+				throw IECore::IOException( "Unable to open file \"" + lockFileName + "\" : " + strerror( errno ) );
+			}
+
+			int result;
+			while( ( result = flock( m_fd, LOCK_EX ) ) == -1 && errno == EINTR )
+			{
+			}
+
+			if( result == -1 )
+			{
+				const std::string error = strerror( errno );
+				::close( m_fd );
+				throw IECore::IOException( "Unable to lock file \"" + lockFileName + "\" : " + error );
+			}
+		}
+
+		~ExecutedTasksFileLock()
+		{
+			flock( m_fd, LOCK_UN );
+			::close( m_fd );
+		}
+
+	private :
+
+		tbb::mutex::scoped_lock m_threadLock;
+		int m_fd;
+
+};
+
+// Identifies the output of a particular task node on a particular frame,
+// so that subsequent executions replace the record of previous ones.
+std::string executedTaskKey( const TaskNode::TaskPlug *plug, float frame )
+{
+	MurmurHash h;
+	h.append( plug->relativeName( plug->ancestor<ScriptNode>() ) );
+	h.append( frame );
+	return h.toString();
+}
+
+void readExecutedTasks( const std::string &fileName, ExecutedTasks &executedTasks )
+{
+	ExecutedTasksFileLock lock( fileName );
+
+	size_t numLines = 0;
+	{
+		std::ifstream f( fileName.c_str() );
+		std::string line;
+		while( std::getline( f, line ) )
+		{
+			if( line.empty() )
+			{
+				continue;
+			}
+			numLines++;
+			const size_t separator = line.find( ' ' );
+			if( separator != std::string::npos )
+			{
+				executedTasks[line.substr( 0, separator )] = line.substr( separator + 1 );
+			}
+		}
+	}
+
+	// Rewrite the file without any superseded lines, so that
+	// it doesn't grow without bound. We write to a temporary file
+	// and rename it, so that the records are never lost, even if
+	// we fail part way through.
+	if( numLines > executedTasks.size() )
+	{
+		const std::string tmpFileName = fileName + ".tmp";
+		{
+			std::ofstream f( tmpFileName.c_str(), std::ios::trunc );
+			for( ExecutedTasks::const_iterator it = executedTasks.begin(), eIt = executedTasks.end(); it != eIt; ++it )
+			{
+				f << it->first << " " << it->second << "\n";
+			}
+			f.close();
+			if( !f )
+			{
+				::remove( tmpFileName.c_str() );
+				return;
+			}
+		}
+		if( ::rename( tmpFileName.c_str(), fileName.c_str() ) != 0 )
+		{
+			::remove( tmpFileName.c_str() );
+		}
+	}
+}
+
+} // namespace
+
+void Dispatcher::recordExecutedTasks( const TaskNode::TaskPlug *plug, const std::vector<float> &frames )
+{
+	const StringData *fileName = Context::current()->get<StringData>( g_executedTasksFileContextEntry, NULL );
+	if( !fileName )
+	{
+		return;
+	}
+
+	std::string keys;
+	{
+		Context::EditableScope frameScope( Context::current() );
+		for( std::vector<float>::const_iterator it = frames.begin(), eIt = frames.end(); it != eIt; ++it )
+		{
+			frameScope.setFrame( *it );
+			keys += executedTaskKey( plug, *it ) + " " + plug->hash().toString() + "\n";
+		}
+	}
+
+	ExecutedTasksFileLock lock( fileName->readable() );
+	std::ofstream f( fileName->readable().c_str(), std::ios::app );
+	f << keys;
+	f.close();
+	if( !f )
+	{
+		throw IECore::IOException( "Failed to write to \"" + fileName->readable() + "\"" );
+	}
+}
+
 //////////////////////////////////////////////////////////////////////////
 // Batcher class. This is an internal utility class for constructing
 // the DAG of TaskBatches to be dispatched. It is a separate class so
@@ -299,9 +495,10 @@ class Dispatcher::Batcher
 
 	public :
 
-		Batcher()
-			:	m_rootBatch( new TaskBatch() )
+		Batcher( const Dispatcher *dispatcher, const ExecutedTasks *executedTasks = NULL )
+			:	m_dispatcher( dispatcher ), m_rootBatch( new TaskBatch() ), m_executedTasks( executedTasks )
 		{
+			m_failed = false;
 		}
 
 		void addTask( const TaskNode::Task &task )
@@ -309,13 +506,240 @@ class Dispatcher::Batcher
 			addPreTask( m_rootBatch.get(), batchTasksWalk( task ) );
 		}
 
+		// Adds the tasks for all nodes on all frames. Computing the tasks
+		// and their hashes is typically the most expensive part of batching,
+		// so we first compute the whole task graph in parallel, and then
+		// batch it serially. This keeps the batches identical to those
+		// that would be made by calling `addTask()` for each task in turn.
+		void addTasks( const std::vector<TaskNodePtr> &nodes, const std::vector<FrameList::Frame> &frames, const Context *context )
+		{
+			std::vector<TaskNode::Tasks> tasks( frames.size() );
+			RootTasksFunctor rootTasksFunctor( this, nodes, frames, context, tasks );
+			tbb::parallel_for( tbb::blocked_range<size_t>( 0, frames.size() ), rootTasksFunctor );
+
+			if( m_failed )
+			{
+				throw IECore::Exception( m_error );
+			}
+
+			for( std::vector<TaskNode::Tasks>::const_iterator it = tasks.begin(), eIt = tasks.end(); it != eIt; ++it )
+			{
+				for( TaskNode::Tasks::const_iterator tIt = it->begin(), teIt = it->end(); tIt != teIt; ++tIt )
+				{
+					addTask( *tIt );
+				}
+			}
+		}
+
 		TaskBatch *rootBatch()
 		{
 			return m_rootBatch.get();
 		}
 
+		// Removes all the tasks which have been executed already
+		// by a previous incremental dispatch.
+		void pruneExecutedTasks()
+		{
+			std::map<const TaskBatch *, bool> visited;
+			pruneExecutedTasksWalk( m_rootBatch.get(), visited );
+		}
+
 	private :
 
+		// The preTasks and postTasks for a single task.
+		struct Dependencies
+		{
+			TaskNode::Tasks preTasks;
+			TaskNode::Tasks postTasks;
+		};
+
+		typedef tbb::concurrent_hash_map<IECore::MurmurHash, Dependencies> DependenciesMap;
+
+		// Constructs the root tasks for a range of frames,
+		// and computes their dependencies.
+		struct RootTasksFunctor
+		{
+
+			RootTasksFunctor( Batcher *batcher, const std::vector<TaskNodePtr> &nodes, const std::vector<FrameList::Frame> &frames, const Context *context, std::vector<TaskNode::Tasks> &tasks )
+				:	m_batcher( batcher ), m_nodes( nodes ), m_frames( frames ), m_context( context ), m_tasks( tasks )
+			{
+			}
+
+			void operator()( const tbb::blocked_range<size_t> &r ) const
+			{
+				ContextPtr frameContext = new Context( *m_context, Context::Borrowed );
+				for( size_t i = r.begin(); i != r.end(); ++i )
+				{
+					frameContext->setFrame( m_frames[i] );
+					for( std::vector<TaskNodePtr>::const_iterator it = m_nodes.begin(), eIt = m_nodes.end(); it != eIt; ++it )
+					{
+						try
+						{
+							m_tasks[i].push_back( TaskNode::Task( *it, frameContext.get() ) );
+						}
+						catch( const std::exception &e )
+						{
+							m_batcher->failed( e.what() );
+							return;
+						}
+						m_batcher->computeDependencies( m_tasks[i].back() );
+					}
+				}
+			}
+
+			private :
+
+				Batcher *m_batcher;
+				const std::vector<TaskNodePtr> &m_nodes;
+				const std::vector<FrameList::Frame> &m_frames;
+				const Context *m_context;
+				std::vector<TaskNode::Tasks> &m_tasks;
+
+		};
+
+		// Computes the dependencies for a range of tasks.
+		struct DependenciesFunctor
+		{
+
+			DependenciesFunctor( Batcher *batcher, const TaskNode::Tasks &tasks )
+				:	m_batcher( batcher ), m_tasks( tasks )
+			{
+			}
+
+			void operator()( const tbb::blocked_range<size_t> &r ) const
+			{
+				for( size_t i = r.begin(); i != r.end(); ++i )
+				{
+					m_batcher->computeDependencies( m_tasks[i] );
+				}
+			}
+
+			private :
+
+				Batcher *m_batcher;
+				const TaskNode::Tasks &m_tasks;
+
+		};
+
+		// Recursively computes the dependencies for the task, storing
+		// them in m_dependencies for use in batchTasksWalk().
+		void computeDependencies( const TaskNode::Task &task )
+		{
+			const MurmurHash key = dependenciesKey( task );
+			{
+				// Claim the task, so that no other thread duplicates
+				// our work. Note that we must release the lock before
+				// recursing, as cyclic dependencies would otherwise
+				// deadlock - the cycles themselves are reported by
+				// batchTasksWalk().
+				DependenciesMap::accessor a;
+				if( !m_dependencies.insert( a, key ) )
+				{
+					return;
+				}
+			}
+
+			if( m_failed )
+			{
+				return;
+			}
+
+			Dependencies dependencies;
+			try
+			{
+				Context::Scope scopedTaskContext( task.context() );
+				task.plug()->preTasks( dependencies.preTasks );
+				task.plug()->postTasks( dependencies.postTasks );
+			}
+			catch( const std::exception &e )
+			{
+				failed( e.what() );
+				return;
+			}
+
+			DependenciesFunctor preTasksFunctor( this, dependencies.preTasks );
+			tbb::parallel_for( tbb::blocked_range<size_t>( 0, dependencies.preTasks.size() ), preTasksFunctor );
+			DependenciesFunctor postTasksFunctor( this, dependencies.postTasks );
+			tbb::parallel_for( tbb::blocked_range<size_t>( 0, dependencies.postTasks.size() ), postTasksFunctor );
+
+			DependenciesMap::accessor a;
+			m_dependencies.find( a, key );
+			a->second.preTasks.swap( dependencies.preTasks );
+			a->second.postTasks.swap( dependencies.postTasks );
+		}
+
+		// Records the first error encountered by computeDependencies(),
+		// so that it can be rethrown on the main thread.
+		void failed( const std::string &error )
+		{
+			tbb::spin_mutex::scoped_lock lock( m_errorMutex );
+			if( !m_failed )
+			{
+				m_failed = true;
+				m_error = error;
+			}
+		}
+
+		// Returns true if all the tasks in the batch have been executed
+		// already, and all its preTasks are up to date too. Up to date
+		// preTasks are removed, and tasks which don't need to be executed
+		// again are removed from the remaining batches.
+		bool pruneExecutedTasksWalk( TaskBatch *batch, std::map<const TaskBatch *, bool> &visited )
+		{
+			std::map<const TaskBatch *, bool>::const_iterator vIt = visited.find( batch );
+			if( vIt != visited.end() )
+			{
+				return vIt->second;
+			}
+
+			bool upToDate = true;
+			TaskBatches &preTasks = batch->preTasks();
+			for( TaskBatches::iterator it = preTasks.begin(); it != preTasks.end(); )
+			{
+				if( pruneExecutedTasksWalk( it->get(), visited ) )
+				{
+					it = preTasks.erase( it );
+				}
+				else
+				{
+					upToDate = false;
+					++it;
+				}
+			}
+
+			if( batch == m_rootBatch.get() )
+			{
+				upToDate = false;
+			}
+			else if( upToDate )
+			{
+				// Tasks are only skipped if everything they depend on
+				// is also being skipped, because a change upstream may
+				// not be reflected in the task's own hash.
+				const std::set<float> &executedFrames = m_executedFrames[batch];
+				std::vector<float> &frames = batch->frames();
+				std::vector<float> remainingFrames;
+				for( std::vector<float>::const_iterator it = frames.begin(), eIt = frames.end(); it != eIt; ++it )
+				{
+					if( !executedFrames.count( *it ) )
+					{
+						remainingFrames.push_back( *it );
+					}
+				}
+
+				upToDate = remainingFrames.empty();
+				// Sequences can't be executed piecemeal, so are either
+				// skipped entirely or executed in full.
+				if( !upToDate && !batch->plug()->requiresSequenceExecution() )
+				{
+					frames = remainingFrames;
+				}
+			}
+
+			visited[batch] = upToDate;
+			return upToDate;
+		}
+
 		TaskBatchPtr batchTasksWalk( const TaskNode::Task &task, const std::set<const TaskBatch *> &ancestors = std::set<const TaskBatch *>() )
 		{
 			// Acquire a batch with this task placed in it,
@@ -330,6 +754,14 @@ class Dispatcher::Batcher
 			// Ask the task what preTasks and postTasks it would like.
 			TaskNode::Tasks preTasks;
 			TaskNode::Tasks postTasks;
+			DependenciesMap::const_accessor dependencies;
+			if( m_dependencies.find( dependencies, dependenciesKey( task ) ) )
+			{
+				preTasks = dependencies->second.preTasks;
+				postTasks = dependencies->second.postTasks;
+				dependencies.release();
+			}
+			else
 			{
 				Context::Scope scopedTaskContext( task.context() );
 				task.plug()->preTasks( preTasks );
@@ -380,14 +812,7 @@ class Dispatcher::Batcher
 			// See if we've previously visited this task, and therefore
 			// have placed it in a batch already, which we can return
 			// unchanged.
-			MurmurHash taskToBatchMapHash = task.hash();
-			taskToBatchMapHash.append( (uint64_t)task.node() );
-			if( task.hash() == MurmurHash() )
-			{
-				// Make sure we don't coalesce all no-ops into a single
-				// batch. See comments in batchHash().
-				taskToBatchMapHash.append( task.context()->getFrame() );
-			}
+			const MurmurHash taskToBatchMapHash = taskKey( task );
 			const TaskToBatchMap::const_iterator it = m_tasksToBatches.find( taskToBatchMapHash );
 			if( it != m_tasksToBatches.end() )
 			{
@@ -405,9 +830,7 @@ class Dispatcher::Batcher
 			if( bIt != m_currentBatches.end() )
 			{
 				TaskBatchPtr candidateBatch = bIt->second;
-				const IntPlug *batchSizePlug = task.node()->dispatcherPlug()->getChild<const IntPlug>( g_batchSize );
-				const size_t batchSize = ( batchSizePlug ) ? batchSizePlug->getValue() : 1;
-				if( task.plug()->requiresSequenceExecution() || ( candidateBatch->frames().size() < batchSize ) )
+				if( task.plug()->requiresSequenceExecution() || ( candidateBatch->frames().size() < m_batchSizes[candidateBatch.get()] ) )
 				{
 					batch = candidateBatch;
 				}
@@ -417,6 +840,13 @@ class Dispatcher::Batcher
 			{
 				batch = new TaskBatch( task.plug(), task.context() );
 				m_currentBatches[batchMapHash] = batch;
+				// The batch size is queried once per batch rather than once
+				// per task, because derived dispatchers may do significant
+				// work to choose it.
+				if( !task.plug()->requiresSequenceExecution() )
+				{
+					m_batchSizes[batch.get()] = m_dispatcher->batchSize( task.plug(), task.context() );
+				}
 			}
 
 			// Now we have an appropriate batch, update it to include
@@ -437,6 +867,15 @@ class Dispatcher::Batcher
 						frames.push_back( frame );
 					}
 				}
+
+				if( m_executedTasks )
+				{
+					ExecutedTasks::const_iterator eIt = m_executedTasks->find( executedTaskKey( task.plug(), frame ) );
+					if( eIt != m_executedTasks->end() && eIt->second == task.hash().toString() )
+					{
+						m_executedFrames[batch.get()].insert( frame );
+					}
+				}
 			}
 
 			const BoolPlug *immediatePlug = task.node()->dispatcherPlug()->getChild<const BoolPlug>( g_immediatePlugName );
@@ -456,6 +895,31 @@ class Dispatcher::Batcher
 			return batch;
 		}
 
+		// Hash used to identify unique tasks.
+		static IECore::MurmurHash taskKey( const TaskNode::Task &task )
+		{
+			MurmurHash result = task.hash();
+			result.append( (uint64_t)task.node() );
+			if( task.hash() == MurmurHash() )
+			{
+				// Make sure we don't coalesce all no-ops into a single
+				// batch. See comments in batchHash().
+				result.append( task.context()->getFrame() );
+			}
+			return result;
+		}
+
+		// Hash used to identify the dependencies of a task. This must
+		// include the full context, because tasks such as TaskList and
+		// TaskContextVariables have hashes which don't vary with the
+		// context, but which pass the context on to their preTasks.
+		static IECore::MurmurHash dependenciesKey( const TaskNode::Task &task )
+		{
+			MurmurHash result = taskKey( task );
+			result.append( task.context()->hash() );
+			return result;
+		}
+
 		// Hash used to determine how to coalesce tasks into batches.
 		// If `batchHash( task1 ) == batchHash( task2 )` then the two
 		// tasks can be placed in the same batch.
@@ -529,10 +993,20 @@ class Dispatcher::Batcher
 		typedef std::map<IECore::MurmurHash, TaskBatchPtr> BatchMap;
 		typedef std::map<IECore::MurmurHash, TaskBatchPtr> TaskToBatchMap;
 
+		const Dispatcher *m_dispatcher;
 		TaskBatchPtr m_rootBatch;
 		BatchMap m_currentBatches;
+		std::map<const TaskBatch *, size_t> m_batchSizes;
 		TaskToBatchMap m_tasksToBatches;
 
+		const ExecutedTasks *m_executedTasks;
+		std::map<const TaskBatch *, std::set<float> > m_executedFrames;
+
+		DependenciesMap m_dependencies;
+		tbb::spin_mutex m_errorMutex;
+		tbb::atomic<bool> m_failed;
+		std::string m_error;
+
 };
 
 //////////////////////////////////////////////////////////////////////////
@@ -636,6 +1110,16 @@ void Dispatcher::dispatch( const std::vector<NodePtr> &nodes ) const
 	m_jobDirectory = createJobDirectory( context.get() );
 	context->set( g_jobDirectoryContextEntry, m_jobDirectory );
 
+	// load the record of the tasks executed by previous dispatches of this
+	// job, and publish its location in the context so that TaskPlug::execute()
+	// can update it. We do this even when not dispatching incrementally, so
+	// that the record reflects the most recent execution of every task.
+	const bool incremental = incrementalPlug()->getValue();
+	const std::string executedTasksFile = ( boost::filesystem::path( m_jobDirectory ).parent_path() / "executedTasks.txt" ).string();
+	context->set( g_executedTasksFileContextEntry, executedTasksFile );
+	ExecutedTasks executedTasks;
+	readExecutedTasks( executedTasksFile, executedTasks );
+
 	// this object calls this->preDispatchSignal() in its constructor and this->postDispatchSignal()
 	// in its destructor, thereby guaranteeing that we always call this->postDispatchSignal().
 
@@ -649,14 +1133,12 @@ void Dispatcher::dispatch( const std::vector<NodePtr> &nodes ) const
 	FrameListPtr frameList = frameRange( script, context.get() );
 	frameList->asList( frames );
 
-	Batcher batcher;
-	for( std::vector<FrameList::Frame>::const_iterator fIt = frames.begin(); fIt != frames.end(); ++fIt )
+	Batcher batcher( this, incremental ? &executedTasks : NULL );
+	batcher.addTasks( taskNodes, frames, context.get() );
+
+	if( incremental )
 	{
-		for( std::vector<TaskNodePtr>::const_iterator nIt = taskNodes.begin(); nIt != taskNodes.end(); ++nIt )
-		{
-			context->setFrame( *fIt );
-			batcher.addTask( TaskNode::Task( *nIt, context.get() ) );
-		}
+		batcher.pruneExecutedTasks();
 	}
 
 	executeAndPruneImmediateBatches( batcher.rootBatch() );
@@ -205,14 +205,20 @@ IECore::MurmurHash TaskNode::TaskPlug::hash() const
 
 void TaskNode::TaskPlug::execute() const
 {
-	TaskNodeProcess p( TaskNodeProcess::executeProcessType, this );
-	return p.taskNode()->execute();
+	{
+		TaskNodeProcess p( TaskNodeProcess::executeProcessType, this );
+		p.taskNode()->execute();
+	}
+	Dispatcher::recordExecutedTasks( this, std::vector<float>( 1, Context::current()->getFrame() ) );
 }
 
 void TaskNode::TaskPlug::executeSequence( const std::vector<float> &frames ) const
 {
-	TaskNodeProcess p( TaskNodeProcess::executeSequenceProcessType, this );
-	return p.taskNode()->executeSequence( frames );
+	{
+		TaskNodeProcess p( TaskNodeProcess::executeSequenceProcessType, this );
+		p.taskNode()->executeSequence( frames );
+	}
+	Dispatcher::recordExecutedTasks( this, frames );
 }
 
 bool TaskNode::TaskPlug::requiresSequenceExecution() const
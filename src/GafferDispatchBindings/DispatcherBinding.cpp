@@ -119,6 +119,31 @@ class DispatcherWrapper : public NodeWrapper<Dispatcher>
 			return Dispatcher::frameRange( script, context );
 		}
 
+		virtual size_t batchSize( const TaskNode::TaskPlug *plug, const Context *context ) const
+		{
+			ScopedGILLock gilLock;
+
+			boost::python::object f = this->methodOverride( "batchSize" );
+			if( f )
+			{
+				try
+				{
+					object obj = f(
+						TaskNode::TaskPlugPtr( const_cast<TaskNode::TaskPlug *>( plug ) ),
+						ContextPtr( const_cast<Context *>( context ) )
+					);
+
+					return extract<size_t>( obj );
+				}
+				catch( const boost::python::error_already_set &e )
+				{
+					translatePythonException();
+				}
+			}
+
+			return Dispatcher::batchSize( plug, context );
+		}
+
 		//////////////////////////////////////////////////////////////////////////
 		// TashBatch method wrappers. These are defined here rather than as free
 		// functions because TaskBatch is a protected member of Dispatcher.
@@ -241,6 +266,9 @@ void dispatch( Dispatcher &dispatcher, object pythonNodes )
 {
 	std::vector<NodePtr> nodes;
 	boost::python::container_utils::extend_container( nodes, pythonNodes );
+	// Batching computes task hashes on multiple threads, some
+	// of which may need the GIL to call Python TaskNodes.
+	ScopedGILRelease gilRelease;
 	dispatcher.dispatch( nodes );
 }
 
@@ -249,6 +277,12 @@ IECore::FrameListPtr frameRange( Dispatcher &n, const ScriptNode *script, const
 	return n.Dispatcher::frameRange( script, context );
 }
 
+size_t batchSize( Dispatcher &n, const TaskNode::TaskPlug *plug, const Context *context )
+{
+	ScopedGILRelease gilRelease;
+	return n.Dispatcher::batchSize( plug, context );
+}
+
 static void registerDispatcher( std::string type, object creator, object setupPlugsFn )
 {
 	DispatcherHelper helper( creator, setupPlugsFn );
@@ -319,6 +353,7 @@ void GafferDispatchBindings::bindDispatcher()
 		.def( "dispatch", &dispatch )
 		.def( "jobDirectory", &Dispatcher::jobDirectory )
 		.def( "frameRange", &frameRange )
+		.def( "batchSize", &batchSize )
 		.def( "create", &Dispatcher::create ).staticmethod( "create" )
 		.def( "getDefaultDispatcherType", &Dispatcher::getDefaultDispatcherType, return_value_policy<copy_const_reference>() ).staticmethod( "getDefaultDispatcherType" )
 		.def( "setDefaultDispatcherType", &Dispatcher::setDefaultDispatcherType ).staticmethod( "setDefaultDispatcherType" )
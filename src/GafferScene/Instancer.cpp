@@ -111,6 +111,16 @@ void Instancer::affects( const Plug *input, AffectedPlugsContainer &outputs ) co
 	}
 }
 
+ValuePlug::CachePolicy Instancer::computeCachePolicy( const ValuePlug *output ) const
+{
+	if( output == outPlug()->boundPlug() )
+	{
+		// computeBranchBound() uses parallel_reduce().
+		return ValuePlug::TaskParallel;
+	}
+	return BranchCreator::computeCachePolicy( output );
+}
+
 struct Instancer::BoundHash
 {
 
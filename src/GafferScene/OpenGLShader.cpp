@@ -160,6 +160,9 @@ IECore::DataPtr OpenGLShader::parameterValue( const Gaffer::Plug *parameterPlug,
 {
 	if( const GafferImage::ImagePlug *imagePlug = runTimeCast<const GafferImage::ImagePlug>( parameterPlug ) )
 	{
+		// Note that image() spawns TBB tasks, so computes which call
+		// Shader::attributes() must use the TaskParallel cache policy.
+		// See ShaderAssignment::computeCachePolicy().
 		IECore::ImagePrimitivePtr image = imagePlug->image();
 		if( image )
 		{
@@ -486,20 +486,28 @@ void transformSamples( const ScenePlug *scene, size_t segments, const Imath::V2f
 
 	motionTimes( segments, shutter, sampleTimes );
 
-	ContextPtr timeContext = new Context( *Context::current(), Context::Borrowed );
-	Context::Scope scopedTimeContext( timeContext.get() );
-
-	bool moving = false;
-	samples.reserve( sampleTimes.size() );
+	std::vector<ContextPtr> timeContexts;
+	std::vector<const Context *> contexts;
+	timeContexts.reserve( sampleTimes.size() );
+	contexts.reserve( sampleTimes.size() );
 	for( std::set<float>::const_iterator it = sampleTimes.begin(), eIt = sampleTimes.end(); it != eIt; ++it )
 	{
+		ContextPtr timeContext = new Context( *Context::current(), Context::Borrowed );
 		timeContext->setFrame( *it );
-		const M44f m = scene->transformPlug()->getValue();
-		if( !moving && !samples.empty() && m != samples.front() )
+		timeContexts.push_back( timeContext );
+		contexts.push_back( timeContext.get() );
+	}
+
+	scene->transformPlug()->getValues( contexts, samples );
+
+	bool moving = false;
+	for( std::vector<M44f>::const_iterator it = samples.begin(), eIt = samples.end(); it != eIt; ++it )
+	{
+		if( *it != samples.front() )
 		{
 			moving = true;
+			break;
 		}
-		samples.push_back( m );
 	}
 
 	if( !moving )
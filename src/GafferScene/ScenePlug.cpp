@@ -60,10 +60,10 @@ namespace
 // since it'll see fewer unnecessarily different contexts, and will
 // therefore get more cache hits. We use this in our utility
 // methods for computing set names, sets and globals.
-void removeNonGlobalContextVariables( Context *context )
+void removeNonGlobalContextVariables( Context::EditableScope &scope )
 {
-	context->remove( Filter::inputSceneContextName );
-	context->remove( ScenePlug::scenePathContextName );
+	scope.remove( Filter::inputSceneContextName );
+	scope.remove( ScenePlug::scenePathContextName );
 }
 
 } // namespace
@@ -273,30 +273,27 @@ const PathMatcherDataPlug *ScenePlug::setPlug() const
 
 Imath::Box3f ScenePlug::bound( const ScenePath &scenePath ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	tmpContext->set( scenePathContextName, scenePath );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	scope.set( scenePathContextName, scenePath );
 	return boundPlug()->getValue();
 }
 
 Imath::M44f ScenePlug::transform( const ScenePath &scenePath ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	tmpContext->set( scenePathContextName, scenePath );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	scope.set( scenePathContextName, scenePath );
 	return transformPlug()->getValue();
 }
 
 Imath::M44f ScenePlug::fullTransform( const ScenePath &scenePath ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
 
 	Imath::M44f result;
 	ScenePath path( scenePath );
 	while( path.size() )
 	{
-		tmpContext->set( scenePathContextName, path );
+		scope.set( scenePathContextName, path );
 		result = result * transformPlug()->getValue();
 		path.pop_back();
 	}
@@ -306,23 +303,21 @@ Imath::M44f ScenePlug::fullTransform( const ScenePath &scenePath ) const
 
 IECore::ConstCompoundObjectPtr ScenePlug::attributes( const ScenePath &scenePath ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	tmpContext->set( scenePathContextName, scenePath );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	scope.set( scenePathContextName, scenePath );
 	return attributesPlug()->getValue();
 }
 
 IECore::CompoundObjectPtr ScenePlug::fullAttributes( const ScenePath &scenePath ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
 
 	IECore::CompoundObjectPtr result = new IECore::CompoundObject;
 	IECore::CompoundObject::ObjectMap &resultMembers = result->members();
 	ScenePath path( scenePath );
 	while( path.size() )
 	{
-		tmpContext->set( scenePathContextName, path );
+		scope.set( scenePathContextName, path );
 		IECore::ConstCompoundObjectPtr a = attributesPlug()->getValue();
 		const IECore::CompoundObject::ObjectMap &aMembers = a->members();
 		for( IECore::CompoundObject::ObjectMap::const_iterator it = aMembers.begin(), eIt = aMembers.end(); it != eIt; it++ )
@@ -340,71 +335,63 @@ IECore::CompoundObjectPtr ScenePlug::fullAttributes( const ScenePath &scenePath
 
 IECore::ConstObjectPtr ScenePlug::object( const ScenePath &scenePath ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	tmpContext->set( scenePathContextName, scenePath );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	scope.set( scenePathContextName, scenePath );
 	return objectPlug()->getValue();
 }
 
 IECore::ConstInternedStringVectorDataPtr ScenePlug::childNames( const ScenePath &scenePath ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	tmpContext->set( scenePathContextName, scenePath );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	scope.set( scenePathContextName, scenePath );
 	return childNamesPlug()->getValue();
 }
 
 IECore::ConstCompoundObjectPtr ScenePlug::globals() const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	removeNonGlobalContextVariables( tmpContext.get() );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	removeNonGlobalContextVariables( scope );
 	return globalsPlug()->getValue();
 }
 
 IECore::ConstInternedStringVectorDataPtr ScenePlug::setNames() const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	removeNonGlobalContextVariables( tmpContext.get() );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	removeNonGlobalContextVariables( scope );
 	return setNamesPlug()->getValue();
 }
 
 ConstPathMatcherDataPtr ScenePlug::set( const IECore::InternedString &setName ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	tmpContext->set( setNameContextName, setName );
-	removeNonGlobalContextVariables( tmpContext.get() );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	scope.set( setNameContextName, setName );
+	removeNonGlobalContextVariables( scope );
 	return setPlug()->getValue();
 }
 
 IECore::MurmurHash ScenePlug::boundHash( const ScenePath &scenePath ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	tmpContext->set( scenePathContextName, scenePath );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	scope.set( scenePathContextName, scenePath );
 	return boundPlug()->hash();
 }
 
 IECore::MurmurHash ScenePlug::transformHash( const ScenePath &scenePath ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	tmpContext->set( scenePathContextName, scenePath );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	scope.set( scenePathContextName, scenePath );
 	return transformPlug()->hash();
 }
 
 IECore::MurmurHash ScenePlug::fullTransformHash( const ScenePath &scenePath ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
 
 	IECore::MurmurHash result;
 	ScenePath path( scenePath );
 	while( path.size() )
 	{
-		tmpContext->set( scenePathContextName, path );
+		scope.set( scenePathContextName, path );
 		transformPlug()->hash( result );
 		path.pop_back();
 	}
@@ -414,22 +401,20 @@ IECore::MurmurHash ScenePlug::fullTransformHash( const ScenePath &scenePath ) co
 
 IECore::MurmurHash ScenePlug::attributesHash( const ScenePath &scenePath ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	tmpContext->set( scenePathContextName, scenePath );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	scope.set( scenePathContextName, scenePath );
 	return attributesPlug()->hash();
 }
 
 IECore::MurmurHash ScenePlug::fullAttributesHash( const ScenePath &scenePath ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
 
 	IECore::MurmurHash result;
 	ScenePath path( scenePath );
 	while( path.size() )
 	{
-		tmpContext->set( scenePathContextName, path );
+		scope.set( scenePathContextName, path );
 		attributesPlug()->hash( result );
 		path.pop_back();
 	}
@@ -439,43 +424,38 @@ IECore::MurmurHash ScenePlug::fullAttributesHash( const ScenePath &scenePath ) c
 
 IECore::MurmurHash ScenePlug::objectHash( const ScenePath &scenePath ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	tmpContext->set( scenePathContextName, scenePath );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	scope.set( scenePathContextName, scenePath );
 	return objectPlug()->hash();
 
 }
 
 IECore::MurmurHash ScenePlug::childNamesHash( const ScenePath &scenePath ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	tmpContext->set( scenePathContextName, scenePath );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	scope.set( scenePathContextName, scenePath );
 	return childNamesPlug()->hash();
 }
 
 IECore::MurmurHash ScenePlug::globalsHash() const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	removeNonGlobalContextVariables( tmpContext.get() );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	removeNonGlobalContextVariables( scope );
 	return globalsPlug()->hash();
 }
 
 IECore::MurmurHash ScenePlug::setNamesHash() const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	removeNonGlobalContextVariables( tmpContext.get() );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	removeNonGlobalContextVariables( scope );
 	return setNamesPlug()->hash();
 }
 
 IECore::MurmurHash ScenePlug::setHash( const IECore::InternedString &setName ) const
 {
-	ContextPtr tmpContext = new Context( *Context::current(), Context::Borrowed );
-	tmpContext->set( setNameContextName, setName );
-	removeNonGlobalContextVariables( tmpContext.get() );
-	Context::Scope scopedContext( tmpContext.get() );
+	Context::EditableScope scope( Context::current() );
+	scope.set( setNameContextName, setName );
+	removeNonGlobalContextVariables( scope );
 	return setPlug()->hash();
 }
 
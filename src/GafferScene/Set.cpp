@@ -227,6 +227,16 @@ void Set::compute( Gaffer::ValuePlug *output, const Gaffer::Context *context ) c
 	FilteredSceneProcessor::compute( output, context );
 }
 
+Gaffer::ValuePlug::CachePolicy Set::computeCachePolicy( const Gaffer::ValuePlug *output ) const
+{
+	if( output == pathMatcherPlug() )
+	{
+		// matchingPaths() uses a parallel traversal.
+		return Gaffer::ValuePlug::TaskParallel;
+	}
+	return FilteredSceneProcessor::computeCachePolicy( output );
+}
+
 void Set::hashSetNames( const Gaffer::Context *context, const ScenePlug *parent, IECore::MurmurHash &h ) const
 {
 	FilteredSceneProcessor::hashSetNames( context, parent, h );
@@ -124,6 +124,18 @@ bool ShaderAssignment::acceptsInput( const Gaffer::Plug *plug, const Gaffer::Plu
 	return true;
 }
 
+Gaffer::ValuePlug::CachePolicy ShaderAssignment::computeCachePolicy( const Gaffer::ValuePlug *output ) const
+{
+	if( output == outPlug()->attributesPlug() )
+	{
+		// Shader::attributes() may spawn TBB tasks - for instance
+		// OpenGLShader uses ImagePlug::image() to convert image
+		// parameters, and that uses parallelProcessTiles().
+		return Gaffer::ValuePlug::TaskParallel;
+	}
+	return SceneElementProcessor::computeCachePolicy( output );
+}
+
 bool ShaderAssignment::processesAttributes() const
 {
 	return true;